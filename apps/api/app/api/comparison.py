@@ -0,0 +1,94 @@
+"""
+Side-by-side food comparison
+
+Aligns several foods' contaminant levels and nutrients into a matrix: one
+row per (contaminant or nutrient, unit), one column per food, in the order
+the foods were requested. Levels are kept apart by unit so every row holds
+comparable numbers; repeated measurements of the same row are averaged.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.api.projection import FoodProjection
+from app.db import models
+
+# Most foods compared at once
+MAX_COMPARE_FOODS = 10
+
+# Everything a comparison needs: foods + category, then one query per collection
+COMPARE_PROJECTION = FoodProjection(
+    fields=frozenset({"id", "name", "slug"}),
+    include=frozenset({"category", "contaminant_levels", "nutrients"}),
+)
+
+# Worst first
+RISK_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _worst_risk(categories: List[str]) -> Optional[str]:
+    known = [c.lower() for c in categories if c and c.lower() in RISK_ORDER]
+    return min(known, key=RISK_ORDER.__getitem__) if known else None
+
+
+def _aligned_rows(
+    foods: Sequence[models.Food],
+    entries,
+    with_risk: bool = False,
+) -> List[Dict]:
+    """
+    Rows from ``(food index, name, unit, value, risk category)`` entries
+
+    Every row's ``values`` (and ``risk_categories``) list has one slot per food.
+    """
+    values: Dict[Tuple[str, Optional[str]], List[List[float]]] = defaultdict(lambda: [[] for _ in foods])
+    risks: Dict[Tuple[str, Optional[str]], List[List[str]]] = defaultdict(lambda: [[] for _ in foods])
+    for column, name, unit, value, risk in entries:
+        key = (name, unit)
+        slots = values[key]
+        if value is not None:
+            slots[column].append(value)
+        if risk:
+            risks[key][column].append(risk)
+
+    rows = []
+    for name, unit in sorted(values, key=lambda key: (key[0].lower(), key[1] or "")):
+        row = {
+            "name": name,
+            "unit": unit,
+            "values": [_mean(slot) for slot in values[(name, unit)]],
+        }
+        if with_risk:
+            row["risk_categories"] = [_worst_risk(slot) for slot in risks[(name, unit)]]
+        rows.append(row)
+    return rows
+
+
+def build_comparison(foods: Sequence[models.Food]) -> Dict:
+    """Comparison matrix of foods loaded with ``COMPARE_PROJECTION``"""
+    contaminants = (
+        (column, level.contaminant.name, level.level_unit, level.level_value, level.risk_category)
+        for column, food in enumerate(foods)
+        for level in food.contaminant_levels
+    )
+    nutrients = (
+        (column, nutrient.nutrient_name, nutrient.unit, nutrient.amount, None)
+        for column, food in enumerate(foods)
+        for nutrient in food.nutrients
+    )
+    return {
+        "foods": [
+            {
+                "id": food.id,
+                "name": food.name,
+                "slug": food.slug,
+                "category": food.category.slug if food.category else None,
+            }
+            for food in foods
+        ],
+        "contaminants": _aligned_rows(foods, contaminants, with_risk=True),
+        "nutrients": _aligned_rows(foods, nutrients),
+    }
@@ -0,0 +1,114 @@
+"""
+Materialized food detail documents
+
+The full ``FoodDetail`` JSON of every food is rendered once into
+``food_documents`` by the ingest scripts. The detail routes then answer with a
+single indexed row read (no ORM entities, no Pydantic) and a strong ETag, so
+revalidating clients get a bodyless 304.
+
+A food without a document (e.g. just imported by barcode) is rendered on
+first request and stored, so the table fills itself in.
+"""
+import hashlib
+import json
+from typing import Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.projection import DETAIL_INCLUDE, FOOD_FIELDS, FoodProjection
+from app.db import models
+
+DETAIL_PROJECTION = FoodProjection(fields=frozenset(FOOD_FIELDS), include=DETAIL_INCLUDE)
+
+REBUILD_BATCH_SIZE = 500
+
+
+def render_document(food: models.Food) -> str:
+    """JSON body of a fully loaded food, byte-identical to the ORM detail response"""
+    return json.dumps(
+        DETAIL_PROJECTION.serialize(food),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    )
+
+
+def make_etag(body: str) -> str:
+    """Strong validator for a document body"""
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def document_response(request: Request, body: str, etag: str) -> Response:
+    """200 with the document, or 304 if the client already holds this version"""
+    headers = {"ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def document_query(where):
+    """Document of the first food by name matching ``where`` (barcodes aren't unique), joined so a
+    food without a document still comes first rather than yielding to one that has one"""
+    return (
+        select(models.FoodDocument.body, models.FoodDocument.etag)
+        .select_from(models.Food)
+        .outerjoin(models.FoodDocument, models.FoodDocument.food_id == models.Food.id)
+        .where(where)
+        .order_by(models.Food.name, models.Food.id)
+        .limit(1)
+    )
+
+
+async def fetch_document(db: AsyncSession, where) -> Optional[tuple]:
+    """``(body, etag)`` of the first food by name matching ``where``, or None if it has no document"""
+    row = (await db.execute(document_query(where))).first()
+    return tuple(row) if row and row.body is not None else None
+
+
+async def store_documents(db: AsyncSession, foods: Iterable[models.Food]) -> List[tuple]:
+    """Render and upsert documents for fully loaded foods; returns ``(food_id, body, etag)`` rows"""
+    rows = []
+    for food in foods:
+        body = render_document(food)
+        rows.append((food.id, body, make_etag(body)))
+    if rows:
+        stmt = insert(models.FoodDocument).values(
+            [{"food_id": food_id, "body": body, "etag": etag} for food_id, body, etag in rows]
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.FoodDocument.food_id],
+            set_={"body": stmt.excluded.body, "etag": stmt.excluded.etag, "built_at": stmt.excluded.built_at},
+        ))
+    return rows
+
+
+async def load_detail_foods(db: AsyncSession, food_ids: Sequence[UUID]) -> List[models.Food]:
+    """Foods with every relationship the detail document needs"""
+    query = select(models.Food).where(models.Food.id.in_(food_ids)).options(*DETAIL_PROJECTION.loader_options())
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def rebuild_food_documents(db: AsyncSession, food_ids: Optional[Sequence[UUID]] = None) -> int:
+    """Re-render documents for ``food_ids`` (default: every food) in batches; caller commits"""
+    if food_ids is None:
+        food_ids = (await db.execute(select(models.Food.id).order_by(models.Food.id))).scalars().all()
+    for start in range(0, len(food_ids), REBUILD_BATCH_SIZE):
+        foods = await load_detail_foods(db, food_ids[start:start + REBUILD_BATCH_SIZE])
+        await store_documents(db, foods)
+        # Keep the identity map from growing with the whole catalogue
+        db.expunge_all()
+    return len(food_ids)
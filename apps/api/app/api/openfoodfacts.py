@@ -0,0 +1,141 @@
+"""
+Cached Open Food Facts lookups
+
+Barcode scans of products we don't hold and /barcode/search pages go to
+world.openfoodfacts.org. Results are kept in two tiers: a per-worker
+``LRUCache`` answers repeat scans without leaving the process, and the Redis
+result cache shares them between workers and restarts. Barcodes Open Food
+Facts doesn't know are cached too (for ``OFF_NOT_FOUND_CACHE_TTL``), so
+repeated scans of an unknown product don't each cost a round trip; failed
+requests are never cached.
+
+Concurrent misses for the same key share one upstream request; if the
+request doing the fetch is cancelled, the ones waiting on it retry.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple
+
+from app.core.cache import LRUCache, ResultCache, normalize_query, result_cache
+from app.core.config import settings
+from scrapers.openfoodfacts_scraper import OpenFoodFactsScraper
+
+COUNTERS = ("memory_hits", "redis_hits", "coalesced", "misses", "not_found", "errors")
+
+
+class Cached(NamedTuple):
+    value: Any
+    hit: bool
+
+
+def clean_barcode(barcode: str) -> str:
+    return barcode.replace(" ", "").replace("-", "")
+
+
+class OpenFoodFactsCache:
+    """In-process LRU in front of the Redis result cache, in front of Open Food Facts"""
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        memory_size: int,
+        scraper_factory: Callable[[], OpenFoodFactsScraper] = OpenFoodFactsScraper,
+    ):
+        self.cache = cache
+        self.memory = LRUCache(memory_size)
+        self.scraper_factory = scraper_factory
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def product(self, barcode: str) -> Cached:
+        """Transformed product for ``barcode`` (value None if Open Food Facts has none)"""
+        barcode = clean_barcode(barcode)
+
+        async def fetch(scraper):
+            return await scraper.fetch_product_by_barcode(barcode)
+
+        def ttl(product) -> int:
+            return settings.OFF_PRODUCT_CACHE_TTL if product is not None else settings.OFF_NOT_FOUND_CACHE_TTL
+
+        return await self._get("off_product", {"barcode": barcode}, fetch, ttl)
+
+    async def search(self, q: str, page: int, page_size: int) -> Cached:
+        """One transformed page of Open Food Facts search results"""
+        async def fetch(scraper):
+            return await scraper.fetch_search_page(q, page=page, page_size=page_size)
+
+        params = {"q": normalize_query(q), "page": page, "page_size": page_size}
+        return await self._get("off_search", params, fetch, lambda products: settings.OFF_SEARCH_CACHE_TTL)
+
+    async def _get(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        fetch: Callable[[OpenFoodFactsScraper], Awaitable[Any]],
+        ttl: Callable[[Any], int],
+    ) -> Cached:
+        key = (namespace, *sorted(params.items()))
+        found, value = self.memory.get(key)
+        if found:
+            self.counters["memory_hits"] += 1
+            return Cached(value, hit=True)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+            try:
+                return Cached(await asyncio.shield(inflight), hit=True)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    # This request was cancelled
+                    raise
+            # The request doing the fetch was cancelled (client went away); start over
+            return await self._get(namespace, params, fetch, ttl)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            cached = await self._load(namespace, params, key, fetch, ttl)
+            future.set_result(cached.value)
+            return cached
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; don't warn about it when there are none
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, namespace, params, key, fetch, ttl) -> Cached:
+        lookup = await self.cache.lookup(namespace, (), **params)
+        if lookup.hit:
+            value = lookup.json()["value"]
+            self.counters["redis_hits"] += 1
+            # Redis doesn't say how long the entry has left, so keep the memory copy for the shorter TTL
+            self.memory.set(key, value, min(ttl(value), settings.OFF_NOT_FOUND_CACHE_TTL))
+            return Cached(value, hit=True)
+
+        self.counters["misses"] += 1
+        scraper = self.scraper_factory()
+        try:
+            value = await fetch(scraper)
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        finally:
+            await scraper.close()
+
+        if value is None:
+            self.counters["not_found"] += 1
+        await self.cache.put(lookup, {"value": value}, ttl=ttl(value))
+        self.memory.set(key, value, ttl(value))
+        return Cached(value, hit=False)
+
+    def stats(self) -> Dict[str, int]:
+        """This worker's counters plus the number of entries held in memory"""
+        return {**self.counters, "memory_entries": len(self.memory)}
+
+
+off_cache = OpenFoodFactsCache(result_cache, memory_size=settings.OFF_MEMORY_CACHE_SIZE)
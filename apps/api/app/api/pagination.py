@@ -0,0 +1,76 @@
+"""
+Opaque cursor tokens for keyset pagination
+
+A cursor carries the sort-key values of the last row on a page, e.g.
+``(name, id)`` for foods or ``(recall_date, id)`` for recalls. The next
+page is fetched with ``WHERE (sort keys) > (cursor values)`` so deep pages
+cost the same as the first one and rows inserted mid-scan don't shift
+the pages that follow.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import literal, tuple_
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(kind: str, values: Sequence[Any]) -> str:
+    """Encode sort-key values into a URL-safe token tagged with the listing ``kind``"""
+    payload = json.dumps({"k": kind, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def cursor_kind(token: Optional[str]) -> Optional[str]:
+    """The listing ``kind`` a token was issued for, or None (``decode_cursor`` reports bad tokens)"""
+    if not token:
+        return None
+    try:
+        kind = json.loads(base64.urlsafe_b64decode((token + "=" * (-len(token) % 4)).encode()))["k"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return kind if isinstance(kind, str) else None
+
+
+def decode_cursor(kind: str, token: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    """Decode a token produced by ``encode_cursor`` for the same ``kind``; 400 if it is malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != kind or len(payload["v"]) != size:
+            raise ValueError("cursor does not belong to this listing")
+        return tuple(_decode_value(v) for v in payload["v"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any]):
+    """``(columns) > (values)`` row comparison for ascending keyset pagination"""
+    return tuple_(*columns) > tuple_(*(literal(v, c.type) for c, v in zip(columns, values)))
+
+
+def keyset_before(columns: Sequence[Any], values: Sequence[Any]):
+    """``(columns) < (values)`` row comparison for descending keyset pagination"""
+    return tuple_(*columns) < tuple_(*(literal(v, c.type) for c, v in zip(columns, values)))
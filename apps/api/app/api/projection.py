@@ -0,0 +1,118 @@
+"""
+Sparse fieldsets for food responses
+
+``fields=`` picks scalar columns and ``include=`` picks relationships. Each
+relationship maps to a loader option, so only what the client asked for is
+queried; everything else is ``raiseload``-ed, which turns an accidental lazy
+load into an error instead of a hidden extra query.
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+from app.db import models, schemas
+
+# Scalar attributes a client can select with fields=
+FOOD_FIELDS = (
+    "id", "name", "slug", "common_names", "description", "image_url",
+    "barcode", "category_id", "created_at", "updated_at",
+)
+
+# Relationship -> loader options that fully load it for serialization.
+# Collections use selectinload: one extra query each, returning exactly the
+# child rows. Joining several collections into one statement would return
+# their cartesian product (20 contaminant levels x 40 nutrients = 800 rows).
+# Many-to-one references are joined, which never multiplies rows.
+FOOD_RELATIONSHIP_LOADERS = {
+    "category": lambda: [joinedload(models.Food.category)],
+    "contaminant_levels": lambda: [
+        selectinload(models.Food.contaminant_levels).options(
+            joinedload(models.FoodContaminantLevel.contaminant),
+            joinedload(models.FoodContaminantLevel.source),
+        ),
+    ],
+    "nutrients": lambda: [selectinload(models.Food.nutrients).joinedload(models.FoodNutrient.source)],
+    "advisories": lambda: [selectinload(models.Food.advisories)],
+    "sustainability_ratings": lambda: [selectinload(models.Food.sustainability_ratings)],
+}
+
+# Relationship -> (schema, is_collection)
+FOOD_RELATIONSHIP_SCHEMAS = {
+    "category": (schemas.FoodCategory, False),
+    "contaminant_levels": (schemas.FoodContaminantLevel, True),
+    "nutrients": (schemas.FoodNutrient, True),
+    "advisories": (schemas.StateAdvisory, True),
+    "sustainability_ratings": (schemas.SustainabilityRating, True),
+}
+
+SUMMARY_INCLUDE = frozenset({"category"})
+DETAIL_INCLUDE = frozenset(FOOD_RELATIONSHIP_LOADERS)
+
+
+def _parse(value: Optional[str], allowed, label: str) -> Optional[FrozenSet[str]]:
+    if value is None:
+        return None
+    names = frozenset(n.strip() for n in value.split(",") if n.strip())
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {label}: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    return names
+
+
+@dataclass(frozen=True)
+class FoodProjection:
+    fields: FrozenSet[str]
+    include: FrozenSet[str]
+
+    @classmethod
+    def parse(cls, fields: Optional[str], include: Optional[str],
+              default_include: FrozenSet[str] = DETAIL_INCLUDE) -> "FoodProjection":
+        """Build a projection from comma-separated query parameters (400 on unknown names)"""
+        selected_fields = _parse(fields, FOOD_FIELDS, "fields")
+        selected_include = _parse(include, FOOD_RELATIONSHIP_LOADERS, "include")
+        return cls(
+            fields=frozenset(FOOD_FIELDS) if selected_fields is None else selected_fields,
+            include=default_include if selected_include is None else selected_include,
+        )
+
+    def with_fields(self, *names: str) -> "FoodProjection":
+        """Same projection with extra scalar fields loaded"""
+        return FoodProjection(fields=self.fields | frozenset(names), include=self.include)
+
+    def loader_options(self) -> List:
+        """Loader options that load exactly this projection"""
+        columns = [getattr(models.Food, name) for name in FOOD_FIELDS if name in self.fields]
+        options = [load_only(*columns)] if columns else []
+        for name in FOOD_RELATIONSHIP_LOADERS:
+            if name in self.include:
+                options.extend(FOOD_RELATIONSHIP_LOADERS[name]())
+        options.append(raiseload("*"))
+        return options
+
+    def serialize(self, food: models.Food) -> Dict:
+        """JSON-ready dict with only the selected fields, serialized like ``schemas.FoodDetail``"""
+        values = {name: getattr(food, name) for name in self.fields}
+        for name in self.include:
+            schema, many = FOOD_RELATIONSHIP_SCHEMAS[name]
+            related = getattr(food, name)
+            if many:
+                values[name] = [schema.model_validate(item) for item in related]
+            else:
+                values[name] = schema.model_validate(related) if related is not None else None
+        return schemas.FoodDetail.model_construct(**values).model_dump(
+            mode="json", include=set(self.fields | self.include)
+        )
+
+    def response(self, content, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        """JSON response for one food or a list of foods"""
+        if isinstance(content, list):
+            body = [self.serialize(food) for food in content]
+        else:
+            body = self.serialize(content)
+        return JSONResponse(body, headers=headers)
@@ -3,12 +3,18 @@ API endpoints for barcode scanning and product lookup
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import func, select
 from typing import Optional
 import logging
 
+from app.api.openfoodfacts import off_cache
+from app.api.serialization import FastJSONResponse
+from app.core.cache import result_cache
+from app.db.notifications import notify_foods_changed
 from app.db.session import get_db
 from app.db.models import Food, FoodCategory, FoodRecall
+from app.recalls import link_recalls_to_food
+from app.search import fulltext
 from scrapers.openfoodfacts_scraper import OpenFoodFactsScraper
 
 logger = logging.getLogger(__name__)
@@ -44,13 +50,13 @@ async def lookup_barcode(
         if food:
             logger.info(f"Found product in database: {food.name}")
 
-            # Check for recalls
-            recall_query = select(FoodRecall).where(
-                or_(
-                    FoodRecall.food_id == food.id,
-                    FoodRecall.product_description.ilike(f"%{food.name}%")
-                )
-            ).limit(5)
+            # Recalls are linked to foods at ingest (see app.recalls.linker)
+            recall_query = (
+                select(FoodRecall)
+                .where(FoodRecall.food_id == food.id)
+                .order_by(FoodRecall.recall_date.desc().nulls_last())
+                .limit(5)
+            )
             recall_result = await db.execute(recall_query)
             recalls = recall_result.scalars().all()
 
@@ -79,64 +85,75 @@ async def lookup_barcode(
                 "has_active_recalls": len(recalls) > 0
             }
 
-        # Product not in our database - fetch from Open Food Facts
+        # Product not in our database - fetch from Open Food Facts (cached, including misses)
         logger.info(f"Fetching from Open Food Facts: {barcode}")
-        scraper = OpenFoodFactsScraper()
-
         try:
-            product_data = await scraper.get_product_by_barcode(barcode)
-
-            if not product_data:
-                return {
-                    "source": "openfoodfacts",
-                    "found": False,
-                    "barcode": barcode,
-                    "message": "Product not found in Open Food Facts database"
-                }
-
-            # Check for recalls by product name
-            product_name = product_data.get("product_name", "")
-            recall_query = select(FoodRecall).where(
-                FoodRecall.product_description.ilike(f"%{product_name}%")
-            ).limit(5)
-            recall_result = await db.execute(recall_query)
-            recalls = recall_result.scalars().all()
+            product_data = (await off_cache.product(barcode)).value
+        except Exception as e:
+            # Not cached, so the next scan tries again
+            logger.error(f"Open Food Facts lookup failed for {barcode}: {e}")
+            return {
+                "source": "openfoodfacts",
+                "found": False,
+                "barcode": barcode,
+                "message": "Open Food Facts is unavailable, try again later"
+            }
 
+        if not product_data:
             return {
                 "source": "openfoodfacts",
-                "found": True,
-                "product": {
-                    "name": product_data.get("product_name"),
-                    "barcode": product_data.get("barcode"),
-                    "brands": product_data.get("brands"),
-                    "categories": product_data.get("categories", []),
-                    "ingredients": product_data.get("ingredients"),
-                    "allergens": product_data.get("allergens", []),
-                    "nutriscore_grade": product_data.get("nutriscore_grade"),
-                    "nova_group": product_data.get("nova_group"),
-                    "ecoscore_grade": product_data.get("ecoscore_grade"),
-                    "image_url": product_data.get("image_url"),
-                    "nutrients": product_data.get("nutrients", {}),
-                    "openfoodfacts_url": product_data.get("openfoodfacts_url"),
-                },
-                "recalls": [
-                    {
-                        "recall_number": r.recall_number,
-                        "reason": r.reason_for_recall,
-                        "classification": r.classification,
-                        "date": r.recall_date.isoformat() if r.recall_date else None,
-                    }
-                    for r in recalls
-                ],
-                "recall_count": len(recalls),
-                "has_active_recalls": len(recalls) > 0,
-                "can_import": True,
-                "message": "Product found in Open Food Facts. You can import it to our database."
+                "found": False,
+                "barcode": barcode,
+                "message": "Product not found in Open Food Facts database"
             }
 
-        finally:
-            await scraper.close()
+        # Not linked to a food, so match the product name against recalled products on the full-text index
+        product_name = product_data.get("product_name") or ""
+        recalls = []
+        if product_name.strip():
+            recall_query = (
+                select(FoodRecall)
+                .where(fulltext.matches_recall_product(func.plainto_tsquery(fulltext.TSCONFIG, product_name)))
+                .order_by(FoodRecall.recall_date.desc().nulls_last())
+                .limit(5)
+            )
+            recall_result = await db.execute(recall_query)
+            recalls = recall_result.scalars().all()
+
+        return {
+            "source": "openfoodfacts",
+            "found": True,
+            "product": {
+                "name": product_data.get("product_name"),
+                "barcode": product_data.get("barcode"),
+                "brands": product_data.get("brands"),
+                "categories": product_data.get("categories", []),
+                "ingredients": product_data.get("ingredients"),
+                "allergens": product_data.get("allergens", []),
+                "nutriscore_grade": product_data.get("nutriscore_grade"),
+                "nova_group": product_data.get("nova_group"),
+                "ecoscore_grade": product_data.get("ecoscore_grade"),
+                "image_url": product_data.get("image_url"),
+                "nutrients": product_data.get("nutrients", {}),
+                "openfoodfacts_url": product_data.get("openfoodfacts_url"),
+            },
+            "recalls": [
+                {
+                    "recall_number": r.recall_number,
+                    "reason": r.reason_for_recall,
+                    "classification": r.classification,
+                    "date": r.recall_date.isoformat() if r.recall_date else None,
+                }
+                for r in recalls
+            ],
+            "recall_count": len(recalls),
+            "has_active_recalls": len(recalls) > 0,
+            "can_import": True,
+            "message": "Product found in Open Food Facts. You can import it to our database."
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error looking up barcode {barcode}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -156,25 +173,35 @@ async def search_products(
     - **page_size**: Results per page (default: 10, max: 50)
     """
     try:
-        scraper = OpenFoodFactsScraper()
+        # Open Food Facts results don't depend on our tables, so only the TTL expires them
+        products, hit = await off_cache.search(q, page, page_size)
+    except Exception as e:
+        # Network errors and malformed responses alike: an empty page, not cached, so the next search tries again
+        logger.error(f"Open Food Facts search failed for {q!r}: {e}")
+        products, hit = [], False
 
-        try:
-            products = await scraper.search_products(q, page=page, page_size=page_size)
+    return FastJSONResponse({
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "results": products,
+        "count": len(products)
+    }, headers={"X-Cache": "HIT" if hit else "MISS"})
 
-            return {
-                "query": q,
-                "page": page,
-                "page_size": page_size,
-                "results": products,
-                "count": len(products)
-            }
 
-        finally:
-            await scraper.close()
+@router.get("/cache/stats")
+async def off_cache_stats():
+    """
+    Open Food Facts cache counters
 
-    except Exception as e:
-        logger.error(f"Error searching products: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    `memory` is this worker's in-process tier; `redis` holds the hit/miss
+    counters of the shared tier, summed over all workers.
+    """
+    shared = await result_cache.stats()
+    return {
+        "memory": off_cache.stats(),
+        "redis": {namespace: shared.get(namespace, {"hits": 0, "misses": 0}) for namespace in ("off_product", "off_search")},
+    }
 
 
 @router.post("/import/{barcode}")
@@ -205,65 +232,68 @@ async def import_product(
                 "food_id": str(existing.id)
             }
 
-        # Fetch from Open Food Facts
-        scraper = OpenFoodFactsScraper()
-
+        # Fetch from Open Food Facts (usually still cached from the scan)
         try:
-            product_data = await scraper.get_product_by_barcode(barcode)
-
-            if not product_data:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Product {barcode} not found in Open Food Facts"
-                )
-
-            # Create slug
-            from slugify import slugify
-            product_name = product_data.get("product_name", "")
-            slug = slugify(product_name) if product_name else barcode
-
-            # Make slug unique
-            base_slug = slug
-            counter = 1
-            while True:
-                check_query = select(Food).where(Food.slug == slug)
-                check_result = await db.execute(check_query)
-                if not check_result.scalar_one_or_none():
-                    break
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-
-            # Create food entry
-            food = Food(
-                name=product_name,
-                barcode=barcode,
-                slug=slug,
-                description=product_data.get("ingredients"),
-                image_url=product_data.get("image_url"),
-                category_id=category_id
+            product_data = (await off_cache.product(barcode)).value
+        except Exception as e:
+            logger.error(f"Open Food Facts lookup failed for {barcode}: {e}")
+            raise HTTPException(status_code=503, detail="Open Food Facts is unavailable, try again later")
+
+        if not product_data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Product {barcode} not found in Open Food Facts"
             )
 
-            db.add(food)
-            await db.commit()
-            await db.refresh(food)
-
-            logger.info(f"Imported product: {product_name}")
-
-            return {
-                "success": True,
-                "message": f"Successfully imported: {product_name}",
-                "food_id": str(food.id),
+        # Create slug
+        from slugify import slugify
+        product_name = product_data.get("product_name", "")
+        slug = slugify(product_name) if product_name else barcode
+
+        # Make slug unique
+        base_slug = slug
+        counter = 1
+        while True:
+            check_query = select(Food).where(Food.slug == slug)
+            check_result = await db.execute(check_query)
+            if not check_result.scalar_one_or_none():
+                break
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+
+        # Create food entry
+        food = Food(
+            name=product_name,
+            barcode=barcode,
+            slug=slug,
+            description=product_data.get("ingredients"),
+            image_url=product_data.get("image_url"),
+            category_id=category_id
+        )
+
+        db.add(food)
+        await db.flush()
+        linked = await link_recalls_to_food(db, food)
+        # Other workers add it to their search indexes once this commits
+        await notify_foods_changed(db, [food.id])
+        await db.commit()
+        await db.refresh(food)
+        await result_cache.bump_versions(["foods", "food_recalls"] if linked else ["foods"])
+
+        logger.info(f"Imported product: {product_name}")
+
+        return {
+            "success": True,
+            "message": f"Successfully imported: {product_name}",
+            "food_id": str(food.id),
+            "slug": food.slug,
+            "product": {
+                "name": food.name,
+                "barcode": food.barcode,
                 "slug": food.slug,
-                "product": {
-                    "name": food.name,
-                    "barcode": food.barcode,
-                    "slug": food.slug,
-                    "image_url": food.image_url
-                }
+                "image_url": food.image_url
             }
-
-        finally:
-            await scraper.close()
+        }
 
     except HTTPException:
         raise
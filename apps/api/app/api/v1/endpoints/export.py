@@ -0,0 +1,140 @@
+"""
+Bulk export endpoints
+
+Stream a whole table as NDJSON or CSV for partners who mirror our data.
+Rows come from a server-side cursor in batches of ``EXPORT_BATCH_SIZE``, so
+memory stays flat however large the table is.
+
+Incremental pulls (``updated_since``) are at-least-once: the watermark handed
+out in ``X-Export-Started-At`` is the database's transaction time minus
+``WATERMARK_OVERLAP``, so rows written by transactions still open when the
+export began are sent again next time rather than missed (consumers upsert
+by id). Deleted rows are never reported by incremental pulls; a full export
+is needed to notice them.
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Literal, Optional
+
+import orjson
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from starlette.background import BackgroundTask
+
+from app.api.serialization import ADVISORY_SHAPE, PAPER_SHAPE, RECALL_SHAPE, RowShape, food_shape
+from app.db import models
+from app.db.session import AsyncSessionLocal
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 1000
+
+# Rows are stamped with their writer's transaction start time, which can be
+# before the export's watermark although the row commits after the export's
+# snapshot; writes inside this window are re-sent by the next pull
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Entity -> (model, row shape); same fields as the corresponding list endpoints
+EXPORTS = {
+    "foods": (models.Food, food_shape(include=())),
+    "recalls": (models.FoodRecall, RECALL_SHAPE),
+    "advisories": (models.StateAdvisory, ADVISORY_SHAPE),
+    "papers": (models.ResearchPaper, PAPER_SHAPE),
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def changed_at(model):
+    """Last-modified time of a row (tables without updated_at only have created_at)"""
+    if hasattr(model, "updated_at"):
+        return func.coalesce(model.updated_at, model.created_at)
+    return model.created_at
+
+
+def export_query(model, shape: RowShape, updated_since: Optional[datetime] = None):
+    query = select(*shape.columns).order_by(model.id)
+    if updated_since is not None:
+        query = query.where(changed_at(model) >= updated_since)
+    return query
+
+
+def encode_ndjson(rows) -> bytes:
+    return b"".join(orjson.dumps(row, option=orjson.OPT_UTC_Z) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z).decode().strip('"')
+    return value
+
+
+def encode_csv(rows, fields, header: bool = False) -> bytes:
+    """CSV lines for ``rows``; list values are joined with ``|``"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(row[field]) for field in fields])
+    return buffer.getvalue().encode()
+
+
+async def stream_export(session, query, shape: RowShape, fmt: str) -> AsyncIterator[bytes]:
+    """Encode the query's rows batch by batch from a server-side cursor, then close ``session``"""
+    try:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            yield encode_csv([], shape.emit, header=True)
+        async for partition in result.partitions():
+            rows = shape.build_all(partition)
+            yield encode_ndjson(rows) if fmt == "ndjson" else encode_csv(rows, shape.emit)
+    finally:
+        await session.close()
+
+
+@router.get("/{entity}")
+async def export_entity(
+    entity: Literal["foods", "recalls", "advisories", "papers"],
+    fmt: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="ndjson (one JSON object per line) or csv"
+    ),
+    updated_since: Optional[datetime] = Query(
+        None, description="Only rows created or updated at or after this time (ISO 8601)"
+    ),
+):
+    """
+    Stream every row of a table as NDJSON or CSV
+
+    - **updated_since**: Incremental pulls; pass the `X-Export-Started-At` value of your
+      previous export to get only what changed since. Delivery is at-least-once (a row may
+      arrive in two consecutive pulls; upsert by `id`), and deletions are not reported.
+    """
+    model, shape = EXPORTS[entity]
+    # The request's session is closed before a streaming body is sent, so use our own; the
+    # watermark is read from the database in the same transaction the rows are streamed in
+    session = AsyncSessionLocal()
+    try:
+        started_at = (await session.execute(select(func.now()))).scalar_one() - WATERMARK_OVERLAP
+    except Exception:
+        await session.close()
+        raise
+    return StreamingResponse(
+        stream_export(session, export_query(model, shape, updated_since), shape, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        # Also runs when the client goes away before the body is read; closing twice is harmless
+        background=BackgroundTask(session.close),
+        headers={
+            "Content-Disposition": f'attachment; filename="{entity}.{fmt}"',
+            "X-Export-Started-At": started_at.isoformat(),
+        },
+    )
@@ -0,0 +1,122 @@
+"""
+Contaminant exposure endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.db import models, schemas
+from app.api.serialization import FastJSONResponse
+from app import exposure, rankings
+
+router = APIRouter()
+
+# Most meal plans, and meal plan items across them, evaluated in one request
+MAX_EXPOSURE_PLANS = 10_000
+MAX_EXPOSURE_ITEMS = 200_000
+
+
+@router.post("", response_model=schemas.ExposureResult)
+async def calculate_exposure(
+    request: schemas.ExposureRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Weekly contaminant dose of each meal plan, and its share of the reference dose
+
+    Each plan is a body weight plus foods (slug or id) with servings per week and
+    portion size. Doses are in µg per kg body weight per week; the reference is
+    the contaminant's acceptable daily intake x 7 (EPA reference dose for mercury
+    and PCBs when none is stored). Foods that don't exist contribute nothing and
+    are listed in `unknown_foods`.
+
+    Up to 10,000 plans per request.
+    """
+    plans = request.plans
+    if len(plans) > MAX_EXPOSURE_PLANS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many meal plans ({len(plans)}); at most {MAX_EXPOSURE_PLANS} per request"
+        )
+    item_count = sum(len(plan.items) for plan in plans)
+    if item_count > MAX_EXPOSURE_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many meal plan items ({item_count}); at most {MAX_EXPOSURE_ITEMS} per request"
+        )
+
+    identifiers = {item.food for plan in plans for item in plan.items}
+    food_ids = await exposure.resolve_foods(db, identifiers)
+    table = await exposure.load_concentrations(db, food_ids.values())
+    exposures = exposure.evaluate_plans(plans, table, food_ids)
+
+    return FastJSONResponse({
+        "plans": exposure.plan_results(plans, exposures),
+        "unknown_foods": sorted(identifiers - food_ids.keys()),
+    })
+
+
+@router.post("/meal-plan", response_model=schemas.OptimizedMealPlan)
+async def optimize_meal_plan(
+    request: schemas.MealPlanOptimizeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Weekly seafood servings that maximize omega-3 (or ranking score) under a mercury budget
+
+    The budget is **mercury_budget_percent** of the methylmercury reference dose
+    for **body_weight_kg**. Species under an advisory in any of **avoid_states**
+    are left out, and no species gets more than **max_servings_per_species**.
+    """
+    matrix = rankings.feature_matrix()
+    if not matrix.ready:
+        matrix = await rankings.ensure_feature_matrix()
+
+    excluded_foods = set()
+    if request.avoid_states:
+        result = await db.execute(
+            select(models.StateAdvisory.food_id)
+            .where(
+                models.StateAdvisory.state_code.in_([state.upper() for state in request.avoid_states]),
+                models.StateAdvisory.food_id.is_not(None),
+            )
+            .distinct()
+        )
+        excluded_foods = set(result.scalars().all())
+
+    # Same reference dose /exposure compares against: the stored ADI when there is one
+    mercury_rfd = await exposure.reference_dose(db, "Mercury")
+    budget_ug = exposure.mercury_budget_ug(request.body_weight_kg, request.mercury_budget_percent, mercury_rfd)
+    groups = exposure.species_groups(
+        matrix.rows, request.objective, categories=set(request.categories), excluded_foods=excluded_foods
+    )
+    plan = exposure.optimize_meal_plan(
+        groups,
+        request.objective,
+        budget_ug,
+        max_servings=request.servings_per_week,
+        max_per_species=request.max_servings_per_species,
+        portion_g=request.portion_g,
+    )
+
+    return schemas.OptimizedMealPlan(
+        objective=request.objective,
+        body_weight_kg=request.body_weight_kg,
+        mercury_budget_ug=round(budget_ug, 2),
+        mercury_ug=round(plan.mercury_ug, 2),
+        percent_of_budget=round(100 * plan.mercury_ug / budget_ug, 1),
+        total_value=round(plan.value, 2),
+        servings=plan.servings,
+        plan=[
+            schemas.PlannedServing(
+                food_id=choice.row.food_id,
+                name=choice.row.name,
+                slug=choice.row.slug,
+                servings=choice.servings,
+                mercury_ug=round(choice.mercury_ug, 2),
+                value=round(choice.value, 2),
+            )
+            for choice in plan.choices
+        ]
+    )
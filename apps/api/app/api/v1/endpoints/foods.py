@@ -1,117 +1,284 @@
 """
 Food endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, or_
 from typing import List
 from uuid import UUID
+import logging
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.db import models, schemas
+from app.api.pagination import decode_cursor, encode_cursor, keyset_after
+from app.api.projection import FoodProjection, SUMMARY_INCLUDE
+from app.api.documents import document_response, fetch_document, store_documents
+from app.api.serialization import FastJSONResponse, food_shape
+from app.api.comparison import COMPARE_PROJECTION, MAX_COMPARE_FOODS, build_comparison
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Most identifiers accepted by POST /foods/batch in one request
+MAX_BATCH_SIZE = 500
+
+FIELDS_DESCRIPTION = "Comma-separated scalar fields to return (default: all)"
+INCLUDE_DESCRIPTION = (
+    "Comma-separated relationships to load: category, contaminant_levels, nutrients, "
+    "advisories, sustainability_ratings"
+)
+
+
 @router.get("", response_model=List[schemas.Food])
 async def list_foods(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category: str | None = None,
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page (replaces skip)"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION + " (default: category)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     List all foods with optional filtering
+
+    Foods are ordered by name. The token for the next page is returned in the
+    `X-Next-Cursor` header; pass it back as `cursor` for keyset pagination.
     """
-    # Use selectinload for relationships to avoid join conflicts and Greenlet errors
-    query = select(models.Food).options(selectinload(models.Food.category))
+    after = decode_cursor("foods", cursor, 2)
+    projection = FoodProjection.parse(fields, include, default_include=SUMMARY_INCLUDE)
+
+    # Without collections, rows can skip the ORM and response_model validation
+    fast = settings.FAST_SERIALIZATION and projection.include <= SUMMARY_INCLUDE
+    if fast:
+        shape = food_shape(projection.fields, projection.include)
+        query = select(*shape.columns).select_from(models.Food)
+        if category or "category" in projection.include:
+            query = query.outerjoin(models.Food.category)
+    else:
+        # The cursor needs name and id even when fields= leaves them out of the response
+        query = select(models.Food).options(*projection.with_fields("id", "name").loader_options())
+        if category:
+            # Explicit join for filtering
+            query = query.join(models.Food.category)
 
     if category:
-        # Explicit join for filtering
-        query = query.join(models.Food.category).where(models.FoodCategory.slug == category)
+        query = query.where(models.FoodCategory.slug == category)
+
+    query = query.order_by(models.Food.name, models.Food.id)
+    if after is not None:
+        query = query.where(keyset_after((models.Food.name, models.Food.id), after))
+    else:
+        query = query.offset(skip)
+    # One extra row tells us whether another page follows
+    query = query.limit(limit + 1)
 
-    query = query.offset(skip).limit(limit)
-    
     try:
         result = await db.execute(query)
-        # With selectinload, scalars().all() is usually sufficient, but unique() doesn't hurt
-        foods = result.unique().scalars().all()
-        return foods
+        if fast:
+            rows = result.all()
+            headers = {}
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                key = (last[shape.names.index("name")], last[shape.names.index("id")])
+                headers["X-Next-Cursor"] = encode_cursor("foods", key)
+            return FastJSONResponse(shape.build_all(rows), headers=headers)
+
+        foods = result.scalars().all()
+        headers = {}
+        if len(foods) > limit:
+            foods = foods[:limit]
+            headers["X-Next-Cursor"] = encode_cursor("foods", (foods[-1].name, foods[-1].id))
+        return projection.response(list(foods), headers=headers)
     except Exception as e:
-        print(f"Error listing foods: {e}")
+        logger.error(f"Error listing foods: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{food_id}", response_model=schemas.FoodDetail)
-async def get_food(
-    food_id: UUID,
+@router.post("/batch", response_model=schemas.FoodBatchResult)
+async def get_foods_batch(
+    batch: schemas.FoodBatchRequest,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION + " (default: category)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get detailed information about a specific food
+    Look up many foods at once by id, slug and/or barcode
+
+    All identifiers are resolved in one query (plus one per included collection).
+    Results are keyed by the identifier as sent; unknown identifiers map to `null`.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    slugs = list(dict.fromkeys(batch.slugs))
+    barcodes = list(dict.fromkeys(batch.barcodes))
+    requested = len(ids) + len(slugs) + len(barcodes)
+    if requested > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many identifiers ({requested}); at most {MAX_BATCH_SIZE} per request"
+        )
+
+    projection = FoodProjection.parse(fields, include, default_include=SUMMARY_INCLUDE)
+    foods = []
+    if requested:
+        # Matching needs these columns even when fields= leaves them out of the response
+        loading = projection.with_fields("id", "slug", "barcode")
+        conditions = []
+        if ids:
+            conditions.append(models.Food.id.in_(ids))
+        if slugs:
+            conditions.append(models.Food.slug.in_(slugs))
+        if barcodes:
+            conditions.append(models.Food.barcode.in_(barcodes))
+        query = (
+            select(models.Food)
+            .where(or_(*conditions))
+            .options(*loading.loader_options())
+            .order_by(models.Food.name, models.Food.id)
+        )
+        foods = (await db.execute(query)).scalars().all()
+
+    by_id = {food.id: food for food in foods}
+    by_slug = {food.slug: food for food in foods}
+    by_barcode = {}
+    for food in foods:
+        # Barcodes aren't unique; the first food by name wins
+        by_barcode.setdefault(food.barcode, food)
+
+    def resolve(keys, index):
+        return {str(key): projection.serialize(index[key]) if key in index else None for key in keys}
+
+    body = {
+        "ids": resolve(ids, by_id),
+        "slugs": resolve(slugs, by_slug),
+        "barcodes": resolve(barcodes, by_barcode),
+    }
+    found = sum(value is not None for group in body.values() for value in group.values())
+    return JSONResponse({**body, "found": found, "missing": requested - found})
+
+
+@router.get("/compare", response_model=schemas.FoodComparison)
+async def compare_foods(
+    slugs: str = Query(..., description=f"Comma-separated food slugs (at most {MAX_COMPARE_FOODS})"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compare foods side by side
+
+    Returns contaminants and nutrients as rows and the foods as columns, in the
+    order requested: `values[i]` of every row belongs to `foods[i]` (`null` when
+    that food has no data). Loaded in a fixed three queries however many foods.
     """
-    query = select(models.Food).where(models.Food.id == food_id).options(
-        joinedload(models.Food.category),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.contaminant),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.source),
-        joinedload(models.Food.nutrients).joinedload(models.FoodNutrient.source),
-        selectinload(models.Food.advisories),
-        selectinload(models.Food.sustainability_ratings)
+    requested = list(dict.fromkeys(s.strip() for s in slugs.split(",") if s.strip()))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No food slugs given")
+    if len(requested) > MAX_COMPARE_FOODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many foods ({len(requested)}); at most {MAX_COMPARE_FOODS} can be compared"
+        )
+
+    result = await db.execute(
+        select(models.Food)
+        .where(models.Food.slug.in_(requested))
+        .options(*COMPARE_PROJECTION.loader_options())
+    )
+    by_slug = {food.slug: food for food in result.scalars().all()}
+    if not by_slug:
+        raise HTTPException(status_code=404, detail="Foods not found")
+
+    comparison = build_comparison([by_slug[slug] for slug in requested if slug in by_slug])
+    comparison["missing"] = [slug for slug in requested if slug not in by_slug]
+    return comparison
+
+
+async def _get_food_detail(
+    request: Request,
+    db: AsyncSession,
+    where,
+    fields: str | None,
+    include: str | None,
+    not_found: str
+):
+    """
+    Serve one food's detail
+
+    The default (full) view comes from the materialized document with an ETag;
+    fields=/include= projections are loaded and serialized on demand.
+    """
+    projection = FoodProjection.parse(fields, include)
+    full_view = fields is None and include is None
+
+    if full_view:
+        document = await fetch_document(db, where)
+        if document:
+            return document_response(request, *document)
+
+    # Barcodes aren't unique; the first food by name wins, as in fetch_document and /foods/batch
+    query = (
+        select(models.Food)
+        .where(where)
+        .options(*projection.loader_options())
+        .order_by(models.Food.name, models.Food.id)
+        .limit(1)
     )
     result = await db.execute(query)
-    food = result.unique().scalar_one_or_none()
+    food = result.scalars().first()
 
     if not food:
-        raise HTTPException(status_code=404, detail="Food not found")
+        raise HTTPException(status_code=404, detail=not_found)
 
-    return food
+    if full_view:
+        # No document yet (e.g. a food imported since the last ingest): store one
+        [(_, body, etag)] = await store_documents(db, [food])
+        return document_response(request, body, etag)
+
+    return projection.response(food)
+
+
+@router.get("/{food_id}", response_model=schemas.FoodDetail)
+async def get_food(
+    food_id: UUID,
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION + " (default: all)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get detailed information about a specific food
+    """
+    return await _get_food_detail(request, db, models.Food.id == food_id, fields, include, "Food not found")
 
 
 @router.get("/slug/{slug}", response_model=schemas.FoodDetail)
 async def get_food_by_slug(
     slug: str,
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION + " (default: all)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get food by slug (URL-friendly identifier)
     """
-    query = select(models.Food).where(models.Food.slug == slug).options(
-        joinedload(models.Food.category),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.contaminant),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.source),
-        joinedload(models.Food.nutrients).joinedload(models.FoodNutrient.source),
-        selectinload(models.Food.advisories),
-        selectinload(models.Food.sustainability_ratings)
-    )
-    result = await db.execute(query)
-    food = result.unique().scalar_one_or_none()
-
-    if not food:
-        raise HTTPException(status_code=404, detail="Food not found")
-
-    return food
+    return await _get_food_detail(request, db, models.Food.slug == slug, fields, include, "Food not found")
 
 
 @router.get("/barcode/{barcode}", response_model=schemas.FoodDetail)
 async def get_food_by_barcode(
     barcode: str,
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION + " (default: all)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Look up food by barcode (UPC/EAN)
     """
-    query = select(models.Food).where(models.Food.barcode == barcode).options(
-        joinedload(models.Food.category),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.contaminant),
-        joinedload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.source),
-        joinedload(models.Food.nutrients).joinedload(models.FoodNutrient.source),
-        selectinload(models.Food.advisories),
-        selectinload(models.Food.sustainability_ratings)
+    return await _get_food_detail(
+        request, db, models.Food.barcode == barcode, fields, include, "Food not found for this barcode"
     )
-    result = await db.execute(query)
-    food = result.unique().scalar_one_or_none()
-
-    if not food:
-        raise HTTPException(status_code=404, detail="Food not found for this barcode")
-
-    return food
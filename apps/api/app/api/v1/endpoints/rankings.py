@@ -0,0 +1,107 @@
+"""
+Ranking endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from uuid import UUID
+
+from app.db.session import get_db
+from app.db import models, schemas
+from app import rankings
+
+router = APIRouter()
+
+
+@router.get("", response_model=schemas.RankingList)
+async def get_rankings(
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = Query(None, description="Category slug, e.g. 'seafood'"),
+    state: Optional[str] = Query(None, min_length=2, max_length=2, description="State code; applies its advisories"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Best-scoring foods, overall or within a category
+
+    Scores (0-100) combine mercury/contaminant safety, sustainability and omega-3
+    content. With **state**, foods under that state's consumption advisories are
+    demoted by their advisory penalty.
+    """
+    ranked = await rankings.top_rankings(db, limit, category_slug=category, state=state)
+    return schemas.RankingList(
+        category=category,
+        state=state.upper() if state else None,
+        rankings=[
+            schemas.RankingEntry(
+                rank=entry.rank,
+                score=round(entry.score, 2),
+                national_rank=entry.national_rank,
+                food_id=entry.ranking.food_id,
+                name=entry.name,
+                slug=entry.slug,
+                components=schemas.RankingComponents.model_validate(entry.ranking),
+                state_penalty=entry.state_penalty,
+            )
+            for entry in ranked
+        ]
+    )
+
+
+@router.get("/personalized", response_model=schemas.RankingList)
+async def get_personalized_rankings(
+    profile: Optional[Literal[tuple(rankings.PROFILES)]] = Query(
+        None, description="Ranking profile (default: the user's saved profile, else 'default')"
+    ),
+    user_id: Optional[UUID] = Query(
+        None, description="Use this user's preferences (ranking_profile / ranking_weights)"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = Query(None, description="Category slug, e.g. 'seafood'"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Foods ranked for a profile, e.g. pregnant, child, sustainability_first or omega3_first
+
+    A user's `preferences` may hold `ranking_profile` and/or `ranking_weights`
+    (feature -> weight over safety, strict_mercury, sustainability, omega3);
+    an explicit **profile** wins over the saved one.
+    """
+    preferences = {}
+    if user_id:
+        user = await db.get(models.User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        preferences = user.preferences or {}
+
+    name = profile or preferences.get("ranking_profile") or "default"
+    if name not in rankings.PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown ranking profile: {name}")
+    weights = rankings.PROFILES[name]
+    if not profile and preferences.get("ranking_weights"):
+        name, weights = "custom", preferences["ranking_weights"]
+    try:
+        vector = rankings.weight_vector(weights)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    matrix = rankings.feature_matrix()
+    if not matrix.ready:
+        matrix = await rankings.ensure_feature_matrix()
+
+    return schemas.RankingList(
+        category=category,
+        profile=name,
+        weights=dict(zip(rankings.FEATURES, vector)),
+        rankings=[
+            schemas.RankingEntry(
+                rank=position,
+                score=round(score, 2),
+                national_rank=row.national_rank,
+                food_id=row.food_id,
+                name=row.name,
+                slug=row.slug,
+                components=schemas.RankingComponents.model_validate(row.ranking),
+            )
+            for position, (row, score) in enumerate(matrix.top(vector, limit, category=category), start=1)
+        ]
+    )
@@ -1,22 +1,126 @@
 """
 API endpoints for food recalls
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, or_
-from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy import ColumnElement, select, desc, func, or_, and_, tuple_
+from typing import Dict, List, Literal, Optional
+from datetime import datetime, timedelta, timezone
+import asyncio
 import logging
 
 from app.db.session import get_db
 from app.db.models import FoodRecall
 from app.schemas.recalls import RecallResponse, RecallListResponse, RecallCreate
 from app.core.config import settings
+from app.core.cache import normalize_query, result_cache
+from app.api.pagination import decode_cursor, encode_cursor, keyset_before
+from app.api.serialization import FastJSONResponse, RECALL_SHAPE
+from app.recalls import recall_broadcaster, recall_summary, recall_timeseries
+from app.search import fulltext
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Recall listings are ordered newest first; undated recalls go last
+RECALL_ORDER = (FoodRecall.recall_date.desc().nulls_last(), FoodRecall.id.desc())
+
+
+# Filters whose per-value counts /recalls can return as facets
+RECALL_FACETS = ("classification", "state", "status")
+
+
+def recall_filters(
+    classification: Optional[str] = None,
+    state: Optional[str] = None,
+    status: Optional[str] = None,
+    days: Optional[int] = None,
+) -> Dict[str, ColumnElement]:
+    """WHERE clauses for the /recalls filters, keyed by filter name"""
+    filters = {}
+    if classification:
+        filters["classification"] = FoodRecall.classification == classification
+    if state:
+        filters["state"] = FoodRecall.state == state.upper()
+    if status:
+        filters["status"] = FoodRecall.status == status
+    if days:
+        filters["days"] = FoodRecall.recall_date >= datetime.now() - timedelta(days=days)
+    return filters
+
+
+def _count_where(clauses: list):
+    return func.count().filter(and_(*clauses)) if clauses else func.count()
+
+
+def recall_facets_query(filters: Dict[str, ColumnElement]):
+    """
+    Total plus per-value counts of every facet in one grouped query
+
+    Each row belongs to one grouping set; ``grouping()`` has a 1 bit for every
+    facet column that was *not* grouped in it, so the column whose bit is 0
+    names the facet and all-ones is the total. Facets are counted the usual
+    way for filter badges: each one with every filter applied except its own
+    (one ``count(*) FILTER (WHERE ...)`` per facet), so a chosen classification
+    still shows the counts of the other classifications.
+    """
+    columns = [getattr(FoodRecall, name) for name in RECALL_FACETS]
+    shared = [clause for name, clause in filters.items() if name not in RECALL_FACETS]
+    facet_filters = {name: clause for name, clause in filters.items() if name in RECALL_FACETS}
+    counts = [_count_where(list(facet_filters.values()))] + [
+        _count_where([clause for other, clause in facet_filters.items() if other != name])
+        for name in RECALL_FACETS
+    ]
+    return (
+        select(func.grouping(*columns), *columns, *counts)
+        .where(*shared)
+        .group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+    )
+
+
+async def count_recalls(db: AsyncSession, filters: Dict[str, ColumnElement], facets: bool) -> dict:
+    """``{"total": ..., "facets": ...}`` for the filtered recalls, counted in the database"""
+    if not facets:
+        total = await db.scalar(select(func.count()).select_from(FoodRecall).where(*filters.values()))
+        return {"total": total, "facets": None}
+
+    everything = (1 << len(RECALL_FACETS)) - 1
+    total = 0
+    counts = {name: {} for name in RECALL_FACETS}
+    for row in (await db.execute(recall_facets_query(filters))).all():
+        grouping = row[0]
+        values = row[1:1 + len(RECALL_FACETS)]
+        total_count, *facet_counts = row[1 + len(RECALL_FACETS):]
+        if grouping == everything:
+            total = total_count
+            continue
+        for position, name in enumerate(RECALL_FACETS):
+            # grouping() lists its arguments most significant bit first
+            count = facet_counts[position]
+            if count and not grouping & (1 << (len(RECALL_FACETS) - 1 - position)):
+                value = values[position] or "Unknown"
+                counts[name][value] = counts[name].get(value, 0) + count
+    return {
+        "total": total,
+        "facets": {
+            name: dict(sorted(by_value.items(), key=lambda item: (-item[1], item[0])))
+            for name, by_value in counts.items()
+        },
+    }
+
+
+def recalls_after(after):
+    """WHERE clause for recalls sorting after a ``(recall_date, id)`` keyset cursor"""
+    after_date, after_id = after
+    if after_date is None:
+        return and_(FoodRecall.recall_date.is_(None), FoodRecall.id < after_id)
+    return or_(
+        keyset_before((FoodRecall.recall_date, FoodRecall.id), after),
+        FoodRecall.recall_date.is_(None)
+    )
+
 
 @router.get("/", response_model=RecallListResponse)
 async def get_recalls(
@@ -26,6 +130,8 @@ async def get_recalls(
     state: Optional[str] = Query(None, description="Filter by state code"),
     status: Optional[str] = Query(None, description="Filter by status"),
     days: Optional[int] = Query(None, ge=1, le=365, description="Recalls from last N days"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces skip)"),
+    facets: bool = Query(False, description="Also return counts per classification, state and status"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -37,42 +143,65 @@ async def get_recalls(
     - **state**: Filter by US state code (e.g., 'CA', 'NY')
     - **status**: Filter by recall status
     - **days**: Only show recalls from last N days
+    - **cursor**: Keyset pagination token; pass `next_cursor` from the previous response
+    - **facets**: Include recall counts per classification, state and status among the
+      filtered recalls (e.g. for filter badges)
     """
-    try:
-        # Build query
-        query = select(FoodRecall).order_by(desc(FoodRecall.recall_date))
-
-        # Apply filters
-        if classification:
-            query = query.where(FoodRecall.classification == classification)
-
-        if state:
-            query = query.where(FoodRecall.state == state.upper())
-
-        if status:
-            query = query.where(FoodRecall.status == status)
+    after = decode_cursor("recalls", cursor, 2)
 
-        if days:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            query = query.where(FoodRecall.recall_date >= cutoff_date)
-
-        # Get total count
-        count_query = select(FoodRecall).where(*query.whereclause.clauses if hasattr(query.whereclause, 'clauses') else [])
-        total_result = await db.execute(count_query)
-        total = len(total_result.scalars().all())
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+    try:
+        # Build query (plain column rows on the fast serialization path)
+        fast = settings.FAST_SERIALIZATION
+        query = select(*RECALL_SHAPE.columns) if fast else select(FoodRecall)
+        query = query.order_by(*RECALL_ORDER)
+
+        filters = recall_filters(classification, state, status, days)
+        query = query.where(*filters.values())
+
+        # Counts are the same for every page, so they're cached briefly
+        cached = await result_cache.lookup(
+            "recall_counts", ("food_recalls",),
+            classification=classification, state=state and state.upper(), status=status, days=days, facets=facets,
+        )
+        if cached.hit:
+            counts = cached.json()
+        else:
+            counts = await count_recalls(db, filters, facets)
+            await result_cache.put(cached, counts, ttl=settings.RECALL_COUNT_CACHE_TTL)
+
+        # Apply pagination (one extra row tells us whether another page follows)
+        if after is not None:
+            query = query.where(recalls_after(after))
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit + 1)
 
         # Execute query
         result = await db.execute(query)
-        recalls = result.scalars().all()
+        recalls = result.all() if fast else result.scalars().all()
+
+        next_cursor = None
+        if len(recalls) > limit:
+            recalls = recalls[:limit]
+            next_cursor = encode_cursor("recalls", (recalls[-1].recall_date, recalls[-1].id))
+
+        if fast:
+            return FastJSONResponse({
+                "recalls": RECALL_SHAPE.build_all(recalls),
+                "total": counts["total"],
+                "skip": skip,
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "facets": counts["facets"]
+            })
 
         return {
             "recalls": recalls,
-            "total": total,
+            "total": counts["total"],
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "facets": counts["facets"]
         }
 
     except Exception as e:
@@ -147,37 +276,74 @@ async def search_recalls(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search recalls by product name or company
+    Full-text search over product description, company and recall reason
+
+    Results are ranked by relevance (product matches first), newest first on ties.
 
-    - **q**: Search query (minimum 2 characters)
+    - **q**: Search query (minimum 2 characters); supports "quoted phrases", OR and -exclusions
     - **limit**: Maximum number of results
     """
     try:
-        search_term = f"%{q}%"
-
-        query = (
-            select(FoodRecall)
-            .where(
-                or_(
-                    FoodRecall.product_description.ilike(search_term),
-                    FoodRecall.company_name.ilike(search_term),
-                    FoodRecall.reason_for_recall.ilike(search_term)
-                )
-            )
-            .order_by(desc(FoodRecall.recall_date))
-            .limit(limit)
-        )
+        cached = await result_cache.lookup("recalls_search", ("food_recalls",), q=normalize_query(q), limit=limit)
+        if cached.hit:
+            return cached.response()
 
-        result = await db.execute(query)
+        result = await db.execute(fulltext.recall_search_query(q, limit))
         recalls = result.scalars().all()
 
-        return recalls
+        return await result_cache.store(
+            cached, [RecallResponse.model_validate(r) for r in recalls], ttl=settings.SEARCH_CACHE_TTL
+        )
 
     except Exception as e:
         logger.error(f"Error searching recalls: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stream")
+async def stream_recalls(
+    request: Request,
+    classification: Optional[str] = Query(None, description="Only recalls of this classification (Class I, II, or III)"),
+    state: Optional[str] = Query(None, description="Only recalls from this state code"),
+):
+    """
+    Server-Sent Events stream of newly ingested recalls
+
+    Each recall arrives as an `event: recall` message whose data is the recall
+    JSON (same shape as /recalls/recent). Comment lines are sent as keepalives.
+    The stream carries only recalls ingested after connecting; use
+    /recalls/recent to backfill after a reconnect.
+    """
+    broadcaster = recall_broadcaster()
+    try:
+        subscription = broadcaster.subscribe(classification, state)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def events():
+        try:
+            yield b"retry: 5000\n: connected\n\n"
+            while not subscription.dropped:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.RECALL_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keepalive\n\n"
+                    continue
+                yield event.message
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{recall_number}", response_model=RecallResponse)
 async def get_recall(
     recall_number: str,
@@ -213,53 +379,42 @@ async def get_recall_stats(
     """
     Get recall statistics for the last N days
 
-    - **days**: Number of days to analyze
+    - **days**: Number of days to analyze (whole UTC days, from the daily rollup)
     """
     try:
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        # Get all recalls in time period
-        query = select(FoodRecall).where(FoodRecall.recall_date >= cutoff_date)
-        result = await db.execute(query)
-        recalls = result.scalars().all()
-
-        # Calculate statistics
-        total_recalls = len(recalls)
-
-        classification_counts = {
-            "Class I": 0,
-            "Class II": 0,
-            "Class III": 0
-        }
-
-        status_counts = {}
-        state_counts = {}
+        return await recall_summary(db, days)
 
-        for recall in recalls:
-            # Count by classification
-            if recall.classification in classification_counts:
-                classification_counts[recall.classification] += 1
+    except Exception as e:
+        logger.error(f"Error calculating recall stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Count by status
-            status = recall.status or "Unknown"
-            status_counts[status] = status_counts.get(status, 0) + 1
 
-            # Count by state
-            if recall.state:
-                state_counts[recall.state] = state_counts.get(recall.state, 0) + 1
+@router.get("/stats/timeseries")
+async def get_recall_timeseries(
+    bucket: Literal["week", "month", "quarter", "year"] = Query("month"),
+    by: Optional[Literal["classification", "status", "state"]] = Query(
+        None, description="Split counts into one series per value"
+    ),
+    days: int = Query(365, ge=1, le=3650, description="Window in days (up to 10 years)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recall counts per week, month, quarter or year
 
-        # Top states
-        top_states = sorted(state_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    `buckets` lists each bucket's first day (the first one may start before the
+    window); `totals` and every list in `series` line up with it, zeros included.
+    """
+    try:
+        today = datetime.now(timezone.utc).date()
+        cached = await result_cache.lookup(
+            "recall_timeseries", ("food_recalls",), bucket=bucket, by=by, days=days, today=today
+        )
+        if cached.hit:
+            return cached.response()
 
-        return {
-            "period_days": days,
-            "total_recalls": total_recalls,
-            "by_classification": classification_counts,
-            "by_status": status_counts,
-            "top_states": dict(top_states),
-            "critical_recalls": classification_counts["Class I"]
-        }
+        timeseries = await recall_timeseries(db, bucket, by, days)
+        return await result_cache.store(cached, timeseries, ttl=settings.RECALL_TIMESERIES_CACHE_TTL)
 
     except Exception as e:
-        logger.error(f"Error calculating recall stats: {e}")
+        logger.error(f"Error calculating recall time series: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -6,8 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.db import models, schemas
+from app.api.serialization import FastJSONResponse, PAPER_SHAPE
 
 router = APIRouter()
 
@@ -18,7 +20,12 @@ async def list_research_papers(
     """
     List all research papers
     """
-    query = select(models.ResearchPaper).order_by(models.ResearchPaper.publication_date.desc())
+    order = models.ResearchPaper.publication_date.desc()
+    if settings.FAST_SERIALIZATION:
+        result = await db.execute(select(*PAPER_SHAPE.columns).order_by(order))
+        return FastJSONResponse(PAPER_SHAPE.build_all(result.all()))
+
+    query = select(models.ResearchPaper).order_by(order)
     result = await db.execute(query)
     papers = result.scalars().all()
     
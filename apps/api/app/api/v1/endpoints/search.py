@@ -1,56 +1,127 @@
 """
 Search endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from sqlalchemy.orm import selectinload, joinedload
-from typing import List
+from typing import Literal, Optional
 
+from app.core.cache import normalize_query, result_cache
+from app.core.config import settings
 from app.db.session import get_db
-from app.db import models, schemas
+from app.db import schemas
+from app import search
+from app.api.pagination import cursor_kind, decode_cursor, encode_cursor
+from app.search import fulltext
 
 router = APIRouter()
 
+# Tables whose changes invalidate cached food search results
+FOOD_SEARCH_TABLES = ("foods", "food_categories", "species")
+
 @router.get("", response_model=schemas.FoodSearchResult)
 async def search_foods(
     q: str = Query(..., description="Search query", min_length=1),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    mode: Optional[Literal["bm25", "trigram", "substring"]] = Query(
+        None, description="Search backend (defaults to the server setting)"
+    ),
+    min_similarity: float | None = Query(
+        None, ge=0, le=1, description="Trigram word-similarity threshold (lower tolerates more typos)"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces offset)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search foods by name using full-text search
+    Search foods by name, common names and description
+
+    - **mode**: `bm25` ranks with the in-process index, `trigram` with pg_trgm similarity,
+      `substring` keeps the legacy ILIKE behaviour
+    - **min_similarity**: Typo tolerance for trigram mode (default from settings)
+    - **cursor**: Keyset pagination token; pass `next_cursor` from the previous response
     """
-    # Build search query - case-insensitive LIKE search
-    search_term = f"%{q}%"
+    # BM25 hands off to trigram while its index builds; cursors and cached pages belong to the backend that served them
+    issued_by = (cursor_kind(cursor) or "").partition("search:")[2] or None
+    backend = search.get_backend(mode or settings.SEARCH_BACKEND).serving(issued_by)
+    # Substring results are ordered by (name, id); ranked backends by (score, name, id)
+    after = decode_cursor(f"search:{backend.name}", cursor, 2 if backend.name == "substring" else 3)
+
+    cached = await result_cache.lookup(
+        "search", FOOD_SEARCH_TABLES,
+        q=normalize_query(q), limit=limit, offset=offset, mode=backend.name,
+        min_similarity=min_similarity, cursor=cursor
+    )
+    if cached.hit:
+        return cached.response()
 
-    # Count total matches
-    count_query = select(func.count()).select_from(models.Food).where(
-        or_(
-            models.Food.name.ilike(search_term),
-            func.array_to_string(models.Food.common_names, ',').ilike(search_term)
-        )
+    page = await backend.search(
+        db, q, limit=limit, offset=offset, min_similarity=min_similarity, after=after
     )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
-
-    # Get paginated results
-    query = select(models.Food).options(
-        joinedload(models.Food.category),
-        selectinload(models.Food.contaminant_levels).joinedload(models.FoodContaminantLevel.contaminant),
-        selectinload(models.Food.nutrients)
-    ).where(
-        or_(
-            models.Food.name.ilike(search_term),
-            func.array_to_string(models.Food.common_names, ',').ilike(search_term)
-        )
-    ).offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    foods = result.scalars().all()
-
-    return schemas.FoodSearchResult(
-        total=total,
-        foods=foods
+
+    result = schemas.FoodSearchResult(
+        total=page.total,
+        foods=page.foods,
+        next_cursor=encode_cursor(f"search:{page.backend}", page.next_after) if page.next_after else None
+    )
+    return await result_cache.store(cached, result, ttl=settings.SEARCH_CACHE_TTL)
+
+
+@router.get("/cache/stats")
+async def search_cache_stats():
+    """
+    Hit/miss counters of the search result cache, per endpoint
+    """
+    return {"enabled": result_cache.available, "namespaces": await result_cache.stats()}
+
+
+@router.get("/suggest", response_model=schemas.SuggestResult)
+async def suggest(
+    q: str = Query(..., description="Prefix typed so far", min_length=1),
+    limit: int = Query(8, ge=1, le=25),
+    kind: Optional[Literal["food", "company"]] = Query(None, description="Only suggest this kind"),
+):
+    """
+    Typeahead completions for food names, common names and recalling companies
+
+    Served from an in-memory prefix index ranked by popularity; no database access.
+    """
+    index = search.suggest_index()
+    if not index.ready:
+        index = await search.ensure_suggest_index()
+
+    return schemas.SuggestResult(
+        query=q,
+        suggestions=[schemas.Suggestion.model_validate(s) for s in index.complete(q, k=limit, kind=kind)]
+    )
+
+
+@router.get("/all", response_model=schemas.UnifiedSearchResult)
+async def search_all(
+    q: str = Query(..., description="Search query (web-search syntax: \"phrases\", -exclude, or)", min_length=2),
+    types: Optional[str] = Query(None, description="Comma-separated subset of: foods, recalls, advisories, papers"),
+    limit: int = Query(5, ge=1, le=50, description="Maximum hits per type"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search across foods, recalls, state advisories and research papers
+
+    Results are ranked with `ts_rank` and grouped by type; all types are fetched in one query.
+    """
+    selected = fulltext.ENTITY_TYPES
+    if types:
+        selected = tuple(t.strip() for t in types.split(",") if t.strip())
+        unknown = set(selected) - set(fulltext.ENTITY_TYPES)
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown types: {', '.join(sorted(unknown))}. Allowed: {', '.join(fulltext.ENTITY_TYPES)}"
+            )
+
+    result = await db.execute(fulltext.unified_query(q, types=selected, limit=limit))
+    groups = fulltext.group_hits(result.all())
+
+    return schemas.UnifiedSearchResult(
+        query=q,
+        total=sum(group["total"] for group in groups.values()),
+        groups={t: groups.get(t, {"total": 0, "hits": []}) for t in selected}
     )
@@ -3,7 +3,7 @@ API v1 router - aggregates all endpoint routers
 """
 from fastapi import APIRouter
 from app.api.v1.endpoints import foods, search, categories, recalls, barcode
-from app.api.v1.endpoints import foods, search, categories, sources, research
+from app.api.v1.endpoints import foods, search, categories, sources, research, export, rankings, exposure
 
 api_router = APIRouter()
 
@@ -14,3 +14,6 @@ api_router.include_router(recalls.router, prefix="/recalls", tags=["recalls"])
 api_router.include_router(barcode.router, prefix="/barcode", tags=["barcode"])
 api_router.include_router(sources.router, prefix="/sources", tags=["sources"])
 api_router.include_router(research.router, prefix="/research", tags=["research"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(rankings.router, prefix="/rankings", tags=["rankings"])
+api_router.include_router(exposure.router, prefix="/exposure", tags=["exposure"])
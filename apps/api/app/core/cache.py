@@ -0,0 +1,188 @@
+"""
+Redis-backed result cache for read-heavy search endpoints
+
+Entries are keyed on the endpoint, its normalized parameters and the current
+version of every table the result was built from. Ingest scripts call
+``bump_versions`` with the tables they wrote, so stale entries simply stop
+being addressed and age out through their TTL.
+
+Redis is optional: if it cannot be reached the cache turns itself off for
+``CACHE_RETRY_SECONDS`` and endpoints fall through to the database.
+
+``LRUCache`` is a small in-process cache with per-entry TTLs, for values
+worth keeping in front of Redis (see app.api.openfoodfacts).
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+
+
+def normalize_query(q: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return " ".join(q.lower().split())
+
+
+def version_key(table: str) -> str:
+    return f"{KEY_PREFIX}:version:{table}"
+
+
+@dataclass
+class CacheLookup:
+    """Result of ``ResultCache.lookup``; ``value`` is the cached JSON body on a hit"""
+    namespace: str
+    key: Optional[str]
+    value: Optional[bytes] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.value is not None
+
+    def response(self) -> Response:
+        return Response(content=self.value, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    def json(self) -> Any:
+        return json.loads(self.value)
+
+
+class ResultCache:
+    """Versioned JSON result cache with hit/miss counters"""
+
+    def __init__(self, url: str, enabled: bool = True, client=None):
+        self.url = url
+        self.enabled = enabled
+        self._client = client
+        self._down_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.from_url(self.url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _failed(self, e: Exception) -> None:
+        logger.warning(f"Result cache unavailable, bypassing for {settings.CACHE_RETRY_SECONDS}s: {e}")
+        self._down_until = time.monotonic() + settings.CACHE_RETRY_SECONDS
+
+    async def lookup(self, namespace: str, tables: Sequence[str], **params: Any) -> CacheLookup:
+        """Find the cached result for ``params`` at the current ``tables`` versions"""
+        if not self.available:
+            return CacheLookup(namespace, None)
+        try:
+            versions = await self.client.mget([version_key(t) for t in tables]) if tables else []
+            key = self.make_key(namespace, params, [int(v or 0) for v in versions])
+            value = await self.client.get(key)
+            await self.client.hincrby(STATS_KEY, f"{namespace}:{'hits' if value is not None else 'misses'}", 1)
+        except (redis.RedisError, OSError) as e:
+            self._failed(e)
+            return CacheLookup(namespace, None)
+        return CacheLookup(namespace, key, value)
+
+    async def put(self, lookup: CacheLookup, content: Any, ttl: int) -> bytes:
+        """Cache ``content`` under a missed lookup; returns the encoded JSON"""
+        body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+        if lookup.key is not None:
+            try:
+                await self.client.set(lookup.key, body, ex=ttl)
+            except (redis.RedisError, OSError) as e:
+                self._failed(e)
+        return body
+
+    async def store(self, lookup: CacheLookup, content: Any, ttl: int) -> Response:
+        """Cache ``content`` under a missed lookup and return it as a JSON response"""
+        body = await self.put(lookup, content, ttl)
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+    async def bump_versions(self, tables: Iterable[str]) -> None:
+        """Invalidate every entry built from ``tables``"""
+        tables = sorted(set(tables))
+        if not tables or not self.enabled:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for table in tables:
+                    pipe.incr(version_key(table))
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._failed(e)
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per namespace, shared by all workers"""
+        if not self.available:
+            return {}
+        try:
+            raw = await self.client.hgetall(STATS_KEY)
+        except (redis.RedisError, OSError) as e:
+            self._failed(e)
+            return {}
+        stats: Dict[str, Dict[str, int]] = {}
+        for field, count in raw.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            namespace, _, counter = field.rpartition(":")
+            stats.setdefault(namespace, {"hits": 0, "misses": 0})[counter] = int(count)
+        return stats
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any], versions: Sequence[int]) -> str:
+        payload = json.dumps([params, list(versions)], sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+
+class LRUCache:
+    """Bounded in-process mapping with a TTL per entry; least recently used entries go first"""
+
+    def __init__(self, maxsize: int, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """``(True, value)`` for a live entry, else ``(False, None)``"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+result_cache = ResultCache(settings.REDIS_URL, enabled=settings.CACHE_ENABLED)
@@ -18,6 +18,8 @@ class Settings(BaseSettings):
 
     # API
     API_V1_PREFIX: str = "/api/v1"
+    # Serve large list responses from column tuples + orjson instead of response_model validation
+    FAST_SERIALIZATION: bool = False
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",
         "http://localhost:5173",
@@ -29,6 +31,23 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Result cache for search endpoints (entries are also invalidated by ingest runs)
+    CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL: int = 300
+    OFF_SEARCH_CACHE_TTL: int = 3600
+    # Open Food Facts products (in-process LRU in front of Redis); unknown barcodes for less time
+    OFF_PRODUCT_CACHE_TTL: int = 86400
+    OFF_NOT_FOUND_CACHE_TTL: int = 3600
+    OFF_MEMORY_CACHE_SIZE: int = 2048
+    RECALL_COUNT_CACHE_TTL: int = 60
+    RECALL_TIMESERIES_CACHE_TTL: int = 600
+    # How long to bypass the cache after Redis stops answering
+    CACHE_RETRY_SECONDS: int = 30
+
+    # /recalls/stream (Server-Sent Events), per worker
+    RECALL_STREAM_MAX_SUBSCRIBERS: int = 10000
+    RECALL_STREAM_QUEUE_SIZE: int = 100
+    RECALL_STREAM_HEARTBEAT_SECONDS: int = 15
 
     # Security
     SECRET_KEY: str = "change-this-in-production-use-openssl-rand-hex-32"
@@ -42,4 +61,10 @@ class Settings(BaseSettings):
     # Elasticsearch
     ELASTICSEARCH_URL: str = "http://localhost:9200"
 
+    # Search
+    # Default /search backend: bm25 (in-process index, trigram until built), trigram or substring (Postgres)
+    SEARCH_BACKEND: str = "bm25"
+    # pg_trgm word_similarity cut-off; lower values tolerate more typos
+    SEARCH_TRGM_THRESHOLD: float = 0.3
+
 settings = Settings()
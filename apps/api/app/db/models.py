@@ -1,14 +1,35 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, ARRAY, Text, JSON, Index
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, Boolean, ForeignKey, ARRAY, Text, JSON, Index, DDL, event, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, declarative_base, validates, deferred
 from sqlalchemy.sql import func
 import uuid
 
 Base = declarative_base()
 
+# Trigram indexes below need pg_trgm to exist before the tables are created
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def weighted_tsvector(*weighted_columns) -> str:
+    """SQL for a weighted english tsvector, e.g. weighted_tsvector(("name", "A"), ("description", "C"))"""
+    return " || ".join(
+        f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+
+def search_vector_column(*weighted_columns):
+    """Generated, deferred tsvector column for full-text search (never loaded unless asked for)"""
+    return deferred(Column(TSVECTOR, Computed(weighted_tsvector(*weighted_columns), persisted=True)))
+
+
+def normalize_common_names(names) -> str:
+    """Flatten a common_names array into the lowercase text used for trigram search"""
+    return " ".join(n.strip().lower() for n in (names or []) if n and n.strip())
+
 class FoodCategory(Base):
     __tablename__ = "food_categories"
 
@@ -23,32 +44,91 @@ class FoodCategory(Base):
     parent = relationship("FoodCategory", remote_side=[id], backref="children")
 
 
+class Species(Base):
+    """Canonical seafood species that source-specific names resolve to"""
+    __tablename__ = "species"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String(100), unique=True, nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    scientific_name = Column(String(255))
+
+    # Relationships
+    aliases = relationship("SpeciesAlias", back_populates="species", cascade="all, delete-orphan")
+    foods = relationship("Food", back_populates="species")
+
+
+class SpeciesAlias(Base):
+    """A name some data source uses for a species (FDA, EWG, NOAA, EPA, ...)"""
+    __tablename__ = "species_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    species_id = Column(Integer, ForeignKey("species.id", ondelete="CASCADE"), nullable=False, index=True)
+    alias = Column(String(255), nullable=False)
+    # Normalized token key (see app.search.species.species_key); one species per key
+    alias_key = Column(String(255), nullable=False, unique=True, index=True)
+
+    # Relationships
+    species = relationship("Species", back_populates="aliases")
+
+
 class Food(Base):
     __tablename__ = "foods"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False, index=True)
     common_names = Column(ARRAY(String), default=list)
+    # Lowercased, space-joined copy of common_names so it can carry a trigram index
+    common_names_text = Column(Text, nullable=False, default="", server_default="")
     category_id = Column(Integer, ForeignKey("food_categories.id"), nullable=True, index=True)
+    species_id = Column(Integer, ForeignKey("species.id", ondelete="SET NULL"), nullable=True, index=True)
     description = Column(Text)
     image_url = Column(String(500))
     barcode = Column(String(50), index=True)
     slug = Column(String(255), unique=True, nullable=False, index=True)
 
+    # Full-text search document
+    search_vector = search_vector_column(("name", "A"), ("common_names_text", "B"), ("description", "C"))
+
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     category = relationship("FoodCategory", back_populates="foods")
+    species = relationship("Species", back_populates="foods")
     contaminant_levels = relationship("FoodContaminantLevel", back_populates="food", cascade="all, delete-orphan")
     nutrients = relationship("FoodNutrient", back_populates="food", cascade="all, delete-orphan")
     advisories = relationship("StateAdvisory", back_populates="food")
     # sustainability_ratings is added via backref in SustainabilityRating
 
-    # Note: Fuzzy search index (pg_trgm) can be added later with:
-    # CREATE EXTENSION IF NOT EXISTS pg_trgm;
-    # CREATE INDEX idx_food_name_trgm ON foods USING gin (name gin_trgm_ops);
+    __table_args__ = (
+        # Fuzzy search indexes (serve %, %>, similarity ordering and ILIKE '%q%')
+        Index("idx_food_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "idx_food_common_names_trgm", "common_names_text",
+            postgresql_using="gin", postgresql_ops={"common_names_text": "gin_trgm_ops"}
+        ),
+        # Keyset pagination: ORDER BY name, id (optionally within a category)
+        Index("idx_food_name_id", "name", "id"),
+        Index("idx_food_category_name_id", "category_id", "name", "id"),
+        Index("idx_food_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    @validates("common_names")
+    def _sync_common_names_text(self, key, names):
+        self.common_names_text = normalize_common_names(names)
+        return names
+
+
+class FoodDocument(Base):
+    """Pre-rendered FoodDetail JSON served by the food detail routes (rebuilt by ingest)"""
+    __tablename__ = "food_documents"
+
+    food_id = Column(UUID(as_uuid=True), ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True)
+    body = Column(Text, nullable=False)
+    etag = Column(String(66), nullable=False)
+    built_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class Contaminant(Base):
@@ -150,6 +230,13 @@ class ResearchPaper(Base):
     related_foods = Column(ARRAY(String))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Full-text search document (array columns are left out: array_to_string is not immutable)
+    search_vector = search_vector_column(("title", "A"), ("abstract", "B"), ("journal", "C"))
+
+    __table_args__ = (
+        Index("idx_paper_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     # Note: GIN index for keywords can be added later if needed
     # CREATE INDEX idx_paper_keywords ON research_papers USING gin (keywords);
 
@@ -183,9 +270,40 @@ class FoodRecall(Base):
     # Link to food if we can match it
     food_id = Column(UUID(as_uuid=True), ForeignKey("foods.id", ondelete="SET NULL"), nullable=True, index=True)
 
+    # Full-text search document: product > company > reason
+    search_vector = search_vector_column(
+        ("product_description", "A"), ("company_name", "B"), ("reason_for_recall", "C")
+    )
+
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Id of the inserting transaction (xid8, so it never wraps); the recall stream's high-water mark
+    ingest_xid = deferred(Column(BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text::bigint)")))
+
+    __table_args__ = (
+        Index("idx_recall_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_recall_ingest_xid", "ingest_xid"),
+    )
+
+
+# Keyset pagination: ORDER BY recall_date DESC NULLS LAST, id DESC
+Index("idx_recall_date_id", FoodRecall.recall_date.desc().nulls_last(), FoodRecall.id.desc())
+
+
+class RecallDailyCount(Base):
+    """
+    Recalls per (UTC day, classification, status, state), kept up to date by recall ingest
+
+    Missing classification/status/state are stored as '' so they can be part of the key.
+    """
+    __tablename__ = "recall_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    classification = Column(String(20), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    state = Column(String(2), primary_key=True)
+    recall_count = Column(Integer, nullable=False)
 
 
 class StateAdvisory(Base):
@@ -212,10 +330,20 @@ class StateAdvisory(Base):
     food_id = Column(UUID(as_uuid=True), ForeignKey("foods.id", ondelete="SET NULL"), nullable=True, index=True)
     food = relationship("Food", back_populates="advisories")
 
+    # Full-text search document
+    search_vector = search_vector_column(
+        ("fish_species", "A"), ("contaminant_type", "B"), ("waterbody_name", "B"),
+        ("state_name", "B"), ("advisory_text", "C")
+    )
+
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("idx_advisory_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class SustainabilityRating(Base):
     """NOAA FishWatch / Seafood Watch sustainability ratings"""
@@ -256,3 +384,45 @@ class SustainabilityRating(Base):
 
     # Relationships
     food = relationship("Food", backref="sustainability_ratings")
+
+
+# ====================
+# Rankings
+# ====================
+
+class FoodRanking(Base):
+    """Composite score per food, recomputed by app.rankings.refresh_rankings after ingest"""
+    __tablename__ = "food_rankings"
+
+    food_id = Column(UUID(as_uuid=True), ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("food_categories.id", ondelete="SET NULL"), nullable=True)
+
+    # 0-100, higher is better; components are NULL when there is no data for them
+    score = Column(Float, nullable=False)
+    safety_score = Column(Float)
+    sustainability_score = Column(Float)
+    omega3_score = Column(Float)
+    mercury_ppm = Column(Float)
+
+    # 1-based positions, overall and within the category
+    rank = Column(Integer, nullable=False)
+    category_rank = Column(Integer, nullable=False)
+
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    food = relationship("Food")
+
+    __table_args__ = (
+        Index("idx_ranking_rank", "rank"),
+        Index("idx_ranking_category_rank", "category_id", "category_rank"),
+    )
+
+
+class FoodStatePenalty(Base):
+    """Score deduction for a food in a state with consumption advisories for it"""
+    __tablename__ = "food_state_penalties"
+
+    state_code = Column(String(2), primary_key=True)
+    food_id = Column(UUID(as_uuid=True), ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True)
+    penalty = Column(Float, nullable=False)
+    advisory_count = Column(Integer, nullable=False)
@@ -0,0 +1,156 @@
+"""
+Postgres LISTEN/NOTIFY for ingest events
+
+Ingest scripts run in their own processes. When one finishes it calls
+``notify_ingest_finished`` with the tables it wrote; every API worker
+listens on the same channel and rebuilds its in-memory indexes.
+``notify_foods_changed`` carries the ids of foods written outside an
+ingest run (barcode import) so every worker can update its search index
+in place instead of waiting for the next rebuild.
+
+The LISTEN connection is re-established with backoff when it drops (e.g.
+Postgres restarts). Notifications sent while it was down are lost, so
+after reconnecting every ingest handler runs as if all tables had changed.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.db.models import Base
+
+logger = logging.getLogger(__name__)
+
+INGEST_FINISHED_CHANNEL = "ingest_finished"
+FOODS_CHANGED_CHANNEL = "foods_changed"
+
+# Food ids per notification; NOTIFY payloads must stay under 8000 bytes
+FOOD_IDS_PER_NOTIFY = 200
+
+# What handlers are told changed after a reconnect
+ALL_TABLES = frozenset(Base.metadata.tables)
+
+# Called with the notification's comma-separated items (table names or food ids)
+IngestHandler = Callable[[Set[str]], Awaitable[None]]
+
+
+async def notify_ingest_finished(session: AsyncSession, tables: Iterable[str]) -> None:
+    """Tell API workers which tables an ingest run changed (delivered on commit)"""
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": INGEST_FINISHED_CHANNEL, "payload": ",".join(sorted(set(tables)))},
+    )
+
+
+async def notify_foods_changed(session: AsyncSession, food_ids: Iterable[UUID]) -> None:
+    """Tell API workers which foods were inserted, updated or deleted (delivered on commit)"""
+    ids = sorted({str(food_id) for food_id in food_ids})
+    for start in range(0, len(ids), FOOD_IDS_PER_NOTIFY):
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": FOODS_CHANGED_CHANNEL, "payload": ",".join(ids[start:start + FOOD_IDS_PER_NOTIFY])},
+        )
+
+
+class IngestListener:
+    """Hold a LISTEN connection, reconnecting when it drops, and dispatch notifications to handlers"""
+
+    def __init__(self, engine: AsyncEngine, reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0):
+        self.engine = engine
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.handlers: Dict[str, List[IngestHandler]] = {}
+        self._connection = None
+        self._reconnecting: Optional[asyncio.Task] = None
+        self._stopped = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    def add_handler(self, handler: IngestHandler, channel: str = INGEST_FINISHED_CHANNEL) -> None:
+        """Call ``handler`` for notifications on ``channel`` (register before ``start``)"""
+        self.handlers.setdefault(channel, []).append(handler)
+
+    async def start(self) -> None:
+        """Start listening; if Postgres can't be reached, keep retrying in the background"""
+        self._stopped = False
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.error(f"Could not listen for ingest notifications, retrying: {e}")
+            self._schedule_reconnect()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _connect(self) -> None:
+        connection = await self.engine.connect()
+        try:
+            raw = (await connection.get_raw_connection()).driver_connection
+            for channel in self.handlers:
+                await raw.add_listener(channel, self._on_notify)
+            raw.add_termination_listener(self._on_terminated)
+        except BaseException:
+            await connection.close()
+            raise
+        self._connection = connection
+
+    def _on_terminated(self, connection) -> None:
+        if self._stopped:
+            return
+        logger.warning("Lost the ingest notification connection, reconnecting")
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnecting is None or self._reconnecting.done():
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                # Don't hand the dead connection back to the pool
+                await connection.invalidate()
+                await connection.close()
+            except Exception:
+                pass
+
+        delay = self.reconnect_delay
+        while not self._stopped:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception as e:
+                delay = min(delay * 2, self.max_reconnect_delay)
+                logger.warning(f"Reconnecting for ingest notifications failed, retrying in {delay:.0f}s: {e}")
+                continue
+            logger.info("Listening for ingest notifications again; rebuilding in-memory indexes")
+            self._dispatch(INGEST_FINISHED_CHANNEL, set(ALL_TABLES))
+            return
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._dispatch(channel, {item for item in payload.split(",") if item})
+
+    def _dispatch(self, channel: str, items: Set[str]) -> None:
+        for handler in self.handlers.get(channel, ()):
+            task = asyncio.create_task(self._run(handler, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, handler: IngestHandler, items: Set[str]) -> None:
+        try:
+            await handler(items)
+        except Exception as e:
+            logger.error(f"Notification handler {handler.__name__} failed for {items}: {e}")
@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response validation
 """
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -156,6 +156,43 @@ class FoodDetail(Food):
 
 
 # Search Schemas
+class FoodBatchRequest(BaseModel):
+    ids: List[UUID] = []
+    slugs: List[str] = []
+    barcodes: List[str] = []
+
+
+class FoodBatchResult(BaseModel):
+    """Foods keyed by the requested identifier; null marks one that was not found"""
+    ids: Dict[str, Optional[FoodDetail]] = {}
+    slugs: Dict[str, Optional[FoodDetail]] = {}
+    barcodes: Dict[str, Optional[FoodDetail]] = {}
+    found: int
+    missing: int
+
+
+class ComparedFood(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+    category: Optional[str] = None
+
+
+class ComparisonRow(BaseModel):
+    """One contaminant or nutrient (in one unit); values line up with ``FoodComparison.foods``"""
+    name: str
+    unit: Optional[str] = None
+    values: List[Optional[float]]
+    risk_categories: Optional[List[Optional[str]]] = None
+
+
+class FoodComparison(BaseModel):
+    foods: List[ComparedFood]
+    contaminants: List[ComparisonRow]
+    nutrients: List[ComparisonRow]
+    missing: List[str] = []
+
+
 class FoodSearchParams(BaseModel):
     q: Optional[str] = Field(None, description="Search query")
     category: Optional[str] = Field(None, description="Category slug")
@@ -165,8 +202,135 @@ class FoodSearchParams(BaseModel):
 class FoodSearchResult(BaseModel):
     total: int
     foods: List[Food]
+    next_cursor: Optional[str] = None
+
+class Suggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    text: str
+    kind: str  # food, company
+    slug: Optional[str] = None
+    popularity: int = 0
+
+class SuggestResult(BaseModel):
+    query: str
+    suggestions: List[Suggestion]
+
+class UnifiedSearchHit(BaseModel):
+    id: str
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+    ref: Optional[str] = Field(None, description="Food slug, recall number, state code or paper DOI/URL")
+    rank: float
+
+class UnifiedSearchGroup(BaseModel):
+    total: int = 0
+    hits: List[UnifiedSearchHit] = []
+
+class UnifiedSearchResult(BaseModel):
+    query: str
+    total: int
+    groups: Dict[str, UnifiedSearchGroup]
+
+
+# Ranking Schemas
+class RankingComponents(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    safety_score: Optional[float] = None
+    sustainability_score: Optional[float] = None
+    omega3_score: Optional[float] = None
+    mercury_ppm: Optional[float] = None
 
 
+class RankingEntry(BaseModel):
+    rank: int
+    score: float
+    national_rank: int
+    food_id: UUID
+    name: str
+    slug: str
+    components: RankingComponents
+    state_penalty: float = 0.0
+
+
+class RankingList(BaseModel):
+    category: Optional[str] = None
+    state: Optional[str] = None
+    profile: Optional[str] = None
+    weights: Optional[Dict[str, float]] = None
+    rankings: List[RankingEntry]
+
+
+
+# Exposure Schemas
+class MealPlanItem(BaseModel):
+    food: str = Field(..., description="Food slug or id")
+    servings_per_week: float = Field(..., ge=0, le=100)
+    portion_g: float = Field(113.0, gt=0, le=2000, description="Portion size in grams (default 4 oz)")
+
+
+class MealPlan(BaseModel):
+    id: Optional[str] = Field(None, description="Caller's id for the plan, echoed back")
+    body_weight_kg: float = Field(..., gt=0, le=500)
+    items: List[MealPlanItem] = Field(..., max_length=100)
+
+
+class ExposureRequest(BaseModel):
+    plans: List[MealPlan] = Field(..., min_length=1)
+
+
+class ContaminantExposure(BaseModel):
+    contaminant: str
+    weekly_intake_ug: float
+    weekly_dose_ug_per_kg: float
+    reference_weekly_dose_ug_per_kg: Optional[float] = None
+    percent_of_reference: Optional[float] = None
+
+
+class PlanExposure(BaseModel):
+    id: Optional[str] = None
+    body_weight_kg: float
+    exposures: List[ContaminantExposure]
+
+
+class ExposureResult(BaseModel):
+    plans: List[PlanExposure]
+    unknown_foods: List[str] = []
+
+
+class MealPlanOptimizeRequest(BaseModel):
+    body_weight_kg: float = Field(..., gt=0, le=500)
+    objective: Literal["omega3", "score"] = Field("omega3", description="Maximize omega-3 or overall ranking score")
+    servings_per_week: int = Field(3, ge=1, le=14, description="Most servings in the plan")
+    max_servings_per_species: int = Field(2, ge=1, le=7)
+    portion_g: float = Field(113.0, gt=0, le=2000, description="Portion size in grams (default 4 oz)")
+    mercury_budget_percent: float = Field(
+        100.0, gt=0, le=100, description="Share of the methylmercury reference dose to stay under"
+    )
+    categories: List[str] = Field([], description="Allowed category slugs (default: any)")
+    avoid_states: List[str] = Field([], description="Leave out species under these states' advisories")
+
+
+class PlannedServing(BaseModel):
+    food_id: UUID
+    name: str
+    slug: str
+    servings: int
+    mercury_ug: float
+    value: float
+
+
+class OptimizedMealPlan(BaseModel):
+    objective: str
+    body_weight_kg: float
+    mercury_budget_ug: float
+    mercury_ug: float
+    percent_of_budget: float
+    total_value: float
+    servings: int
+    plan: List[PlannedServing]
+
 # Research Paper Schemas
 class ResearchPaperBase(BaseModel):
     title: str
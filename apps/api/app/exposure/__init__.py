@@ -0,0 +1,46 @@
+"""
+Contaminant exposure
+
+``evaluate_plans`` scores batches of weekly meal plans against contaminant
+reference doses; ``resolve_foods`` and ``load_concentrations`` fetch what it
+needs for the foods the plans mention in two queries.
+
+``optimize_meal_plan`` builds a weekly seafood plan that maximizes omega-3
+(or ranking score) under a methylmercury budget, from the ranking feature
+matrix already held in memory.
+"""
+from app.exposure.calculator import (
+    REFERENCE_DOSES,
+    ConcentrationTable,
+    ContaminantColumn,
+    evaluate_plans,
+    load_concentrations,
+    plan_results,
+    reference_dose,
+    resolve_foods,
+)
+from app.exposure.optimizer import (
+    OBJECTIVES,
+    MealOption,
+    OptimizedPlan,
+    mercury_budget_ug,
+    optimize_meal_plan,
+    species_groups,
+)
+
+__all__ = [
+    "REFERENCE_DOSES",
+    "ConcentrationTable",
+    "ContaminantColumn",
+    "evaluate_plans",
+    "load_concentrations",
+    "plan_results",
+    "reference_dose",
+    "resolve_foods",
+    "OBJECTIVES",
+    "MealOption",
+    "OptimizedPlan",
+    "mercury_budget_ug",
+    "optimize_meal_plan",
+    "species_groups",
+]
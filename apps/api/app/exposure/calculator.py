@@ -0,0 +1,236 @@
+"""
+Contaminant exposure calculator
+
+A meal plan is a body weight plus (food, servings/week, portion) items.
+Its weekly dose of a contaminant is::
+
+    sum(servings * portion_kg * concentration_mg_per_kg) / body_weight_kg
+
+compared against the contaminant's reference dose (``acceptable_daily_intake``
+x 7, else the published value in ``REFERENCE_DOSES``).
+
+Plans are evaluated as a batch: every item of every plan is flattened into
+parallel arrays once, then each contaminant is a gather of its concentration
+column, an elementwise multiply and a per-plan ``fsum`` over the plan's
+slice, all through ``map`` so the inner loops run in C.
+"""
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import repeat
+from math import fsum
+from operator import mul, truediv
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+# Oral reference doses (mg/kg body weight/day) for contaminants seeded without
+# acceptable_daily_intake: EPA IRIS methylmercury and Aroclor 1254 (PCBs)
+REFERENCE_DOSES: Dict[str, float] = {
+    "Mercury": 0.0001,
+    "PCBs": 0.00002,
+}
+
+# Concentration units we can convert to mg/kg of food
+UNIT_TO_MG_PER_KG: Dict[str, float] = {
+    "ppm": 1.0,
+    "mg/kg": 1.0,
+    "ppb": 0.001,
+    "ug/kg": 0.001,
+    "µg/kg": 0.001,
+}
+
+MG_TO_UG = 1000.0
+
+
+@dataclass
+class ContaminantColumn:
+    """Mean concentration (mg/kg) of one contaminant in each food of a table"""
+    contaminant_id: int
+    name: str
+    reference_dose: Optional[float]  # mg/kg body weight/day
+    concentrations: array
+
+
+@dataclass
+class ConcentrationTable:
+    """
+    Foods x contaminants concentration matrix, stored column-wise
+
+    Row 0 is a zero row for foods that could not be resolved.
+    """
+    food_rows: Dict[UUID, int] = field(default_factory=dict)
+    columns: List[ContaminantColumn] = field(default_factory=list)
+
+    def row(self, food_id: Optional[UUID]) -> int:
+        return self.food_rows.get(food_id, 0)
+
+
+@dataclass
+class FlatPlans:
+    """Every item of every plan in parallel arrays; ``bounds[i]`` slices plan i's items"""
+    rows: array
+    kg_per_week: array
+    body_weights: array
+    bounds: List[slice]
+
+
+def flatten_plans(plans: Sequence, table: ConcentrationTable, food_ids: Dict[str, UUID]) -> FlatPlans:
+    """Flatten ``schemas.MealPlan``-like objects against a table's rows"""
+    rows = array("l")
+    kg_per_week = array("d")
+    bounds = []
+    for plan in plans:
+        start = len(rows)
+        rows.extend(table.row(food_ids.get(item.food)) for item in plan.items)
+        kg_per_week.extend(item.servings_per_week * item.portion_g / 1000 for item in plan.items)
+        bounds.append(slice(start, len(rows)))
+    body_weights = array("d", (plan.body_weight_kg for plan in plans))
+    return FlatPlans(rows=rows, kg_per_week=kg_per_week, body_weights=body_weights, bounds=bounds)
+
+
+def weekly_intakes(column: ContaminantColumn, flat: FlatPlans) -> List[float]:
+    """Weekly intake (mg) of one contaminant for every plan"""
+    per_item = list(map(mul, flat.kg_per_week, map(column.concentrations.__getitem__, flat.rows)))
+    return list(map(fsum, map(per_item.__getitem__, flat.bounds)))
+
+
+@dataclass
+class ContaminantExposures:
+    """One contaminant's weekly intake, dose and share of reference dose for every plan"""
+    column: ContaminantColumn
+    intake_mg: List[float]
+    dose_mg_per_kg: List[float]
+    percent_of_reference: Optional[List[float]]
+
+    @property
+    def reference_weekly_dose(self) -> Optional[float]:
+        if self.column.reference_dose is None:
+            return None
+        return self.column.reference_dose * 7
+
+
+def evaluate_plans(plans: Sequence, table: ConcentrationTable, food_ids: Dict[str, UUID]) -> List[ContaminantExposures]:
+    """Weekly exposures of every plan to every contaminant in the table"""
+    flat = flatten_plans(plans, table, food_ids)
+    exposures = []
+    for column in table.columns:
+        intake = weekly_intakes(column, flat)
+        dose = list(map(truediv, intake, flat.body_weights))
+        percent = None
+        if column.reference_dose:
+            percent = list(map(mul, dose, repeat(100 / (column.reference_dose * 7), len(dose))))
+        exposures.append(ContaminantExposures(
+            column=column, intake_mg=intake, dose_mg_per_kg=dose, percent_of_reference=percent,
+        ))
+    return exposures
+
+
+def plan_results(plans: Sequence, exposures: Sequence[ContaminantExposures]) -> List[dict]:
+    """Per-plan response dicts (doses in µg, as reference doses are usually quoted)"""
+    results = []
+    for i, plan in enumerate(plans):
+        results.append({
+            "id": plan.id,
+            "body_weight_kg": plan.body_weight_kg,
+            "exposures": [
+                {
+                    "contaminant": e.column.name,
+                    "weekly_intake_ug": round(e.intake_mg[i] * MG_TO_UG, 4),
+                    "weekly_dose_ug_per_kg": round(e.dose_mg_per_kg[i] * MG_TO_UG, 4),
+                    "reference_weekly_dose_ug_per_kg": (
+                        None if e.reference_weekly_dose is None else round(e.reference_weekly_dose * MG_TO_UG, 4)
+                    ),
+                    "percent_of_reference": (
+                        None if e.percent_of_reference is None else round(e.percent_of_reference[i], 2)
+                    ),
+                }
+                for e in exposures
+            ],
+        })
+    return results
+
+
+def _as_uuid(value: str) -> Optional[UUID]:
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+async def resolve_foods(db: AsyncSession, identifiers: Iterable[str]) -> Dict[str, UUID]:
+    """Food ids for the identifiers (food ids or slugs) that exist"""
+    ids = {identifier: _as_uuid(identifier) for identifier in set(identifiers)}
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(models.Food.id, models.Food.slug).where(or_(
+            models.Food.id.in_([u for u in ids.values() if u is not None]),
+            models.Food.slug.in_([i for i, u in ids.items() if u is None]),
+        ))
+    )
+    by_id, by_slug = {}, {}
+    for food_id, slug in result.all():
+        by_id[food_id] = by_slug[slug] = food_id
+    resolved = {}
+    for identifier, uuid in ids.items():
+        food_id = by_id.get(uuid) if uuid is not None else by_slug.get(identifier)
+        if food_id is not None:
+            resolved[identifier] = food_id
+    return resolved
+
+
+async def reference_dose(db: AsyncSession, name: str) -> Optional[float]:
+    """A contaminant's reference dose (mg/kg/day): its stored ``acceptable_daily_intake``, else ``REFERENCE_DOSES``"""
+    adi = await db.scalar(
+        select(models.Contaminant.acceptable_daily_intake)
+        .where(models.Contaminant.name == name, models.Contaminant.acceptable_daily_intake.is_not(None))
+        .order_by(models.Contaminant.id)
+        .limit(1)
+    )
+    return adi if adi is not None else REFERENCE_DOSES.get(name)
+
+
+async def load_concentrations(db: AsyncSession, food_ids: Iterable[UUID]) -> ConcentrationTable:
+    """Mean contaminant concentrations (mg/kg) of the given foods"""
+    food_ids = list(dict.fromkeys(food_ids))
+    table = ConcentrationTable(food_rows={food_id: row for row, food_id in enumerate(food_ids, start=1)})
+    if not food_ids:
+        return table
+
+    result = await db.execute(
+        select(
+            models.FoodContaminantLevel.food_id,
+            models.FoodContaminantLevel.level_value,
+            models.FoodContaminantLevel.level_unit,
+            models.Contaminant.id,
+            models.Contaminant.name,
+            models.Contaminant.acceptable_daily_intake,
+        )
+        .join(models.Contaminant)
+        .where(
+            models.FoodContaminantLevel.food_id.in_(food_ids),
+            models.FoodContaminantLevel.level_value.is_not(None),
+            func.lower(models.FoodContaminantLevel.level_unit).in_(list(UNIT_TO_MG_PER_KG)),
+        )
+        .order_by(models.Contaminant.id)
+    )
+    levels: Dict[Tuple[int, str, Optional[float]], Dict[UUID, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for food_id, value, unit, contaminant_id, name, adi in result.all():
+        levels[(contaminant_id, name, adi)][food_id].append(value * UNIT_TO_MG_PER_KG[unit.lower()])
+
+    for (contaminant_id, name, adi), by_food in levels.items():
+        concentrations = array("d", repeat(0.0, len(food_ids) + 1))
+        for food_id, values in by_food.items():
+            concentrations[table.food_rows[food_id]] = fsum(values) / len(values)
+        table.columns.append(ContaminantColumn(
+            contaminant_id=contaminant_id,
+            name=name,
+            reference_dose=adi if adi is not None else REFERENCE_DOSES.get(name),
+            concentrations=concentrations,
+        ))
+    return table
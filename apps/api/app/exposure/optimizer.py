@@ -0,0 +1,178 @@
+"""
+Weekly seafood meal-plan optimizer
+
+Picks servings for a week that maximize total omega-3 (or ranking score)
+while keeping the methylmercury dose under a budget: a share of the
+reference dose for the eater's body weight.
+
+This is a grouped knapsack. Each species is one group whose options are
+"s servings of one of its foods" (so ``max_per_species`` holds per species,
+not per product), solved by dynamic programming over (servings used,
+mercury budget used). The budget is discretized into ``MERCURY_BUDGET_STEPS``
+steps, and option costs are rounded *up*, so a plan never exceeds the
+real budget. Only Pareto-optimal (budget used, value) states are kept per
+serving count, so the work tracks how many distinct trade-offs exist rather
+than the full servings x budget table.
+"""
+from dataclasses import dataclass, field
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from app.exposure.calculator import MG_TO_UG, REFERENCE_DOSES
+from app.rankings.personalized import RankedRow
+
+# Budget resolution; finer steps cost proportionally more time
+MERCURY_BUDGET_STEPS = 500
+
+OBJECTIVES = {
+    "omega3": lambda ranking: ranking.omega3_score,
+    "score": lambda ranking: ranking.score,
+}
+
+
+def mercury_budget_ug(
+    body_weight_kg: float,
+    percent_of_reference: float = 100.0,
+    reference_dose: Optional[float] = None,
+) -> float:
+    """Weekly methylmercury budget (µg) for a body weight; ``reference_dose`` in mg/kg/day defaults to ``REFERENCE_DOSES``"""
+    if reference_dose is None:
+        reference_dose = REFERENCE_DOSES["Mercury"]
+    weekly_ug_per_kg = reference_dose * 7 * MG_TO_UG
+    return weekly_ug_per_kg * body_weight_kg * percent_of_reference / 100
+
+
+@dataclass
+class MealOption:
+    """``servings`` servings of one food: the choice within its species group"""
+    row: RankedRow
+    servings: int
+    mercury_ug: float
+    value: float
+    cost: int  # budget steps, rounded up
+
+
+@dataclass
+class OptimizedPlan:
+    budget_ug: float
+    choices: List[MealOption] = field(default_factory=list)
+
+    @property
+    def mercury_ug(self) -> float:
+        return sum(choice.mercury_ug for choice in self.choices)
+
+    @property
+    def value(self) -> float:
+        return sum(choice.value for choice in self.choices)
+
+    @property
+    def servings(self) -> int:
+        return sum(choice.servings for choice in self.choices)
+
+
+def species_groups(
+    rows: Iterable[RankedRow],
+    objective: str,
+    categories: Optional[Set[str]] = None,
+    excluded_foods: Set = frozenset(),
+) -> List[List[RankedRow]]:
+    """
+    Eligible foods grouped by species (a food without one is its own group)
+
+    Foods need mercury data and a positive objective value. A species is left
+    out entirely when any of its foods is excluded (e.g. under a state advisory).
+    """
+    value_of = OBJECTIVES[objective]
+    excluded_species = {row.species_id for row in rows if row.food_id in excluded_foods and row.species_id}
+    groups: Dict[object, List[RankedRow]] = {}
+    for row in rows:
+        if row.food_id in excluded_foods or row.species_id in excluded_species:
+            continue
+        if categories and row.category_slug not in categories:
+            continue
+        if row.ranking.mercury_ppm is None or not value_of(row.ranking):
+            continue
+        groups.setdefault(row.species_id or row.food_id, []).append(row)
+    return list(groups.values())
+
+
+def group_options(
+    group: Sequence[RankedRow],
+    objective: str,
+    budget_ug: float,
+    max_servings: int,
+    max_per_species: int,
+    portion_g: float,
+    steps: int,
+) -> List[MealOption]:
+    """Affordable, non-dominated options of one species group"""
+    value_of = OBJECTIVES[objective]
+    options = []
+    for servings in range(1, min(max_per_species, max_servings) + 1):
+        candidates = []
+        for row in group:
+            # ppm is µg per gram of food
+            mercury_ug = row.ranking.mercury_ppm * portion_g * servings
+            cost = ceil(mercury_ug / budget_ug * steps - 1e-9) if budget_ug > 0 else steps + 1
+            if cost <= steps:
+                candidates.append(MealOption(
+                    row=row, servings=servings, mercury_ug=mercury_ug,
+                    value=value_of(row.ranking) * servings, cost=cost,
+                ))
+        # Keep only options not beaten on both cost and value by another with as many servings
+        candidates.sort(key=lambda option: (option.cost, -option.value))
+        best_value = float("-inf")
+        for option in candidates:
+            if option.value > best_value:
+                options.append(option)
+                best_value = option.value
+    return options
+
+
+def _pareto(states: List[tuple]) -> List[tuple]:
+    """States sorted by cost with strictly increasing value (the dominated ones dropped)"""
+    states.sort(key=lambda state: (state[0], -state[1]))
+    frontier = []
+    for state in states:
+        if not frontier or state[1] > frontier[-1][1]:
+            frontier.append(state)
+    return frontier
+
+
+def optimize_meal_plan(
+    groups: Sequence[Sequence[RankedRow]],
+    objective: str,
+    budget_ug: float,
+    max_servings: int,
+    max_per_species: int,
+    portion_g: float,
+    steps: int = MERCURY_BUDGET_STEPS,
+) -> OptimizedPlan:
+    """Best plan of at most ``max_servings`` servings within ``budget_ug`` of mercury"""
+    # frontiers[t]: Pareto-optimal (cost, value, previous state, option) using exactly t servings.
+    # Only non-dominated states are kept, which stays far smaller than a dense
+    # servings x budget table for real catalogs.
+    frontiers = [[(0, 0.0, None, None)]] + [[] for _ in range(max_servings)]
+    for group in groups:
+        options = group_options(group, objective, budget_ug, max_servings, max_per_species, portion_g, steps)
+        if not options:
+            continue
+        candidates = [list(frontier) for frontier in frontiers]
+        for option in options:
+            for used in range(max_servings - option.servings + 1):
+                target = candidates[used + option.servings]
+                limit = steps - option.cost
+                for state in frontiers[used]:
+                    if state[0] > limit:
+                        break
+                    target.append((state[0] + option.cost, state[1] + option.value, state, option))
+        frontiers = [_pareto(states) for states in candidates]
+
+    # Each frontier's last state is its best value; prefer fewer servings on ties
+    state = max((frontier[-1] for frontier in frontiers if frontier), key=lambda s: s[1])
+    plan = OptimizedPlan(budget_ug=budget_ug)
+    while state[3] is not None:
+        plan.choices.append(state[3])
+        state = state[2]
+    plan.choices.reverse()
+    return plan
@@ -0,0 +1,71 @@
+"""
+Food rankings
+
+``refresh_rankings`` recomputes the ``food_rankings`` table after ingest;
+``top_rankings`` serves /api/v1/rankings from its rank indexes.
+
+``feature_matrix()`` holds the same rankings in memory for personalized
+orderings; it is rebuilt and swapped in whole when an ingest run reports
+that ``food_rankings`` changed (see ``on_ingest_finished``).
+"""
+import asyncio
+import logging
+
+from app.db.session import AsyncSessionLocal
+from app.rankings.engine import RankedFood, apply_state_penalties, refresh_rankings, top_rankings
+from app.rankings.personalized import (
+    FEATURES,
+    PROFILES,
+    FeatureMatrix,
+    load_feature_matrix,
+    weight_vector,
+)
+
+logger = logging.getLogger(__name__)
+
+_matrix = FeatureMatrix(ready=False)
+_matrix_lock = asyncio.Lock()
+
+
+def feature_matrix() -> FeatureMatrix:
+    """The live feature matrix"""
+    return _matrix
+
+
+async def ensure_feature_matrix() -> FeatureMatrix:
+    """The feature matrix, building it first if this worker has none yet"""
+    async with _matrix_lock:
+        if not _matrix.ready:
+            await rebuild_feature_matrix()
+    return _matrix
+
+
+async def rebuild_feature_matrix() -> FeatureMatrix:
+    """Reload the feature matrix from food_rankings and swap it in (dropping cached orderings)"""
+    global _matrix
+    async with AsyncSessionLocal() as session:
+        _matrix = await load_feature_matrix(session)
+    logger.info(f"Ranking feature matrix built with {len(_matrix)} foods")
+    return _matrix
+
+
+async def on_ingest_finished(tables: set) -> None:
+    """Reload the feature matrix after rankings were refreshed"""
+    if "food_rankings" in tables:
+        await rebuild_feature_matrix()
+
+
+__all__ = [
+    "RankedFood",
+    "apply_state_penalties",
+    "refresh_rankings",
+    "top_rankings",
+    "FEATURES",
+    "PROFILES",
+    "FeatureMatrix",
+    "weight_vector",
+    "feature_matrix",
+    "ensure_feature_matrix",
+    "rebuild_feature_matrix",
+    "on_ingest_finished",
+]
@@ -0,0 +1,207 @@
+"""
+Composite food ranking
+
+Every food gets a 0-100 score from up to three components:
+
+- **safety**: FDA mean mercury (100 at 0 ppm, 0 at the 1.0 ppm FDA action
+  level), else the worst contaminant ``risk_score``/``risk_category``
+- **sustainability**: mean NOAA ``rating_score`` (1-10, scaled), else the
+  EWG "Sustainable" flag
+- **omega-3**: the EWG omega-3 label
+
+The score is the weighted mean of the components a food has data for.
+``refresh_rankings`` computes all of them, plus overall and per-category
+ranks, in a single set-based INSERT ... SELECT. Reads then only walk the
+rank indexes.
+
+State advisories don't change the national score. They become per-state
+penalties that ``top_rankings`` applies when asked for one state.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, bindparam, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+# Component weights; renormalized over the components present for a food
+SAFETY_WEIGHT = 0.5
+SUSTAINABILITY_WEIGHT = 0.3
+OMEGA3_WEIGHT = 0.2
+
+# FDA action level for methylmercury in fish (ppm)
+MERCURY_CEILING_PPM = 1.0
+
+# Score deducted in a state with a "Do Not Eat" advisory, or any other advisory
+DO_NOT_EAT_PENALTY = 40.0
+ADVISORY_PENALTY = 15.0
+
+# EWG facts only live in the description written by init_db.seed_fish_data,
+# e.g. "EWG: Best Choice. Omega-3: Very High. Sustainable: True"
+REFRESH_RANKINGS_SQL = text(r"""
+WITH mercury AS (
+    SELECT l.food_id, avg(l.level_value) AS ppm
+    FROM food_contaminant_levels l
+    JOIN contaminants c ON c.id = l.contaminant_id
+    WHERE c.name = 'Mercury' AND l.level_unit = 'ppm' AND l.level_value IS NOT NULL
+    GROUP BY l.food_id
+),
+risk AS (
+    SELECT
+        food_id,
+        max(risk_score) AS max_risk,
+        max(CASE lower(risk_category)
+            WHEN 'critical' THEN 90 WHEN 'high' THEN 70 WHEN 'medium' THEN 40 WHEN 'low' THEN 10
+        END) AS category_risk
+    FROM food_contaminant_levels
+    GROUP BY food_id
+),
+rated AS (
+    SELECT food_id, avg(rating_score) * 10 AS score
+    FROM sustainability_ratings
+    WHERE food_id IS NOT NULL AND rating_score IS NOT NULL
+    GROUP BY food_id
+),
+features AS (
+    SELECT
+        f.id AS food_id,
+        f.category_id,
+        m.ppm,
+        coalesce(
+            100 * greatest(0, 1 - m.ppm / :mercury_ceiling),
+            100 - r.max_risk,
+            100 - r.category_risk
+        ) AS safety,
+        coalesce(
+            rated.score,
+            CASE substring(f.description FROM 'Sustainable: (True|False)')
+                WHEN 'True' THEN 80 WHEN 'False' THEN 30
+            END
+        ) AS sustainability,
+        CASE substring(f.description FROM 'Omega-3: ([A-Za-z ]+)\.')
+            WHEN 'Very High' THEN 100 WHEN 'High' THEN 75 WHEN 'Medium' THEN 50 WHEN 'Low' THEN 25
+        END AS omega3
+    FROM foods f
+    LEFT JOIN mercury m ON m.food_id = f.id
+    LEFT JOIN risk r ON r.food_id = f.id
+    LEFT JOIN rated ON rated.food_id = f.id
+),
+scored AS (
+    SELECT
+        *,
+        (
+            coalesce(:safety_weight * safety, 0)
+            + coalesce(:sustainability_weight * sustainability, 0)
+            + coalesce(:omega3_weight * omega3, 0)
+        ) / nullif(
+            CASE WHEN safety IS NULL THEN 0 ELSE :safety_weight END
+            + CASE WHEN sustainability IS NULL THEN 0 ELSE :sustainability_weight END
+            + CASE WHEN omega3 IS NULL THEN 0 ELSE :omega3_weight END,
+            0
+        ) AS score
+    FROM features
+)
+INSERT INTO food_rankings (
+    food_id, category_id, score, safety_score, sustainability_score, omega3_score, mercury_ppm,
+    rank, category_rank
+)
+SELECT
+    food_id, category_id, score, safety, sustainability, omega3, ppm,
+    row_number() OVER (ORDER BY score DESC, food_id),
+    row_number() OVER (PARTITION BY category_id ORDER BY score DESC, food_id)
+FROM scored
+WHERE score IS NOT NULL
+""").bindparams(
+    # Typed so asyncpg gets explicit casts for parameters used only in arithmetic
+    *(bindparam(name, type_=Float) for name in (
+        "mercury_ceiling", "safety_weight", "sustainability_weight", "omega3_weight"
+    ))
+)
+
+REFRESH_PENALTIES_SQL = text("""
+INSERT INTO food_state_penalties (state_code, food_id, penalty, advisory_count)
+SELECT
+    state_code,
+    food_id,
+    max(CASE WHEN advisory_level ILIKE 'do not eat%' THEN :do_not_eat ELSE :advisory END),
+    count(*)
+FROM state_advisories
+WHERE food_id IS NOT NULL
+GROUP BY state_code, food_id
+""").bindparams(bindparam("do_not_eat", type_=Float), bindparam("advisory", type_=Float))
+
+
+async def refresh_rankings(db: AsyncSession) -> int:
+    """Recompute every food's score, ranks and state penalties; caller commits"""
+    await db.execute(delete(models.FoodRanking))
+    result = await db.execute(REFRESH_RANKINGS_SQL, {
+        "mercury_ceiling": MERCURY_CEILING_PPM,
+        "safety_weight": SAFETY_WEIGHT,
+        "sustainability_weight": SUSTAINABILITY_WEIGHT,
+        "omega3_weight": OMEGA3_WEIGHT,
+    })
+    await db.execute(delete(models.FoodStatePenalty))
+    await db.execute(REFRESH_PENALTIES_SQL, {"do_not_eat": DO_NOT_EAT_PENALTY, "advisory": ADVISORY_PENALTY})
+    return result.rowcount
+
+
+@dataclass
+class RankedFood:
+    """One row of a ranking response"""
+    rank: int
+    score: float
+    national_rank: int
+    ranking: models.FoodRanking
+    name: str
+    slug: str
+    state_penalty: float = 0.0
+
+
+def apply_state_penalties(rows: Sequence, penalties: Dict, limit: int) -> List[RankedFood]:
+    """
+    Re-rank ``(ranking, name, slug)`` rows, best first, after state penalties
+
+    ``rows`` must be the best ``limit + len(penalties)`` rows by national score.
+    At most ``len(penalties)`` of them can drop, so the top ``limit`` after
+    penalties are always among them.
+    """
+    candidates = []
+    for ranking, name, slug in rows:
+        penalty = penalties.get(ranking.food_id, 0.0)
+        candidates.append((ranking.score - penalty, ranking.rank, ranking, name, slug, penalty))
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    return [
+        RankedFood(
+            rank=position, score=max(score, 0.0), national_rank=national_rank, ranking=ranking,
+            name=name, slug=slug, state_penalty=penalty,
+        )
+        for position, (score, national_rank, ranking, name, slug, penalty) in enumerate(candidates[:limit], start=1)
+    ]
+
+
+async def top_rankings(
+    db: AsyncSession,
+    limit: int,
+    category_slug: Optional[str] = None,
+    state: Optional[str] = None,
+) -> List[RankedFood]:
+    """Best ``limit`` foods overall, within a category and/or adjusted for one state"""
+    query = select(models.FoodRanking, models.Food.name, models.Food.slug).join(models.Food)
+    if category_slug:
+        category_id = select(models.FoodCategory.id).where(models.FoodCategory.slug == category_slug)
+        query = query.where(models.FoodRanking.category_id == category_id.scalar_subquery())
+        query = query.order_by(models.FoodRanking.category_rank)
+    else:
+        query = query.order_by(models.FoodRanking.rank)
+
+    penalties = {}
+    if state:
+        result = await db.execute(
+            select(models.FoodStatePenalty.food_id, models.FoodStatePenalty.penalty)
+            .where(models.FoodStatePenalty.state_code == state.upper())
+        )
+        penalties = dict(result.all())
+
+    result = await db.execute(query.limit(limit + len(penalties)))
+    return apply_state_penalties(result.all(), penalties, limit)
@@ -0,0 +1,156 @@
+"""
+Personalized rankings
+
+Each ranked food is a row of a feature matrix (safety, strict mercury,
+sustainability and omega-3 scores, 0-100). A profile is a weight vector
+over those features; a food's personalized score is the matrix-vector
+product, renormalized over the features the food has data for, like the
+national score in ``engine``.
+
+The matrix is held column-wise and multiplied one column at a time with
+``map`` over ``operator`` functions, so the inner loops run in C without
+pulling numpy into the API image. Most users share a handful of profiles,
+so full orderings are cached per distinct weight vector (LRU).
+"""
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from math import isnan
+from operator import add, mul, truediv
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.rankings.engine import OMEGA3_WEIGHT, SAFETY_WEIGHT, SUSTAINABILITY_WEIGHT
+
+FEATURES = ("safety", "strict_mercury", "sustainability", "omega3")
+
+# FDA/EPA "Best choices" for pregnancy and children stay under roughly 0.15 ppm
+STRICT_MERCURY_CEILING_PPM = 0.15
+
+PROFILES: Dict[str, Dict[str, float]] = {
+    "default": {"safety": SAFETY_WEIGHT, "sustainability": SUSTAINABILITY_WEIGHT, "omega3": OMEGA3_WEIGHT},
+    "pregnant": {"safety": 0.3, "strict_mercury": 0.4, "omega3": 0.3},
+    "child": {"safety": 0.3, "strict_mercury": 0.5, "omega3": 0.2},
+    "sustainability_first": {"safety": 0.2, "sustainability": 0.7, "omega3": 0.1},
+    "omega3_first": {"safety": 0.3, "sustainability": 0.1, "omega3": 0.6},
+}
+
+# Distinct weight vectors whose orderings are kept
+ORDERING_CACHE_SIZE = 32
+
+WeightVector = Tuple[float, ...]
+
+
+def weight_vector(weights: Mapping[str, float]) -> WeightVector:
+    """Normalized, rounded weights in FEATURES order (the cache key); ValueError if unusable"""
+    if not isinstance(weights, Mapping):
+        # Saved preferences are free-form JSON
+        raise ValueError("Ranking weights must map feature names to numbers")
+    unknown = set(weights) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown ranking features: {', '.join(sorted(unknown))}")
+    values = [float(weights.get(name, 0.0)) for name in FEATURES]
+    if any(v < 0 for v in values) or sum(values) <= 0:
+        raise ValueError("Ranking weights must be non-negative and not all zero")
+    total = sum(values)
+    return tuple(round(v / total, 3) for v in values)
+
+
+def strict_mercury_score(ppm: Optional[float]) -> Optional[float]:
+    if ppm is None:
+        return None
+    return 100 * max(0.0, 1 - ppm / STRICT_MERCURY_CEILING_PPM)
+
+
+@dataclass
+class RankedRow:
+    """Identity and features of one matrix row"""
+    food_id: object
+    name: str
+    slug: str
+    category_slug: Optional[str]
+    national_rank: int
+    ranking: models.FoodRanking
+    species_id: Optional[int] = None
+
+
+class FeatureMatrix:
+    """Column-wise food x feature matrix with cached per-profile orderings"""
+
+    def __init__(self, rows: Sequence[RankedRow] = (), ready: bool = True):
+        self.rows = list(rows)
+        self.ready = ready
+        self.columns: List[array] = []
+        self.present: List[array] = []
+        for name in FEATURES:
+            values = [self._feature(row.ranking, name) for row in self.rows]
+            # Missing values contribute nothing to either side of the weighted mean
+            self.columns.append(array("d", (0.0 if v is None else v for v in values)))
+            self.present.append(array("d", (0.0 if v is None else 1.0 for v in values)))
+        self.ordering = lru_cache(maxsize=ORDERING_CACHE_SIZE)(self._ordering)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _feature(ranking: models.FoodRanking, name: str) -> Optional[float]:
+        if name == "strict_mercury":
+            return strict_mercury_score(ranking.mercury_ppm)
+        return getattr(ranking, f"{name}_score")
+
+    def scores(self, weights: WeightVector) -> List[float]:
+        """Personalized score of every row (NaN where the profile's features are all missing)"""
+        n = len(self.rows)
+        numerator: List[float] = [0.0] * n
+        denominator: List[float] = [0.0] * n
+        for weight, column, present in zip(weights, self.columns, self.present):
+            if weight:
+                numerator = list(map(add, numerator, map(mul, repeat(weight, n), column)))
+                denominator = list(map(add, denominator, map(mul, repeat(weight, n), present)))
+        return list(map(_safe_div, numerator, denominator))
+
+    def _ordering(self, weights: WeightVector) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+        """Row indices best-first (ties keep national order) and their scores"""
+        scores = self.scores(weights)
+        ranked = [i for i in range(len(scores)) if not isnan(scores[i])]
+        # Rows are stored in national rank order and sorted() is stable
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return tuple(ranked), tuple(scores[i] for i in ranked)
+
+    def top(self, weights: WeightVector, limit: int, category: Optional[str] = None) -> List[Tuple[RankedRow, float]]:
+        order, scores = self.ordering(weights)
+        results = []
+        for index, score in zip(order, scores):
+            row = self.rows[index]
+            if category is None or row.category_slug == category:
+                results.append((row, score))
+                if len(results) == limit:
+                    break
+        return results
+
+
+def _safe_div(numerator: float, denominator: float) -> float:
+    return truediv(numerator, denominator) if denominator else float("nan")
+
+
+async def load_feature_matrix(db: AsyncSession) -> FeatureMatrix:
+    """Build the matrix from food_rankings in national rank order"""
+    result = await db.execute(
+        select(
+            models.FoodRanking, models.Food.name, models.Food.slug, models.Food.species_id, models.FoodCategory.slug
+        )
+        .join(models.Food, models.Food.id == models.FoodRanking.food_id)
+        .outerjoin(models.FoodCategory, models.FoodCategory.id == models.FoodRanking.category_id)
+        .order_by(models.FoodRanking.rank)
+    )
+    return FeatureMatrix([
+        RankedRow(
+            food_id=ranking.food_id, name=name, slug=slug, category_slug=category_slug,
+            national_rank=ranking.rank, ranking=ranking, species_id=species_id,
+        )
+        for ranking, name, slug, species_id, category_slug in result.all()
+    ])
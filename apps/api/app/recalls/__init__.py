@@ -0,0 +1,83 @@
+"""
+Recall aggregates, food links and the live recall stream
+
+``add_recalls_to_rollup`` keeps the daily recall rollup current during
+ingest; ``recall_summary`` and ``recall_timeseries`` serve
+/api/v1/recalls/stats/summary and /stats/timeseries from it.
+
+``link_recalls`` sets ``FoodRecall.food_id`` from a ``FoodTokenIndex`` over
+food names, so per-food recall lookups are indexed equality matches.
+
+``recall_broadcaster()`` fans newly ingested recalls out to
+/api/v1/recalls/stream subscribers; it polls for them when an ingest run
+reports that ``food_recalls`` changed (see ``on_ingest_finished``).
+"""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.recalls.linker import FoodTokenIndex, link_recalls, link_recalls_to_food, load_food_token_index
+from app.recalls.rollup import (
+    RollupMismatch,
+    add_recalls_to_rollup,
+    check_recall_rollup,
+    rebuild_recall_rollup,
+    recall_summary,
+)
+from app.recalls.stream import PENDING_MAX_RETRIES, PENDING_RETRY_DELAY, RecallBroadcaster, Subscription
+from app.recalls.timeseries import BUCKETS, SERIES_BY, recall_timeseries
+
+logger = logging.getLogger(__name__)
+
+_broadcaster = RecallBroadcaster(
+    queue_size=settings.RECALL_STREAM_QUEUE_SIZE,
+    max_subscribers=settings.RECALL_STREAM_MAX_SUBSCRIBERS,
+)
+
+
+def recall_broadcaster() -> RecallBroadcaster:
+    """This worker's recall stream broadcaster"""
+    return _broadcaster
+
+
+async def start_recall_stream() -> None:
+    """Set the stream's high-water mark to the newest recall already stored"""
+    async with AsyncSessionLocal() as session:
+        await _broadcaster.load_watermark(session)
+
+
+async def on_ingest_finished(tables: set) -> None:
+    """Push recalls an ingest run added to stream subscribers"""
+    if "food_recalls" not in tables:
+        return
+    for attempt in range(PENDING_MAX_RETRIES + 1):
+        if attempt:
+            # Committed recalls wait behind an older transaction that is still running
+            await asyncio.sleep(PENDING_RETRY_DELAY)
+        async with AsyncSessionLocal() as session:
+            published = await _broadcaster.poll(session)
+        logger.info(f"Recall stream: {published} new recalls for {len(_broadcaster)} subscribers")
+        if not _broadcaster.pending:
+            return
+    logger.warning("Recall stream: recalls still held back by a long-running transaction; the next ingest run pushes them")
+
+__all__ = [
+    "RollupMismatch",
+    "add_recalls_to_rollup",
+    "check_recall_rollup",
+    "rebuild_recall_rollup",
+    "recall_summary",
+    "BUCKETS",
+    "SERIES_BY",
+    "recall_timeseries",
+    "FoodTokenIndex",
+    "load_food_token_index",
+    "link_recalls",
+    "link_recalls_to_food",
+    "RecallBroadcaster",
+    "Subscription",
+    "recall_broadcaster",
+    "start_recall_stream",
+    "on_ingest_finished",
+]
@@ -0,0 +1,174 @@
+"""
+Recall-to-food linker
+
+Sets ``FoodRecall.food_id`` in bulk during ingest so recall lookups for a
+food are an indexed equality match instead of an ILIKE scan per request.
+
+Food names are reduced to species-style tokens (lowercase, singular, filler
+dropped). A recall links to a food when the food's core tokens (qualifiers
+such as "canned" or "wild" left out) all appear in the recall's product
+description. When several foods match, the most specific one wins: more
+core tokens, then more matching qualifiers, then the shorter name. Recalls
+naming no food but a species alias ("Albacore in water") fall back to the
+species' primary food.
+
+``FoodTokenIndex`` files each food under its rarest core token, so a
+recall only checks the foods filed under its own tokens.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.search.fulltext import TSCONFIG, matches_recall_product
+from app.search.species import QUALIFIER_WORDS, SpeciesIndex, species_tokens
+
+# Recalls read and updated per round trip
+LINK_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class FoodTokens:
+    food_id: UUID
+    name: str
+    core: FrozenSet[str]
+    qualifiers: FrozenSet[str]
+
+
+def food_tokens(food_id: UUID, name: str) -> Optional[FoodTokens]:
+    tokens = set(species_tokens(name))
+    core = tokens - QUALIFIER_WORDS
+    if not core:
+        # A name made only of qualifiers ("Smoked") has to match in full
+        core, tokens = tokens, set()
+    if not core:
+        return None
+    return FoodTokens(food_id, name, frozenset(core), frozenset(tokens - core))
+
+
+class FoodTokenIndex:
+    """Token index over food names, with an optional species alias fallback"""
+
+    def __init__(
+        self,
+        foods: Iterable[Tuple[UUID, str]],
+        species: Optional[SpeciesIndex] = None,
+        food_by_species: Optional[Dict[int, UUID]] = None,
+    ):
+        entries = [entry for entry in (food_tokens(i, name) for i, name in foods) if entry]
+        frequency = Counter(token for entry in entries for token in entry.core)
+        self.by_token: Dict[str, List[FoodTokens]] = {}
+        for entry in entries:
+            rarest = min(entry.core, key=lambda token: (frequency[token], token))
+            self.by_token.setdefault(rarest, []).append(entry)
+        self.size = len(entries)
+        self.species = species
+        self.food_by_species = food_by_species or {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def match(self, description: Optional[str]) -> Optional[UUID]:
+        """Id of the food a recall's product description names, or None"""
+        if not description:
+            return None
+        tokens = set(species_tokens(description))
+        best, best_score = None, None
+        for token in tokens:
+            for entry in self.by_token.get(token, ()):
+                if entry.core <= tokens:
+                    score = (len(entry.core), len(entry.qualifiers & tokens), -len(entry.name), entry.name)
+                    if best_score is None or score > best_score:
+                        best, best_score = entry, score
+        if best:
+            return best.food_id
+
+        if self.species:
+            species = self.species.resolve(description)
+            if species:
+                return self.food_by_species.get(species.id)
+        return None
+
+
+async def load_food_token_index(
+    db: AsyncSession,
+    species: Optional[SpeciesIndex] = None,
+    food_by_species: Optional[Dict[int, UUID]] = None,
+) -> FoodTokenIndex:
+    """Build the index from every food's name (one query)"""
+    result = await db.execute(select(models.Food.id, models.Food.name))
+    return FoodTokenIndex(result.all(), species, food_by_species)
+
+
+async def link_recalls(db: AsyncSession, index: FoodTokenIndex, recall_ids: Optional[Sequence[UUID]] = None) -> int:
+    """
+    Set ``food_id`` on unlinked recalls the index can match; returns the number linked
+
+    Covers every unlinked recall unless ``recall_ids`` narrows it down, so
+    recalls ingested before their food existed get linked on a later run.
+    Reads and writes in keyset batches; caller commits.
+    """
+    recall = models.FoodRecall
+    where = [recall.food_id.is_(None)]
+    if recall_ids is not None:
+        where.append(recall.id.in_(list(recall_ids)))
+
+    linked = 0
+    last_id = None
+    while True:
+        batch_where = where + ([recall.id > last_id] if last_id is not None else [])
+        rows = (await db.execute(
+            select(recall.id, recall.product_description)
+            .where(*batch_where)
+            .order_by(recall.id)
+            .limit(LINK_BATCH_SIZE)
+        )).all()
+        if not rows:
+            return linked
+
+        links = []
+        for recall_id, description in rows:
+            food_id = index.match(description)
+            if food_id:
+                links.append({"id": recall_id, "food_id": food_id})
+        if links:
+            # Bulk UPDATE ... WHERE id = :id (executemany)
+            await db.execute(update(recall), links)
+            linked += len(links)
+        last_id = rows[-1][0]
+
+
+async def link_recalls_to_food(db: AsyncSession, food: models.Food) -> int:
+    """
+    Link unlinked recalls naming one newly added food; returns the number linked
+
+    For foods added between ingest runs (barcode import). The recalls'
+    full-text index finds candidates whose product description mentions the
+    name; each is then confirmed with the same token match ``link_recalls``
+    uses, so company names and recall reasons never link a recall. Caller
+    commits.
+    """
+    index = FoodTokenIndex([(food.id, food.name)]) if food.name else None
+    if not index:
+        return 0
+    recall = models.FoodRecall
+    rows = (await db.execute(
+        select(recall.id, recall.product_description)
+        .where(
+            recall.food_id.is_(None),
+            matches_recall_product(func.plainto_tsquery(TSCONFIG, food.name)),
+        )
+    )).all()
+    recall_ids = [recall_id for recall_id, description in rows if index.match(description) == food.id]
+    for start in range(0, len(recall_ids), LINK_BATCH_SIZE):
+        await db.execute(
+            update(recall)
+            .where(recall.id.in_(recall_ids[start:start + LINK_BATCH_SIZE]))
+            .values(food_id=food.id)
+            .execution_options(synchronize_session=False)
+        )
+    return len(recall_ids)
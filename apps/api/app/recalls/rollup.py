@@ -0,0 +1,137 @@
+"""
+Daily recall rollup
+
+``recall_daily_counts`` holds recall counts per (UTC day, classification,
+status, state). Ingest adds each batch of new recalls to it in the same
+transaction (``add_recalls_to_rollup``), so /recalls/stats/summary sums at
+most days x k small rows instead of loading every recall in the window.
+
+``check_recall_rollup`` compares the rollup with a full recount of
+``food_recalls``; ``rebuild_recall_rollup`` replaces it with that recount.
+Recalls without a recall_date are never in a dated window and are left out.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple
+
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+Rollup = models.RecallDailyCount
+ROLLUP_KEY = ("day", "classification", "status", "state")
+
+# Summary shape kept from the original /recalls/stats/summary
+CLASSIFICATIONS = ("Class I", "Class II", "Class III")
+TOP_STATES = 10
+
+
+def recount_query(*where):
+    """Rollup rows recounted from food_recalls (optionally only some of them)"""
+    recall = models.FoodRecall
+    # Literals rather than bound parameters, so GROUP BY repeats the exact select expressions
+    missing = literal_column("''")
+    key = (
+        func.date(func.timezone(literal_column("'UTC'"), recall.recall_date)).label("day"),
+        func.coalesce(recall.classification, missing).label("classification"),
+        func.coalesce(recall.status, missing).label("status"),
+        func.coalesce(recall.state, missing).label("state"),
+    )
+    return (
+        select(*key, func.count().label("recall_count"))
+        .where(recall.recall_date.is_not(None), *where)
+        .group_by(*key)
+    )
+
+
+async def add_recalls_to_rollup(db: AsyncSession, recalls: Iterable[models.FoodRecall]) -> None:
+    """Count newly added recalls into the rollup; call before committing them"""
+    recalls = list(recalls)
+    if not recalls:
+        return
+    await db.flush()
+    insert = pg_insert(Rollup).from_select(
+        [*ROLLUP_KEY, "recall_count"], recount_query(models.FoodRecall.id.in_([r.id for r in recalls]))
+    )
+    await db.execute(insert.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={"recall_count": Rollup.recall_count + insert.excluded.recall_count},
+    ))
+
+
+async def rebuild_recall_rollup(db: AsyncSession) -> int:
+    """Replace the rollup with a full recount; caller commits"""
+    await db.execute(delete(Rollup))
+    result = await db.execute(
+        pg_insert(Rollup).from_select([*ROLLUP_KEY, "recall_count"], recount_query())
+    )
+    return result.rowcount
+
+
+class RollupMismatch(NamedTuple):
+    day: date
+    classification: str
+    status: str
+    state: str
+    rolled_up: int
+    recounted: int
+
+
+async def check_recall_rollup(db: AsyncSession) -> List[RollupMismatch]:
+    """Rollup rows that disagree with a full recount (empty when consistent)"""
+    recount = recount_query().subquery()
+    joined = recount.join(
+        Rollup,
+        (recount.c.day == Rollup.day)
+        & (recount.c.classification == Rollup.classification)
+        & (recount.c.status == Rollup.status)
+        & (recount.c.state == Rollup.state),
+        full=True,
+    )
+    rolled_up = func.coalesce(Rollup.recall_count, 0)
+    recounted = func.coalesce(recount.c.recall_count, 0)
+    result = await db.execute(
+        select(
+            *(func.coalesce(getattr(recount.c, name), getattr(Rollup, name)) for name in ROLLUP_KEY),
+            rolled_up,
+            recounted,
+        )
+        .select_from(joined)
+        .where(rolled_up != recounted)
+        .order_by(func.coalesce(recount.c.day, Rollup.day))
+    )
+    return [RollupMismatch(*row) for row in result.all()]
+
+
+async def recall_summary(db: AsyncSession, days: int) -> Dict:
+    """/recalls/stats/summary for the last ``days`` days, from the rollup"""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
+    result = await db.execute(
+        select(Rollup.classification, Rollup.status, Rollup.state, func.sum(Rollup.recall_count))
+        .where(Rollup.day >= cutoff)
+        .group_by(Rollup.classification, Rollup.status, Rollup.state)
+    )
+
+    total = 0
+    by_classification = {name: 0 for name in CLASSIFICATIONS}
+    by_status: Dict[str, int] = {}
+    by_state: Dict[str, int] = {}
+    for classification, status, state, count in result.all():
+        total += count
+        if classification in by_classification:
+            by_classification[classification] += count
+        status = status or "Unknown"
+        by_status[status] = by_status.get(status, 0) + count
+        if state:
+            by_state[state] = by_state.get(state, 0) + count
+
+    top_states = sorted(by_state.items(), key=lambda item: item[1], reverse=True)[:TOP_STATES]
+    return {
+        "period_days": days,
+        "total_recalls": total,
+        "by_classification": by_classification,
+        "by_status": by_status,
+        "top_states": dict(top_states),
+        "critical_recalls": by_classification["Class I"],
+    }
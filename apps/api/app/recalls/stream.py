@@ -0,0 +1,155 @@
+"""
+Live recall stream
+
+One ``RecallBroadcaster`` per worker fans newly ingested recalls out to the
+/api/v1/recalls/stream subscribers. Subscribers never touch the database:
+when an ingest run reports that ``food_recalls`` changed, the broadcaster
+loads the recalls added since its high-water mark (once per worker),
+renders each as an SSE event once and puts it on the queue of every
+subscriber whose classification/state filter matches.
+
+The high-water mark is a transaction id, not a timestamp: each recall
+records the id of the transaction that inserted it (``ingest_xid``), and a
+poll takes the recalls whose transaction is below the oldest one still
+running (``pg_snapshot_xmin``), then moves the mark up to it. Every
+transaction below the mark has finished, so a transaction that started
+early but committed late is picked up by a later poll instead of being
+skipped. While such a transaction holds the mark back, the poll is retried
+(see ``on_ingest_finished``).
+
+A subscriber that falls ``RECALL_STREAM_QUEUE_SIZE`` events behind is
+dropped; its client reconnects (EventSource does so automatically) and can
+backfill from /recalls/recent.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from sqlalchemy import BigInteger, Text, cast, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.schemas.recalls import RecallResponse
+
+logger = logging.getLogger(__name__)
+
+# Most recalls pushed per ingest run; a bulk backfill shouldn't flood every client
+MAX_EVENTS_PER_INGEST = 500
+
+# Polls while an older, still-running transaction holds the watermark back
+PENDING_RETRY_DELAY = 1.0
+PENDING_MAX_RETRIES = 30
+
+
+@dataclass(frozen=True)
+class RecallEvent:
+    classification: Optional[str]
+    state: Optional[str]
+    message: bytes
+
+
+def recall_event(recall: models.FoodRecall) -> RecallEvent:
+    """SSE message for one recall (rendered once, shared by all subscribers)"""
+    data = RecallResponse.model_validate(recall).model_dump_json()
+    return RecallEvent(
+        classification=recall.classification,
+        state=recall.state,
+        message=f"id: {recall.recall_number}\nevent: recall\ndata: {data}\n\n".encode(),
+    )
+
+
+@dataclass(eq=False)
+class Subscription:
+    classification: Optional[str] = None
+    state: Optional[str] = None
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    dropped: bool = False
+
+    def wants(self, event: RecallEvent) -> bool:
+        return (
+            (self.classification is None or event.classification == self.classification)
+            and (self.state is None or event.state == self.state)
+        )
+
+
+class RecallBroadcaster:
+    """In-process fan-out of new recalls to stream subscribers"""
+
+    def __init__(self, queue_size: int = 100, max_subscribers: int = 10_000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: Set[Subscription] = set()
+        self.watermark: Optional[int] = None
+        # Recalls from transactions that were still running at the last poll
+        self.pending = False
+        self.started = False
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    def subscribe(self, classification: Optional[str] = None, state: Optional[str] = None) -> Subscription:
+        """Register a subscriber; raises ValueError when the worker is at capacity"""
+        if len(self.subscribers) >= self.max_subscribers:
+            raise ValueError("Too many recall stream subscribers")
+        subscription = Subscription(
+            classification=classification,
+            state=state.upper() if state else None,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def publish(self, events: List[RecallEvent]) -> int:
+        """Queue events for matching subscribers, dropping any that can't keep up; returns deliveries"""
+        delivered = 0
+        for subscription in list(self.subscribers):
+            for event in events:
+                if not subscription.wants(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                    delivered += 1
+                except asyncio.QueueFull:
+                    subscription.dropped = True
+                    self.unsubscribe(subscription)
+                    logger.warning("Dropped a recall stream subscriber that fell behind")
+                    break
+        return delivered
+
+    async def load_watermark(self, db: AsyncSession) -> None:
+        """Start from the recalls already committed"""
+        self.watermark = await _finished_below(db)
+        self.started = True
+
+    async def poll(self, db: AsyncSession) -> int:
+        """Publish recalls committed since the watermark; returns the number of new recalls"""
+        async with self._lock:
+            if not self.started:
+                # No watermark from startup: everything would look new
+                await self.load_watermark(db)
+                return 0
+            cutoff = await _finished_below(db)
+            recall = models.FoodRecall
+            recalls = []
+            if self.subscribers and cutoff > self.watermark:
+                recalls = (await db.execute(
+                    select(recall)
+                    .where(recall.ingest_xid >= self.watermark, recall.ingest_xid < cutoff)
+                    .order_by(recall.ingest_xid.desc(), recall.created_at.desc(), recall.id.desc())
+                    .limit(MAX_EVENTS_PER_INGEST)
+                )).scalars().all()
+            self.watermark = max(self.watermark, cutoff)
+            self.pending = bool(await db.scalar(select(exists().where(recall.ingest_xid >= self.watermark))))
+            self.publish([recall_event(r) for r in reversed(recalls)])
+            return len(recalls)
+
+
+async def _finished_below(db: AsyncSession) -> int:
+    """Transaction id below which every transaction has committed or rolled back"""
+    snapshot_xmin = func.pg_snapshot_xmin(func.pg_current_snapshot())
+    return await db.scalar(select(cast(cast(snapshot_xmin, Text), BigInteger)))
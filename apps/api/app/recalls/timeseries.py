@@ -0,0 +1,99 @@
+"""
+Recall time series
+
+Bucketed recall counts (week, month, quarter or year), optionally split by
+classification, status or state. Buckets are ``date_trunc`` groups over the
+daily rollup rather than over food_recalls, so ten years is at most a few
+thousand days x k rows however many recalls there are. Buckets without
+recalls are filled with zeros so every series lines up with ``buckets``.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import Date, DateTime, cast, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+Rollup = models.RecallDailyCount
+
+BUCKETS = ("week", "month", "quarter", "year")
+SERIES_BY = ("classification", "status", "state")
+
+# Months per bucket for the calendar buckets
+_BUCKET_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the bucket containing ``day``, like Postgres ``date_trunc``"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    months = _BUCKET_MONTHS[bucket]
+    month = (day.month - 1) // months * months + 1
+    return date(day.year, month, 1)
+
+
+def next_bucket(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    month = start.month - 1 + _BUCKET_MONTHS[bucket]
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_starts(first: date, last: date, bucket: str) -> List[date]:
+    """Every bucket from the one containing ``first`` through the one containing ``last``"""
+    starts = []
+    current = bucket_start(first, bucket)
+    while current <= last:
+        starts.append(current)
+        current = next_bucket(current, bucket)
+    return starts
+
+
+def timeseries_query(bucket: str, by: Optional[str], since: date, until: date):
+    # The bucket is a literal (from BUCKETS), so GROUP BY repeats the exact select expression.
+    # Truncating a timestamp without time zone keeps the session TimeZone out of it.
+    start = cast(
+        func.date_trunc(literal_column(f"'{bucket}'"), cast(Rollup.day, DateTime)), Date
+    ).label("bucket_start")
+    columns = [start] + ([getattr(Rollup, by)] if by else [])
+    return (
+        select(*columns, func.sum(Rollup.recall_count))
+        .where(Rollup.day >= since, Rollup.day <= until)
+        .group_by(*columns)
+    )
+
+
+async def recall_timeseries(db: AsyncSession, bucket: str, by: Optional[str], days: int) -> Dict:
+    """Recall counts per bucket over the last ``days`` days, optionally one series per ``by`` value"""
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if by is not None and by not in SERIES_BY:
+        raise ValueError(f"Unknown series: {by}")
+
+    today = datetime.now(timezone.utc).date()
+    since = today - timedelta(days=days)
+    starts = bucket_starts(since, today, bucket)
+    position = {start: i for i, start in enumerate(starts)}
+
+    totals = [0] * len(starts)
+    series: Dict[str, List[int]] = {}
+    for row in (await db.execute(timeseries_query(bucket, by, since, today))).all():
+        index = position.get(row[0])
+        if index is None:
+            # Buckets outside the window are skipped rather than failing the response
+            continue
+        count = int(row[-1])
+        totals[index] += count
+        if by:
+            key = row[1] or "Unknown"
+            series.setdefault(key, [0] * len(starts))[index] += count
+
+    return {
+        "bucket": bucket,
+        "by": by,
+        "days": days,
+        "buckets": starts,
+        "totals": totals,
+        "series": dict(sorted(series.items(), key=lambda item: (-sum(item[1]), item[0]))),
+    }
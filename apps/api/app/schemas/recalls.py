@@ -3,7 +3,7 @@ Pydantic schemas for food recalls
 """
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 
 
@@ -64,9 +64,18 @@ class RecallResponse(RecallBase):
         from_attributes = True
 
 
+class RecallFacets(BaseModel):
+    """Recall counts per value of each filter, within the current filters (most common first)"""
+    classification: Dict[str, int] = {}
+    state: Dict[str, int] = {}
+    status: Dict[str, int] = {}
+
+
 class RecallListResponse(BaseModel):
     """Schema for paginated recall list"""
     recalls: List[RecallResponse]
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
+    facets: Optional[RecallFacets] = None
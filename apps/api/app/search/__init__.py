@@ -0,0 +1,158 @@
+"""
+Food search backends
+
+``get_backend(name)`` returns the strategy behind /api/v1/search:
+
+- ``bm25``: in-process BM25 index, built at startup (the default; falls back
+  to ``trigram`` until ready)
+- ``trigram``: Postgres pg_trgm similarity search
+- ``substring``: legacy Postgres ILIKE search
+
+Every worker keeps its BM25 index current: its own ORM writes are applied
+on commit, foods other processes announce on ``foods_changed`` are
+re-read by id (``on_foods_changed``), and an ingest run's
+``ingest_finished`` notification triggers a full rebuild. Writes that skip
+both notifications (ad-hoc SQL) show up at the next rebuild.
+
+``species_index()`` resolves FDA/EWG/NOAA/EPA species names to canonical
+species and expands BM25 queries with species aliases.
+
+``suggest_index()`` serves /api/v1/search/suggest typeahead completions.
+Both in-memory indexes are rebuilt off to the side and swapped in whole
+when an ingest run finishes (see ``on_ingest_finished``).
+"""
+import asyncio
+import logging
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.search.base import SearchBackend, SearchPage
+from app.search.bm25 import BM25Index, BM25SearchBackend
+from app.search.indexer import apply_food_changes, build_food_index, register_index_listeners
+from app.search.sql import SubstringSearchBackend, TrigramSearchBackend
+from app.search.suggest import SuggestIndex, Suggestion, load_suggestions
+from app.search.species import SpeciesIndex, load_species_index
+
+logger = logging.getLogger(__name__)
+
+_species = SpeciesIndex(ready=False)
+_trigram = TrigramSearchBackend()
+_bm25 = BM25SearchBackend(BM25Index(), fallback=_trigram, expand=lambda q: _species.expansion_terms(q))
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (_bm25, _trigram, SubstringSearchBackend())
+}
+
+_suggest = SuggestIndex(ready=False)
+_suggest_lock = asyncio.Lock()
+
+register_index_listeners(lambda: _bm25.index)
+
+
+def get_backend(name: str) -> SearchBackend:
+    """Look up a search backend by name"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown search backend: {name}")
+
+
+def food_index() -> BM25Index:
+    """The live BM25 index"""
+    return _bm25.index
+
+
+async def rebuild_food_index() -> BM25Index:
+    """Rebuild the BM25 index from the database and swap it in atomically"""
+    async with AsyncSessionLocal() as session:
+        index = await build_food_index(session)
+    _bm25.index = index
+    logger.info(f"Search index built with {len(index)} foods")
+    return index
+
+
+async def on_foods_changed(food_ids: set) -> None:
+    """Re-index foods another process inserted, updated or deleted"""
+    index = _bm25.index
+    if not index.ready:
+        # The startup build (or its fallback) will pick them up
+        return
+    ids = set()
+    for food_id in food_ids:
+        try:
+            ids.add(UUID(food_id))
+        except ValueError:
+            logger.warning(f"Ignoring malformed food id in foods_changed notification: {food_id!r}")
+    async with AsyncSessionLocal() as session:
+        indexed = await apply_food_changes(session, index, ids)
+    logger.info(f"Search index: re-indexed {indexed} of {len(ids)} changed foods")
+
+
+def species_index() -> SpeciesIndex:
+    """The live species alias index"""
+    return _species
+
+
+async def rebuild_species_index() -> SpeciesIndex:
+    """Reload the species alias index from the database and swap it in atomically"""
+    global _species
+    async with AsyncSessionLocal() as session:
+        _species = await load_species_index(session)
+    logger.info(f"Species index built with {len(_species)} species")
+    return _species
+
+
+def suggest_index() -> SuggestIndex:
+    """The live typeahead index"""
+    return _suggest
+
+
+async def ensure_suggest_index() -> SuggestIndex:
+    """The typeahead index, building it first if this worker has none yet"""
+    async with _suggest_lock:
+        if not _suggest.ready:
+            await rebuild_suggest_index()
+    return _suggest
+
+
+async def rebuild_suggest_index() -> SuggestIndex:
+    """Rebuild the typeahead index from the database and swap it in atomically"""
+    global _suggest
+    async with AsyncSessionLocal() as session:
+        suggestions = await load_suggestions(session)
+    _suggest = SuggestIndex(suggestions)
+    logger.info(f"Suggest index built with {len(_suggest)} entries")
+    return _suggest
+
+
+async def on_ingest_finished(tables: set) -> None:
+    """Rebuild the indexes that depend on the tables an ingest run changed"""
+    if "species" in tables:
+        await rebuild_species_index()
+    if "foods" in tables and settings.SEARCH_BACKEND == "bm25":
+        await rebuild_food_index()
+    if tables & {"foods", "food_recalls", "state_advisories", "sustainability_ratings"}:
+        await rebuild_suggest_index()
+
+
+__all__ = [
+    "SearchBackend",
+    "SearchPage",
+    "BM25Index",
+    "BACKENDS",
+    "get_backend",
+    "food_index",
+    "rebuild_food_index",
+    "on_foods_changed",
+    "SpeciesIndex",
+    "species_index",
+    "rebuild_species_index",
+    "SuggestIndex",
+    "Suggestion",
+    "suggest_index",
+    "ensure_suggest_index",
+    "rebuild_suggest_index",
+    "on_ingest_finished",
+]
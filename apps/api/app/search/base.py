@@ -0,0 +1,45 @@
+"""
+Search backend interface
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass
+class SearchPage:
+    """One page of food search results"""
+    total: int
+    # ORM Food rows or schemas.Food documents; both serialize as schemas.Food
+    foods: List[Any] = field(default_factory=list)
+    backend: str = ""
+    # Sort-key values of the last food when more results follow (for keyset pagination)
+    next_after: Optional[Tuple[Any, ...]] = None
+
+
+class SearchBackend(ABC):
+    """A strategy for answering /api/v1/search queries"""
+
+    name: str = ""
+
+    def serving(self, cursor_backend: Optional[str] = None) -> "SearchBackend":
+        """
+        The backend that answers the next search: this one unless it hands off to another
+
+        ``cursor_backend`` names the backend that issued the request's cursor.
+        """
+        return self
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        q: str,
+        limit: int = 20,
+        offset: int = 0,
+        min_similarity: float | None = None,
+        after: Optional[Tuple[Any, ...]] = None,
+    ) -> SearchPage:
+        """Return one page of foods matching ``q``, starting after the ``after`` sort key when given"""
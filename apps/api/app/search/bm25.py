@@ -0,0 +1,178 @@
+"""
+In-process BM25 search over foods
+
+The index keeps a tokenized inverted index of ``Food.name``,
+``Food.common_names`` and ``Food.description`` in memory, scored with a
+field-weighted BM25 (name matches count more than description matches).
+Documents are stored as ``schemas.Food`` so a search is answered without
+touching Postgres.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import schemas
+from app.search.base import SearchBackend, SearchPage
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Weight of terms added by query expansion relative to terms the user typed
+EXPANSION_WEIGHT = 0.5
+
+# Field weights for the combined term frequency
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "common_names": 2.0,
+    "description": 1.0,
+}
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Lowercase word tokens with a light plural strip ("sardines" -> "sardine")"""
+    if not value:
+        return []
+    tokens = []
+    for token in TOKEN_RE.findall(value.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def document_terms(name: str, common_names: Iterable[str] | None, description: str | None) -> Counter:
+    """Field-weighted term frequencies for one food"""
+    terms = Counter()
+    for token in tokenize(name):
+        terms[token] += FIELD_WEIGHTS["name"]
+    for common_name in common_names or []:
+        for token in tokenize(common_name):
+            terms[token] += FIELD_WEIGHTS["common_names"]
+    for token in tokenize(description):
+        terms[token] += FIELD_WEIGHTS["description"]
+    return terms
+
+
+class BM25Index:
+    """Incrementally updatable BM25 inverted index keyed by food id"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[UUID, float]] = {}
+        self.doc_terms: Dict[UUID, Counter] = {}
+        self.doc_lengths: Dict[UUID, float] = {}
+        self.documents: Dict[UUID, schemas.Food] = {}
+        self.total_length = 0.0
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, food: schemas.Food) -> None:
+        """Index (or re-index) one food"""
+        if food.id in self.documents:
+            self.remove(food.id)
+
+        terms = document_terms(food.name, food.common_names, food.description)
+        for term, weight in terms.items():
+            self.postings.setdefault(term, {})[food.id] = weight
+
+        length = sum(terms.values())
+        self.doc_terms[food.id] = terms
+        self.doc_lengths[food.id] = length
+        self.documents[food.id] = food
+        self.total_length += length
+
+    def remove(self, food_id: UUID) -> None:
+        """Drop a food from the index if present"""
+        terms = self.doc_terms.pop(food_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(food_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(food_id)
+        self.documents.pop(food_id, None)
+
+    def score(self, q: str, expansions: Iterable[str] = ()) -> Dict[UUID, float]:
+        """BM25 score of every document matching at least one query (or expansion) term"""
+        n_docs = len(self.documents)
+        if not n_docs:
+            return {}
+        avg_length = self.total_length / n_docs or 1.0
+
+        query_weights = {term: EXPANSION_WEIGHT for e in expansions for term in tokenize(e)}
+        query_weights.update({term: 1.0 for term in tokenize(q)})
+
+        scores: Dict[UUID, float] = {}
+        for term, query_weight in query_weights.items():
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = query_weight * math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, q: str, limit: int = 20, offset: int = 0,
+               after: Optional[Tuple[Any, ...]] = None,
+               expansions: Iterable[str] = ()) -> Tuple[int, List[Tuple[float, schemas.Food]]]:
+        """Total matches and one page of (score, document), best score first
+
+        ``after`` is a ``(score, name, id)`` keyset cursor; ``offset`` is ignored when it is given.
+        """
+        scores = self.score(q, expansions)
+
+        def sort_key(item):
+            return (-item[1], self.documents[item[0]].name, str(item[0]))
+
+        candidates = scores.items()
+        if after is not None:
+            after_key = (-after[0], after[1], str(after[2]))
+            candidates = [item for item in candidates if sort_key(item) > after_key]
+            offset = 0
+
+        top = heapq.nsmallest(offset + limit, candidates, key=sort_key)
+        return len(scores), [(score, self.documents[doc_id]) for doc_id, score in top[offset:]]
+
+
+class BM25SearchBackend(SearchBackend):
+    """Serve search from an in-memory BM25 index, falling back to SQL until it is built"""
+
+    name = "bm25"
+
+    def __init__(self, index: BM25Index, fallback: SearchBackend,
+                 expand: Optional[Callable[[str], List[str]]] = None):
+        self.index = index
+        self.fallback = fallback
+        # Returns extra query terms for q, e.g. species aliases
+        self.expand = expand
+
+    def serving(self, cursor_backend: Optional[str] = None) -> SearchBackend:
+        # Results paged through on the fallback keep paging there once the index is ready
+        if not self.index.ready or cursor_backend == self.fallback.name:
+            return self.fallback.serving(cursor_backend)
+        return self
+
+    async def search(self, db: AsyncSession, q: str, limit: int = 20, offset: int = 0,
+                     min_similarity: float | None = None,
+                     after: Optional[Tuple[Any, ...]] = None) -> SearchPage:
+        if not self.index.ready:
+            return await self.fallback.search(
+                db, q, limit=limit, offset=offset, min_similarity=min_similarity, after=after
+            )
+
+        expansions = self.expand(q) if self.expand else ()
+        total, hits = self.index.search(q, limit=limit + 1, offset=offset, after=after, expansions=expansions)
+        page, more = hits[:limit], len(hits) > limit
+        next_after = (page[-1][0], page[-1][1].name, page[-1][1].id) if more else None
+        return SearchPage(total=total, foods=[food for _, food in page], backend=self.name, next_after=next_after)
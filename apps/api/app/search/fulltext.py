@@ -0,0 +1,125 @@
+"""
+Cross-entity full-text search
+
+Foods, recalls, state advisories and research papers each carry a generated,
+GIN-indexed ``search_vector``. ``unified_query`` builds one UNION ALL
+statement with a ranked, limited branch per entity type, so a query is
+answered in a single round trip; ``count(*) OVER ()`` in each branch gives
+the per-type match count alongside the top hits.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import Float, String, and_, cast, func, literal, literal_column, select, union_all
+
+from app.db import models
+
+TSCONFIG = "english"
+
+# type -> (model, title, subtitle, ref) where ref is the identifier a client links with
+ENTITY_COLUMNS = {
+    "foods": lambda: (
+        models.Food,
+        models.Food.name,
+        func.left(models.Food.description, 200),
+        models.Food.slug,
+    ),
+    "recalls": lambda: (
+        models.FoodRecall,
+        func.left(models.FoodRecall.product_description, 200),
+        models.FoodRecall.company_name,
+        models.FoodRecall.recall_number,
+    ),
+    "advisories": lambda: (
+        models.StateAdvisory,
+        models.StateAdvisory.fish_species,
+        func.concat_ws(", ", models.StateAdvisory.waterbody_name, models.StateAdvisory.state_name),
+        models.StateAdvisory.state_code,
+    ),
+    "papers": lambda: (
+        models.ResearchPaper,
+        models.ResearchPaper.title,
+        models.ResearchPaper.journal,
+        func.coalesce(models.ResearchPaper.doi, models.ResearchPaper.url),
+    ),
+}
+
+ENTITY_TYPES = tuple(ENTITY_COLUMNS)
+
+
+def ts_query(q: str):
+    """Parse user input with web-search syntax ("quoted phrases", -exclusions, OR)"""
+    return func.websearch_to_tsquery(TSCONFIG, q)
+
+
+def matches_recall_product(query):
+    """
+    ``query`` matches a recall's product description (weight A), not its company or reason
+
+    The GIN index on the whole vector narrows the rows; ``ts_filter`` rechecks them.
+    """
+    vector = models.FoodRecall.search_vector
+    return and_(vector.op("@@")(query), func.ts_filter(vector, literal_column("'{a}'")).op("@@")(query))
+
+
+def entity_branch(entity_type: str, q: str, limit: int):
+    """Top ``limit`` rows of one entity type, ranked by ts_rank"""
+    model, title, subtitle, ref = ENTITY_COLUMNS[entity_type]()
+    query = ts_query(q)
+    rank = func.ts_rank(model.search_vector, query)
+    return (
+        select(
+            literal(entity_type).label("type"),
+            cast(model.id, String).label("id"),
+            cast(title, String).label("title"),
+            cast(subtitle, String).label("subtitle"),
+            cast(ref, String).label("ref"),
+            cast(rank, Float).label("rank"),
+            func.count().over().label("total"),
+        )
+        .where(model.search_vector.op("@@")(query))
+        .order_by(rank.desc())
+        .limit(limit)
+    )
+
+
+def recall_search_query(q: str, limit: int):
+    """
+    Recalls matching ``q``, most relevant first
+
+    Weights rank product description matches over company over reason; ties
+    go to the most recent recall.
+    """
+    recall = models.FoodRecall
+    query = ts_query(q)
+    rank = func.ts_rank(recall.search_vector, query)
+    return (
+        select(recall)
+        .where(recall.search_vector.op("@@")(query))
+        .order_by(rank.desc(), recall.recall_date.desc().nulls_last(), recall.id.desc())
+        .limit(limit)
+    )
+
+
+def unified_query(q: str, types: Iterable[str] = ENTITY_TYPES, limit: int = 5):
+    """Single UNION ALL statement returning the top hits of every requested type"""
+    branches = [entity_branch(t, q, limit).subquery(t).select() for t in types]
+    if len(branches) == 1:
+        return branches[0]
+    return union_all(*branches)
+
+
+def group_hits(rows) -> Dict[str, Dict]:
+    """Group result rows by type: {type: {"total": n, "hits": [...]}}, best rank first"""
+    groups: Dict[str, Dict] = {}
+    for row in rows:
+        group = groups.setdefault(row.type, {"total": row.total, "hits": []})
+        group["hits"].append({
+            "id": row.id,
+            "title": row.title,
+            "subtitle": row.subtitle,
+            "ref": row.ref,
+            "rank": row.rank,
+        })
+    for group in groups.values():
+        group["hits"].sort(key=lambda hit: hit["rank"], reverse=True)
+    return groups
@@ -0,0 +1,110 @@
+"""
+Building and maintaining the in-process BM25 food index
+
+The index is built once at startup and then kept current two ways:
+foods inserted, updated or deleted through any ORM session in this
+process are applied when that session commits, and writes announced by
+other processes on the ``foods_changed`` channel are re-read from the
+database (``apply_food_changes``). Ingest runs trigger a full rebuild.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.db import models, schemas
+from app.search.bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "search_index_pending"
+
+# Category documents by id, used to attach categories to foods indexed incrementally
+_categories: Dict[int, schemas.FoodCategory] = {}
+
+
+async def build_food_index(db: AsyncSession) -> BM25Index:
+    """Load every food and return a freshly built index"""
+    categories = (await db.execute(select(models.FoodCategory))).scalars().all()
+    _categories.clear()
+    _categories.update({c.id: schemas.FoodCategory.model_validate(c) for c in categories})
+
+    result = await db.execute(select(models.Food).options(selectinload(models.Food.category)))
+    index = BM25Index()
+    for food in result.scalars():
+        index.add(schemas.Food.model_validate(food))
+    index.ready = True
+    return index
+
+
+async def apply_food_changes(db: AsyncSession, index: BM25Index, food_ids: Iterable[UUID]) -> int:
+    """Re-index foods from the database, dropping those that no longer exist; returns the number indexed"""
+    food_ids = set(food_ids)
+    if not food_ids:
+        return 0
+    result = await db.execute(
+        select(models.Food).options(selectinload(models.Food.category)).where(models.Food.id.in_(food_ids))
+    )
+    found = set()
+    for food in result.scalars():
+        index.add(schemas.Food.model_validate(food))
+        found.add(food.id)
+    for food_id in food_ids - found:
+        index.remove(food_id)
+    return len(found)
+
+
+def snapshot_food(food: models.Food) -> schemas.Food:
+    """Build a search document from already-loaded attributes (never triggers a lazy load)"""
+    state = inspect(food).dict
+    category_id = state.get("category_id")
+    return schemas.Food(
+        id=state["id"],
+        name=state["name"],
+        slug=state["slug"],
+        common_names=state.get("common_names") or [],
+        description=state.get("description"),
+        image_url=state.get("image_url"),
+        barcode=state.get("barcode"),
+        category_id=category_id,
+        created_at=state.get("created_at") or datetime.now(timezone.utc),
+        updated_at=state.get("updated_at"),
+        category=_categories.get(category_id),
+    )
+
+
+def register_index_listeners(get_index) -> None:
+    """Apply committed Food changes to the index returned by ``get_index()``"""
+
+    @event.listens_for(Session, "after_flush")
+    def _collect_food_changes(session, flush_context):
+        pending: Dict[object, Optional[schemas.Food]] = session.info.setdefault(PENDING_KEY, {})
+        for obj in session.new | session.dirty:
+            if isinstance(obj, models.Food):
+                try:
+                    pending[obj.id] = snapshot_food(obj)
+                except Exception as e:
+                    logger.warning(f"Could not index food {obj.id}: {e}")
+        for obj in session.deleted:
+            if isinstance(obj, models.Food):
+                pending[obj.id] = None
+
+    @event.listens_for(Session, "after_commit")
+    def _apply_food_changes(session):
+        pending = session.info.pop(PENDING_KEY, None)
+        index = get_index()
+        if not pending or not index.ready:
+            return
+        for food_id, document in pending.items():
+            if document is None:
+                index.remove(food_id)
+            else:
+                index.add(document)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard_food_changes(session):
+        session.info.pop(PENDING_KEY, None)
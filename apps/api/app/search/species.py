@@ -0,0 +1,198 @@
+"""
+Canonical species names and their source-specific aliases
+
+FDA says "Tuna (Canned, Albacore)", EWG "Wild salmon", NOAA "Atlantic
+Salmon" and EPA free text such as "Salmon (Chinook)". Every alias is
+reduced to a normalized token key (lowercase, singular, sorted tokens,
+footnotes and filler dropped) so "Tuna (Albacore)" and "albacore tuna"
+share one key. ``SpeciesIndex`` holds key -> species in a dict, making
+resolution O(1) for ingest and for search query expansion.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+FOOTNOTE_RE = re.compile(r"\[[^\]]*\]")
+TOKEN_RE = re.compile(r"[a-z]+")
+
+# Words that never distinguish one species from another
+FILLER_WORDS = {"and", "or", "the", "of", "all", "species", "unknown", "n", "s"}
+
+# Preparation/origin words dropped when the full name has no alias of its own
+QUALIFIER_WORDS = {
+    "wild", "farmed", "canned", "fresh", "frozen", "light", "smoked", "raw", "cooked",
+    "fillet", "fillets", "steak", "whole", "dried", "freshwater", "saltwater",
+}
+
+
+def singular(token: str) -> str:
+    """Crude singular form for seafood nouns ("anchovies" -> "anchovy", "sardines" -> "sardine")"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us")):
+        return token[:-1]
+    return token
+
+
+def species_tokens(name: str) -> List[str]:
+    """Normalized tokens of a species name, sorted"""
+    name = FOOTNOTE_RE.sub(" ", name.lower())
+    tokens = {singular(t) for t in TOKEN_RE.findall(name)}
+    return sorted(tokens - FILLER_WORDS)
+
+
+def species_key(name: str) -> str:
+    """Order-insensitive lookup key for a species name"""
+    return " ".join(species_tokens(name))
+
+
+@dataclass
+class SpeciesEntry:
+    id: int
+    slug: str
+    name: str
+    aliases: List[str] = field(default_factory=list)
+
+
+class SpeciesIndex:
+    """Hash map from normalized alias keys to canonical species"""
+
+    def __init__(self, entries: Iterable[SpeciesEntry] = (), ready: bool = True):
+        self.entries: Dict[int, SpeciesEntry] = {}
+        self.by_key: Dict[str, SpeciesEntry] = {}
+        for entry in entries:
+            self.entries[entry.id] = entry
+            for name in [entry.name, *entry.aliases]:
+                key = species_key(name)
+                existing = self.by_key.setdefault(key, entry)
+                if existing is not entry:
+                    logger.warning(f"Alias {name!r} of {entry.slug} already belongs to {existing.slug}")
+        self.ready = ready
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, name: Optional[str]) -> Optional[SpeciesEntry]:
+        """Canonical species for a source name, or None
+
+        Tries the full key, then the key without qualifiers ("Wild salmon" ->
+        "salmon"), then each remaining token on its own ("Pacific Cod Loins" -> "cod").
+        """
+        if not name:
+            return None
+        tokens = species_tokens(name)
+        entry = self.by_key.get(" ".join(tokens))
+        if entry:
+            return entry
+
+        core = [t for t in tokens if t not in QUALIFIER_WORDS]
+        if core != tokens:
+            entry = self.by_key.get(" ".join(core))
+            if entry:
+                return entry
+
+        for token in core:
+            entry = self.by_key.get(token)
+            if entry:
+                return entry
+        return None
+
+    def expansion_terms(self, q: str) -> List[str]:
+        """Tokens of the canonical name and aliases of the species a query names
+
+        Used for search query expansion ("albacore" also matches "Tuna (Canned, Albacore)").
+        Qualifier words are left out so expansion never matches on "canned" or "wild" alone.
+        """
+        entry = self.resolve(q)
+        if not entry:
+            return []
+        tokens = set()
+        for name in [entry.name, *entry.aliases]:
+            tokens.update(species_tokens(name))
+        return sorted(tokens - QUALIFIER_WORDS)
+
+
+def load_species_file(path: Path) -> List[Dict]:
+    """Read the curated species list (data/species.json)"""
+    with open(path) as f:
+        return json.load(f)
+
+
+async def seed_species(session: AsyncSession, species_data: List[Dict]) -> Tuple[int, int]:
+    """Insert missing species and aliases; returns (species added, aliases added). Idempotent."""
+    existing = {
+        s.slug: s
+        for s in (await session.execute(
+            select(models.Species).options(selectinload(models.Species.aliases))
+        )).scalars()
+    }
+    known_keys = {alias.alias_key for s in existing.values() for alias in s.aliases}
+
+    species_added = aliases_added = 0
+    for item in species_data:
+        species = existing.get(item["slug"])
+        if species is None:
+            species = models.Species(
+                slug=item["slug"], name=item["name"], scientific_name=item.get("scientific_name")
+            )
+            session.add(species)
+            existing[item["slug"]] = species
+            species_added += 1
+
+        for alias in [item["name"], *item.get("aliases", [])]:
+            key = species_key(alias)
+            if key in known_keys:
+                continue
+            known_keys.add(key)
+            species.aliases.append(models.SpeciesAlias(alias=alias, alias_key=key))
+            aliases_added += 1
+
+    await session.flush()
+    return species_added, aliases_added
+
+
+async def load_species_index(db: AsyncSession) -> SpeciesIndex:
+    """Build the in-memory alias index from the species tables (two queries)"""
+    result = await db.execute(select(models.Species).options(selectinload(models.Species.aliases)))
+    return SpeciesIndex(
+        SpeciesEntry(id=s.id, slug=s.slug, name=s.name, aliases=[a.alias for a in s.aliases])
+        for s in result.scalars()
+    )
+
+
+async def link_foods_to_species(db: AsyncSession, index: SpeciesIndex) -> int:
+    """Set ``Food.species_id`` for foods that have none yet; returns the number linked"""
+    result = await db.execute(select(models.Food).where(models.Food.species_id.is_(None)))
+    linked = 0
+    for food in result.scalars():
+        entry = index.resolve(food.name)
+        if entry:
+            food.species_id = entry.id
+            linked += 1
+    await db.flush()
+    return linked
+
+
+async def primary_foods_by_species(db: AsyncSession) -> Dict[int, object]:
+    """Map species id -> id of the food that best represents it (shortest linked name)"""
+    result = await db.execute(
+        select(models.Food.species_id, models.Food.id, models.Food.name)
+        .where(models.Food.species_id.isnot(None))
+    )
+    best: Dict[int, Tuple[int, str, object]] = {}
+    for species_id, food_id, name in result:
+        candidate = (len(name), name, food_id)
+        if species_id not in best or candidate < best[species_id]:
+            best[species_id] = candidate
+    return {species_id: food_id for species_id, (_, _, food_id) in best.items()}
@@ -0,0 +1,86 @@
+"""
+SQL search backends (Postgres ILIKE and pg_trgm)
+"""
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload
+
+from app.api.pagination import keyset_after
+from app.core.config import settings
+from app.db import models
+from app.search import trigram
+from app.search.base import SearchBackend, SearchPage
+
+
+def food_load_options():
+    """Relationships eager-loaded for search results (schemas.Food only serializes the category)"""
+    return (
+        joinedload(models.Food.category),
+        raiseload("*"),
+    )
+
+
+class TrigramSearchBackend(SearchBackend):
+    """Typo-tolerant search ranked by pg_trgm word similarity"""
+
+    name = "trigram"
+
+    async def search(self, db: AsyncSession, q: str, limit: int = 20, offset: int = 0,
+                     min_similarity: float | None = None,
+                     after: Optional[Tuple[Any, ...]] = None) -> SearchPage:
+        threshold = settings.SEARCH_TRGM_THRESHOLD if min_similarity is None else min_similarity
+        await trigram.set_similarity_threshold(db, threshold)
+
+        # Page and total come back in one round trip via count(*) OVER ();
+        # one extra row tells us whether another page follows
+        query = trigram.ranked_query(q, after=after).options(*food_load_options())
+        if after is None:
+            query = query.offset(offset)
+        rows = (await db.execute(query.limit(limit + 1))).all()
+        page, more = rows[:limit], len(rows) > limit
+
+        if rows and after is None:
+            total = rows[0].total
+        elif offset or after is not None:
+            total = (await db.execute(trigram.count_query(q))).scalar()
+        else:
+            total = 0
+
+        next_after = (page[-1].score, page[-1].Food.name, page[-1].Food.id) if more else None
+        return SearchPage(total=total, foods=[row.Food for row in page], backend=self.name, next_after=next_after)
+
+
+class SubstringSearchBackend(SearchBackend):
+    """Legacy case-insensitive substring match"""
+
+    name = "substring"
+
+    async def search(self, db: AsyncSession, q: str, limit: int = 20, offset: int = 0,
+                     min_similarity: float | None = None,
+                     after: Optional[Tuple[Any, ...]] = None) -> SearchPage:
+        search_term = f"%{q}%"
+        where = or_(
+            models.Food.name.ilike(search_term),
+            func.array_to_string(models.Food.common_names, ',').ilike(search_term)
+        )
+
+        count_result = await db.execute(select(func.count()).select_from(models.Food).where(where))
+        total = count_result.scalar()
+
+        query = (
+            select(models.Food)
+            .options(*food_load_options())
+            .where(where)
+            .order_by(models.Food.name, models.Food.id)
+        )
+        if after is not None:
+            query = query.where(keyset_after((models.Food.name, models.Food.id), after))
+        else:
+            query = query.offset(offset)
+        foods = (await db.execute(query.limit(limit + 1))).scalars().all()
+        page, more = foods[:limit], len(foods) > limit
+
+        next_after = (page[-1].name, page[-1].id) if more else None
+        return SearchPage(total=total, foods=page, backend=self.name, next_after=next_after)
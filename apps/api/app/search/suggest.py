@@ -0,0 +1,167 @@
+"""
+Typeahead suggestions
+
+``SuggestIndex`` is an immutable sorted array of normalized keys (every
+word-suffix of every label, so "sal" completes "Wild salmon"). A lookup
+binary-searches the run of keys starting with the prefix, then pulls the
+best-ranked entries out of that run with a range-minimum segment tree, so
+the cost is O(k log n) however many labels share the prefix.
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(value: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces"""
+    return NON_ALNUM_RE.sub(" ", value.lower()).strip()
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    text: str
+    kind: str  # food, company
+    popularity: int = 0
+    slug: Optional[str] = None
+
+
+class SuggestIndex:
+    """Prefix index over suggestion labels, ranked by popularity"""
+
+    def __init__(self, suggestions: Iterable[Suggestion] = (), ready: bool = True):
+        entries: List[Tuple[str, Suggestion]] = []
+        seen = set()
+        for suggestion in suggestions:
+            label = normalize(suggestion.text)
+            if not label or (label, suggestion.kind, suggestion.slug) in seen:
+                continue
+            seen.add((label, suggestion.kind, suggestion.slug))
+            entries.append((label, suggestion))
+
+        # Entry ids are ranks: most popular first, then shorter labels
+        entries.sort(key=lambda e: (-e[1].popularity, len(e[0]), e[0]))
+        self.labels = [label for label, _ in entries]
+        self.suggestions = [suggestion for _, suggestion in entries]
+
+        pairs: List[Tuple[str, int]] = []
+        for rank, label in enumerate(self.labels):
+            words = label.split(" ")
+            pairs.extend((" ".join(words[i:]), rank) for i in range(len(words)))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ranks = array("l", (rank for _, rank in pairs))
+
+        # Segment tree over key positions holding the minimum rank of each span
+        self._size = 1
+        while self._size < max(1, len(self.keys)):
+            self._size *= 2
+        sentinel = len(self.labels)
+        self._tree = array("l", [sentinel]) * (2 * self._size)
+        self._tree[self._size:self._size + len(self.ranks)] = self.ranks
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = min(self._tree[2 * node], self._tree[2 * node + 1])
+
+        self.ready = ready
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    def _argmin(self, lo: int, hi: int) -> int:
+        """Key position in [lo, hi) with the best (lowest) rank"""
+        tree, size = self._tree, self._size
+        best_rank, best_node = len(self.labels), -1
+        left, right = lo + size, hi + size
+        while left < right:
+            if left & 1:
+                if tree[left] < best_rank:
+                    best_rank, best_node = tree[left], left
+                left += 1
+            if right & 1:
+                right -= 1
+                if tree[right] < best_rank:
+                    best_rank, best_node = tree[right], right
+            left //= 2
+            right //= 2
+        # Walk down to the leaf holding that rank
+        while best_node < size:
+            best_node = 2 * best_node if tree[2 * best_node] == best_rank else 2 * best_node + 1
+        return best_node - size
+
+    def complete(self, prefix: str, k: int = 10, kind: Optional[str] = None) -> List[Suggestion]:
+        """Top ``k`` suggestions whose label (or a word in it) starts with ``prefix``"""
+        prefix = normalize(prefix)
+        if not prefix or not self.keys:
+            return []
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        if lo == hi:
+            return []
+
+        results: List[Suggestion] = []
+        emitted = set()
+        pos = self._argmin(lo, hi)
+        heap = [(self.ranks[pos], pos, lo, hi)]
+        while heap and len(results) < k:
+            rank, pos, span_lo, span_hi = heapq.heappop(heap)
+            # A label can own several keys in the run ("salted salmon" for "sal")
+            if rank not in emitted:
+                emitted.add(rank)
+                suggestion = self.suggestions[rank]
+                if kind is None or suggestion.kind == kind:
+                    results.append(suggestion)
+            for sub_lo, sub_hi in ((span_lo, pos), (pos + 1, span_hi)):
+                if sub_lo < sub_hi:
+                    sub_pos = self._argmin(sub_lo, sub_hi)
+                    heapq.heappush(heap, (self.ranks[sub_pos], sub_pos, sub_lo, sub_hi))
+        return results
+
+
+async def load_suggestions(db: AsyncSession) -> List[Suggestion]:
+    """Suggestions for every food name, common name and recalling company
+
+    Food popularity is the number of advisories, sustainability ratings and
+    recalls linked to the food; company popularity is its recall count.
+    """
+    def linked(model):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.food_id == models.Food.id)
+            .scalar_subquery()
+        )
+
+    popularity = (
+        linked(models.StateAdvisory)
+        + linked(models.SustainabilityRating)
+        + linked(models.FoodRecall)
+    ).label("popularity")
+
+    suggestions = []
+    foods = await db.execute(
+        select(models.Food.name, models.Food.slug, models.Food.common_names, popularity)
+    )
+    for name, slug, common_names, food_popularity in foods:
+        suggestions.append(Suggestion(text=name, kind="food", popularity=food_popularity, slug=slug))
+        for common_name in common_names or []:
+            suggestions.append(Suggestion(text=common_name, kind="food", popularity=food_popularity, slug=slug))
+
+    companies = await db.execute(
+        select(models.FoodRecall.company_name, func.count())
+        .where(models.FoodRecall.company_name.isnot(None))
+        .group_by(models.FoodRecall.company_name)
+    )
+    for company_name, recall_count in companies:
+        suggestions.append(Suggestion(text=company_name, kind="company", popularity=recall_count))
+
+    return suggestions
@@ -0,0 +1,81 @@
+"""
+Trigram (pg_trgm) fuzzy search over foods
+
+Matches use the word-similarity operator ``%>`` so a short query such as
+"salmn" still finds "Wild salmon". Both operands are served by the GIN
+``gin_trgm_ops`` indexes declared on ``Food.name`` and ``Food.common_names_text``.
+"""
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import keyset_after
+from app.db import models
+
+
+def normalize_query(q: str) -> str:
+    """Collapse whitespace and lowercase a search query"""
+    return " ".join(q.lower().split())
+
+
+async def set_similarity_threshold(db: AsyncSession, threshold: float) -> None:
+    """Set the word-similarity threshold used by ``%>`` for the current transaction"""
+    await db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(threshold)},
+    )
+
+
+def match_clause(q: str):
+    """WHERE clause matching foods whose name or common names resemble ``q``"""
+    pattern = f"%{q}%"
+    return or_(
+        models.Food.name.op("%>")(q),
+        models.Food.common_names_text.op("%>")(q),
+        # Exact substrings always match, even when they are too short to score
+        models.Food.name.ilike(pattern),
+        models.Food.common_names_text.ilike(pattern),
+    )
+
+
+def score_expression(q: str):
+    """Similarity score in [0, 1] of the best matching field"""
+    return func.greatest(
+        func.word_similarity(q, models.Food.name),
+        func.word_similarity(q, models.Food.common_names_text),
+    )
+
+
+def ranked_query(q: str, after: Optional[Tuple[Any, ...]] = None) -> Select:
+    """Foods matching ``q`` ordered by (similarity desc, name, id), with the match count per row
+
+    ``after`` is a ``(score, name, id)`` keyset cursor; only rows sorting after it are returned.
+    """
+    q = normalize_query(q)
+    score = score_expression(q)
+    query = (
+        select(
+            models.Food,
+            score.label("score"),
+            func.count().over().label("total"),
+        )
+        .where(match_clause(q))
+        .order_by(score.desc(), models.Food.name, models.Food.id)
+    )
+    if after is not None:
+        after_score, after_name, after_id = after
+        query = query.where(or_(
+            score < after_score,
+            and_(
+                score == after_score,
+                keyset_after((models.Food.name, models.Food.id), (after_name, after_id)),
+            ),
+        ))
+    return query
+
+
+def count_query(q: str) -> Select:
+    """Number of foods matching ``q``"""
+    q = normalize_query(q)
+    return select(func.count()).select_from(models.Food).where(match_clause(q))
@@ -16,6 +16,10 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app import search, rankings, recalls
+from app.db.session import engine
+from app.db.notifications import FOODS_CHANGED_CHANNEL, IngestListener
+from app.core.cache import result_cache
 
 # Note: Python path setup for shared packages is now in app/__init__.py
 
@@ -23,8 +27,49 @@ from app.api.v1.router import api_router
 async def lifespan(app: FastAPI):
     # Startup
     print(f"🚀 Starting {settings.PROJECT_NAME}")
+    try:
+        species_index = await search.rebuild_species_index()
+        print(f"🐟 Species index ready ({len(species_index)} species)")
+    except Exception as e:
+        print(f"⚠️  Could not load species index: {e}")
+    if settings.SEARCH_BACKEND == "bm25":
+        try:
+            index = await search.rebuild_food_index()
+            print(f"🔎 Search index ready ({len(index)} foods)")
+        except Exception as e:
+            # Search falls back to Postgres until the index is built
+            print(f"⚠️  Could not build search index: {e}")
+    try:
+        suggest_index = await search.rebuild_suggest_index()
+        print(f"🔎 Suggest index ready ({len(suggest_index)} entries)")
+    except Exception as e:
+        print(f"⚠️  Could not build suggest index: {e}")
+    try:
+        matrix = await rankings.rebuild_feature_matrix()
+        print(f"🏆 Ranking feature matrix ready ({len(matrix)} foods)")
+    except Exception as e:
+        print(f"⚠️  Could not build ranking feature matrix: {e}")
+
+    try:
+        await recalls.start_recall_stream()
+    except Exception as e:
+        print(f"⚠️  Could not start recall stream: {e}")
+
+    # Rebuild in-memory indexes (and push new recalls) whenever an ingest script reports it finished,
+    # and re-index foods other workers import
+    ingest_listener = IngestListener(engine)
+    ingest_listener.add_handler(search.on_ingest_finished)
+    ingest_listener.add_handler(rankings.on_ingest_finished)
+    ingest_listener.add_handler(recalls.on_ingest_finished)
+    ingest_listener.add_handler(search.on_foods_changed, channel=FOODS_CHANGED_CHANNEL)
+    # Keeps retrying in the background (and reconnects if the connection drops)
+    await ingest_listener.start()
+    if not ingest_listener.connected:
+        print("⚠️  Could not listen for ingest notifications yet, retrying")
     yield
     # Shutdown
+    await ingest_listener.stop()
+    await result_cache.close()
     print("👋 Shutting down")
 
 app = FastAPI(
@@ -44,6 +89,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Cache", "ETag", "X-Export-Started-At"],
 )
 
 # Include API router
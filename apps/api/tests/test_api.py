@@ -45,3 +45,66 @@ async def test_get_categories(async_client):
     slugs = [c["slug"] for c in data]
     assert "seafood" in slugs
     assert "produce" in slugs
+
+@pytest.mark.asyncio
+async def test_search_tolerates_typos(async_client):
+    response = await async_client.get("/api/v1/search?q=salmn&mode=trigram")
+    assert response.status_code == 200
+    data = response.json()
+    assert any(f["name"] == "Wild salmon" for f in data["foods"])
+    assert data["total"] >= len(data["foods"])
+
+@pytest.mark.asyncio
+async def test_search_substring_mode(async_client):
+    response = await async_client.get("/api/v1/search?q=Salmon&mode=substring")
+    assert response.status_code == 200
+    data = response.json()
+    assert any(f["name"] == "Wild salmon" for f in data["foods"])
+
+@pytest.mark.asyncio
+async def test_search_all_groups_by_type(async_client):
+    response = await async_client.get("/api/v1/search/all?q=salmon")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["groups"]) == {"foods", "recalls", "advisories", "papers"}
+    assert any(h["ref"] == "wild-salmon" for h in data["groups"]["foods"]["hits"])
+
+@pytest.mark.asyncio
+async def test_foods_batch_mixed_identifiers(async_client):
+    salmon = (await async_client.get("/api/v1/foods/slug/wild-salmon")).json()
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    response = await async_client.post(
+        "/api/v1/foods/batch?fields=id,name",
+        json={"ids": [salmon["id"], missing_id], "slugs": ["wild-salmon", "no-such-food"]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ids"][salmon["id"]]["name"] == "Wild salmon"
+    assert data["ids"][missing_id] is None
+    assert data["slugs"]["wild-salmon"] == {"id": salmon["id"], "name": "Wild salmon"}
+    assert data["slugs"]["no-such-food"] is None
+    assert data["barcodes"] == {}
+    assert (data["found"], data["missing"]) == (2, 2)
+
+@pytest.mark.asyncio
+async def test_foods_batch_rejects_oversized_requests(async_client):
+    response = await async_client.post(
+        "/api/v1/foods/batch", json={"slugs": [f"food-{i}" for i in range(501)]}
+    )
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_foods_sparse_fields_next_page(async_client):
+    # Collections take the ORM path; the cursor still needs the unrequested name
+    response = await async_client.get("/api/v1/foods?fields=id,slug&include=nutrients&limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert "name" not in data[0]
+    assert "X-Next-Cursor" in response.headers
+
+    next_page = await async_client.get("/api/v1/foods", params={
+        "fields": "id,slug", "include": "nutrients", "limit": 1, "cursor": response.headers["X-Next-Cursor"],
+    })
+    assert next_page.status_code == 200
+    assert next_page.json()[0]["id"] != data[0]["id"]
@@ -0,0 +1,284 @@
+import asyncio
+
+import httpx
+import pytest
+import redis.asyncio as redis
+
+from app.api.openfoodfacts import OpenFoodFactsCache
+from app.core.cache import LRUCache, ResultCache, normalize_query
+
+
+class LocalRedis:
+    """In-memory stand-in for the handful of Redis commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1).encode()
+        return int(self.data[key])
+
+    async def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field.encode()] = fields.get(field.encode(), 0) + amount
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return LocalPipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class LocalPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.commands.append(self.client.incr(key))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class DownRedis(LocalRedis):
+    async def mget(self, keys):
+        raise redis.ConnectionError("Connection refused")
+
+
+@pytest.fixture
+def cache():
+    return ResultCache("redis://unused", client=LocalRedis())
+
+
+def test_normalize_query():
+    assert normalize_query("  Canned   TUNA ") == "canned tuna"
+
+
+def test_key_depends_on_params_and_versions():
+    key = ResultCache.make_key("search", {"q": "tuna", "limit": 20}, [1])
+    assert key == ResultCache.make_key("search", {"limit": 20, "q": "tuna"}, [1])
+    assert key != ResultCache.make_key("search", {"q": "tuna", "limit": 10}, [1])
+    assert key != ResultCache.make_key("search", {"q": "tuna", "limit": 20}, [2])
+    assert key != ResultCache.make_key("recalls_search", {"q": "tuna", "limit": 20}, [1])
+
+
+async def test_miss_then_hit(cache):
+    lookup = await cache.lookup("search", ("foods",), q="tuna")
+    assert not lookup.hit
+    response = await cache.store(lookup, {"total": 1, "foods": ["tuna"]}, ttl=60)
+    assert response.headers["X-Cache"] == "MISS"
+    assert cache.client.ttls[lookup.key] == 60
+
+    again = await cache.lookup("search", ("foods",), q="tuna")
+    assert again.hit
+    assert again.response().body == response.body
+    assert again.response().headers["X-Cache"] == "HIT"
+    assert await cache.stats() == {"search": {"hits": 1, "misses": 1}}
+
+
+async def test_put_caches_plain_values(cache):
+    lookup = await cache.lookup("recall_counts", ("food_recalls",), state="CA")
+    await cache.put(lookup, {"total": 3, "facets": None}, ttl=60)
+    again = await cache.lookup("recall_counts", ("food_recalls",), state="CA")
+    assert again.json() == {"total": 3, "facets": None}
+
+
+async def test_bumping_a_table_invalidates_its_entries(cache):
+    foods = await cache.lookup("search", ("foods",), q="tuna")
+    await cache.store(foods, [], ttl=60)
+    recalls = await cache.lookup("recalls_search", ("food_recalls",), q="tuna")
+    await cache.store(recalls, [], ttl=60)
+
+    await cache.bump_versions(["foods"])
+
+    assert not (await cache.lookup("search", ("foods",), q="tuna")).hit
+    assert (await cache.lookup("recalls_search", ("food_recalls",), q="tuna")).hit
+
+
+async def test_unreachable_redis_is_bypassed():
+    cache = ResultCache("redis://unused", client=DownRedis())
+    lookup = await cache.lookup("search", ("foods",), q="tuna")
+    assert not lookup.hit and lookup.key is None
+    assert not cache.available
+
+    response = await cache.store(lookup, {"total": 0}, ttl=60)
+    assert response.body == b'{"total":0}'
+    assert cache.client.data == {}
+
+
+async def test_disabled_cache_never_touches_redis():
+    cache = ResultCache("redis://unused", enabled=False, client=DownRedis())
+    assert (await cache.lookup("search", ("foods",), q="tuna")).key is None
+    await cache.bump_versions(["foods"])
+    assert await cache.stats() == {}
+
+
+def test_lru_evicts_least_recently_used_and_expired():
+    now = [0.0]
+    lru = LRUCache(2, clock=lambda: now[0])
+    lru.set("a", 1, ttl=10)
+    lru.set("b", 2, ttl=10)
+    assert lru.get("a") == (True, 1)
+    lru.set("c", 3, ttl=10)
+    assert lru.get("b") == (False, None)
+    now[0] = 11
+    assert lru.get("a") == (False, None) and len(lru) == 1
+
+
+class CountingScraper:
+    """Open Food Facts stand-in that counts upstream requests"""
+
+    def __init__(self, products, calls, fail=False, gate=None):
+        self.products, self.calls, self.fail, self.gate = products, calls, fail, gate
+
+    async def fetch_product_by_barcode(self, barcode):
+        self.calls.append(barcode)
+        await asyncio.sleep(0)
+        if self.gate:
+            await self.gate.wait()
+        if self.fail:
+            raise httpx.ConnectError("offline")
+        return self.products.get(barcode)
+
+    async def fetch_search_page(self, query, page=1, page_size=20):
+        self.calls.append(query)
+        return [product for product in self.products.values() if query in product["product_name"]]
+
+    async def close(self):
+        pass
+
+
+def off_cache(calls, redis_client=None, fail=False, gate=None):
+    products = {"3017620422003": {"product_name": "Tuna in olive oil", "barcode": "3017620422003"}}
+    return OpenFoodFactsCache(
+        ResultCache("redis://unused", client=redis_client or LocalRedis()),
+        memory_size=16,
+        scraper_factory=lambda: CountingScraper(products, calls, fail, gate),
+    )
+
+
+async def test_off_products_are_cached_in_memory_and_redis():
+    calls, shared = [], LocalRedis()
+    first = off_cache(calls, shared)
+    assert (await first.product("3017620422003")).hit is False
+    assert (await first.product("3017 6204 22003")).hit is True
+    assert first.stats()["memory_hits"] == 1
+
+    # Another worker finds it in Redis
+    second = off_cache(calls, shared)
+    assert (await second.product("3017620422003")).value["product_name"] == "Tuna in olive oil"
+    assert second.stats()["redis_hits"] == 1
+    assert calls == ["3017620422003"]
+
+
+async def test_unknown_barcodes_are_cached_briefly(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "OFF_NOT_FOUND_CACHE_TTL", 120)
+    calls, shared = [], LocalRedis()
+    cache = off_cache(calls, shared)
+    assert (await cache.product("0000000000000")).value is None
+    assert (await cache.product("0000000000000")).hit
+    assert calls == ["0000000000000"]
+    assert cache.stats()["not_found"] == 1
+    assert 120 in shared.ttls.values()
+
+
+async def test_failed_lookups_are_not_cached():
+    calls = []
+    cache = off_cache(calls, fail=True)
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPError):
+            await cache.product("3017620422003")
+    assert len(calls) == 2 and cache.stats()["errors"] == 2
+
+
+async def test_concurrent_misses_share_one_request():
+    calls = []
+    cache = off_cache(calls)
+    results = await asyncio.gather(*(cache.product("3017620422003") for _ in range(5)))
+    assert calls == ["3017620422003"]
+    assert sum(not r.hit for r in results) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+async def test_waiters_retry_when_the_fetching_request_is_cancelled():
+    calls, gate = [], asyncio.Event()
+    cache = off_cache(calls, gate=gate)
+    owner = asyncio.create_task(cache.product("3017620422003"))
+    while not calls:
+        await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.product("3017620422003"))
+    await asyncio.sleep(0)
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    gate.set()
+    assert (await waiter).value["product_name"] == "Tuna in olive oil"
+    assert len(calls) == 2 and not cache._inflight
+
+
+async def test_cancelled_waiter_leaves_the_fetch_running():
+    calls, gate = [], asyncio.Event()
+    cache = off_cache(calls, gate=gate)
+    owner = asyncio.create_task(cache.product("3017620422003"))
+    while not calls:
+        await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.product("3017620422003"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    gate.set()
+    assert (await owner).value["product_name"] == "Tuna in olive oil"
+    assert calls == ["3017620422003"]
+
+
+async def test_off_search_pages_are_cached_by_normalized_query():
+    calls = []
+    cache = off_cache(calls)
+    first = await cache.search("Tuna", page=1, page_size=10)
+    again = await cache.search("  tuna ", page=1, page_size=10)
+    assert again.hit and again.value == first.value
+    assert calls == ["Tuna"]
+
+
+async def test_off_cache_stats_endpoint(async_client):
+    response = await async_client.get("/api/v1/barcode/cache/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["redis"]) == {"off_product", "off_search"}
+    assert "memory_entries" in data["memory"]
+
+
+async def test_off_search_degrades_on_malformed_responses(async_client, monkeypatch):
+    from app.api.openfoodfacts import off_cache as shared
+
+    async def malformed(*args):
+        raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+    monkeypatch.setattr(shared, "search", malformed)
+    response = await async_client.get("/api/v1/barcode/search?q=tuna")
+    assert response.status_code == 200
+    assert response.json()["results"] == [] and response.headers["X-Cache"] == "MISS"
@@ -0,0 +1,63 @@
+from uuid import uuid4
+
+from app.api.comparison import build_comparison
+from app.db import models
+
+
+def make_food(name, levels=(), nutrients=()):
+    return models.Food(
+        id=uuid4(), name=name, slug=name.lower().replace(" ", "-"),
+        category=models.FoodCategory(id=1, name="Seafood", slug="seafood"),
+        contaminant_levels=[
+            models.FoodContaminantLevel(
+                contaminant=models.Contaminant(name=contaminant), level_value=value,
+                level_unit=unit, risk_category=risk,
+            )
+            for contaminant, value, unit, risk in levels
+        ],
+        nutrients=[
+            models.FoodNutrient(nutrient_name=nutrient, amount=amount, unit=unit)
+            for nutrient, amount, unit in nutrients
+        ],
+    )
+
+
+def test_rows_are_aligned_with_foods():
+    tuna = make_food("Tuna", levels=[("Mercury", 0.3, "ppm", "medium"), ("Mercury", 0.4, "ppm", "high")])
+    salmon = make_food(
+        "Salmon",
+        levels=[("Mercury", 0.02, "ppm", "low"), ("PCBs", 11.0, "ppb", None)],
+        nutrients=[("Protein", 20.0, "g")],
+    )
+    comparison = build_comparison([tuna, salmon])
+
+    assert [f["slug"] for f in comparison["foods"]] == ["tuna", "salmon"]
+    mercury, pcbs = comparison["contaminants"]
+    assert mercury["name"] == "Mercury" and mercury["unit"] == "ppm"
+    assert mercury["values"][0] == 0.35
+    assert mercury["values"][1] == 0.02
+    assert mercury["risk_categories"] == ["high", "low"]
+    assert pcbs["values"] == [None, 11.0]
+    assert comparison["nutrients"] == [{"name": "Protein", "unit": "g", "values": [None, 20.0]}]
+
+
+def test_units_are_not_mixed():
+    a = make_food("A", levels=[("Lead", 0.1, "ppm", None)])
+    b = make_food("B", levels=[("Lead", 50.0, "ppb", None)])
+    rows = build_comparison([a, b])["contaminants"]
+    assert [(r["unit"], r["values"]) for r in rows] == [("ppb", [None, 50.0]), ("ppm", [0.1, None])]
+
+
+async def test_compare_rejects_too_many_foods(async_client):
+    slugs = ",".join(f"food-{i}" for i in range(11))
+    response = await async_client.get(f"/api/v1/foods/compare?slugs={slugs}")
+    assert response.status_code == 400
+
+
+async def test_compare_foods(async_client):
+    response = await async_client.get("/api/v1/foods/compare?slugs=wild-salmon,not-a-food")
+    assert response.status_code == 200
+    data = response.json()
+    assert [f["slug"] for f in data["foods"]] == ["wild-salmon"]
+    assert data["missing"] == ["not-a-food"]
+    assert all(len(row["values"]) == 1 for row in data["contaminants"] + data["nutrients"])
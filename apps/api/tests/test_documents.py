@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.documents import document_query, etag_matches, make_etag, render_document
+from app.db import models, schemas
+from app.db.session import engine
+
+
+def test_document_matches_detail_schema():
+    food = models.Food(
+        id=uuid4(), name="Wild salmon", slug="wild-salmon", common_names=["Sockeye"],
+        created_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+    )
+    expected = schemas.FoodDetail.model_validate(food).model_dump(mode="json")
+    assert json.loads(render_document(food)) == expected
+
+
+def test_etag_is_strong_and_content_addressed():
+    etag = make_etag('{"name":"Wild salmon"}')
+    assert etag.startswith('"') and etag.endswith('"') and not etag.startswith("W/")
+    assert etag == make_etag('{"name":"Wild salmon"}')
+    assert etag != make_etag('{"name":"Farmed salmon"}')
+
+
+def test_barcode_document_is_the_first_food_by_name():
+    from sqlalchemy.dialects import postgresql
+
+    sql = str(document_query(models.Food.barcode == "0001").compile(dialect=postgresql.dialect()))
+    assert "FROM foods LEFT OUTER JOIN food_documents" in sql
+    # Barcodes aren't unique: always the same food, and its own document or none
+    assert "ORDER BY foods.name, foods.id" in sql
+
+
+@pytest.mark.parametrize("header,matches", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+    ("abc", False),
+])
+def test_if_none_match(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+@pytest.fixture
+def select_counter():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "pg_catalog" not in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def test_detail_is_served_from_document(async_client, select_counter):
+    # The first request materializes the document if ingest hasn't yet
+    first = await async_client.get("/api/v1/foods/slug/wild-salmon")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    select_counter.clear()
+    second = await async_client.get("/api/v1/foods/slug/wild-salmon")
+    assert second.headers["ETag"] == etag
+    assert second.content == first.content
+    assert len(select_counter) == 1 and "food_documents" in select_counter[0]
+
+    food_id = first.json()["id"]
+    by_id = await async_client.get(f"/api/v1/foods/{food_id}")
+    assert by_id.headers["ETag"] == etag
+
+
+async def test_document_matches_orm_detail(async_client):
+    document = await async_client.get("/api/v1/foods/slug/wild-salmon")
+    include = "category,contaminant_levels,nutrients,advisories,sustainability_ratings"
+    orm = await async_client.get(f"/api/v1/foods/slug/wild-salmon?include={include}")
+    assert document.json() == orm.json()
+
+
+async def test_if_none_match_returns_304(async_client):
+    first = await async_client.get("/api/v1/foods/slug/wild-salmon")
+    response = await async_client.get(
+        "/api/v1/foods/slug/wild-salmon", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == first.headers["ETag"]
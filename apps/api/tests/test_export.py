@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.api.serialization import RECALL_SHAPE, food_shape
+from app.api.v1.endpoints.export import encode_csv, encode_ndjson, export_query
+from app.db import models
+
+FOOD = {
+    "name": "Wild salmon", "common_names": ["Sockeye", "Red salmon"], "description": None,
+    "id": uuid4(), "created_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+}
+
+
+def test_ndjson_is_one_object_per_line():
+    body = encode_ndjson([FOOD, {**FOOD, "name": "Kale"}])
+    lines = body.decode().splitlines()
+    assert len(lines) == 2 and body.endswith(b"\n")
+    first = json.loads(lines[0])
+    assert first["id"] == str(FOOD["id"])
+    assert first["created_at"] == "2024-01-02T03:04:05Z"
+
+
+def test_csv_flattens_lists_and_nulls():
+    fields = ["name", "common_names", "description", "created_at"]
+    body = encode_csv([FOOD], fields, header=True).decode()
+    header, row = list(csv.reader(io.StringIO(body)))
+    assert header == fields
+    assert row == ["Wild salmon", "Sockeye|Red salmon", "", "2024-01-02T03:04:05Z"]
+
+
+def test_export_query_filters_on_last_change():
+    shape = food_shape(include=())
+    sql = str(export_query(models.Food, shape, datetime(2024, 1, 1, tzinfo=timezone.utc)))
+    assert "coalesce(foods.updated_at, foods.created_at) >=" in sql
+    assert "ORDER BY foods.id" in sql
+    # Exports never join relationships
+    assert "JOIN" not in str(export_query(models.FoodRecall, RECALL_SHAPE))
+
+
+async def test_export_foods_ndjson(async_client):
+    response = await async_client.get("/api/v1/export/foods")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    names = [json.loads(line)["name"] for line in response.text.splitlines()]
+    assert "Wild salmon" in names
+
+    # Database time minus the overlap window, so it is timezone-aware and in the past
+    since = response.headers["X-Export-Started-At"]
+    assert datetime.fromisoformat(since) < datetime.now(timezone.utc)
+    incremental = await async_client.get("/api/v1/export/foods", params={"updated_since": since})
+    assert incremental.status_code == 200
+    # Nothing has changed within the overlap window here
+    assert incremental.text.splitlines() == []
+
+
+async def test_export_session_is_closed_when_the_body_is_never_read(monkeypatch):
+    from datetime import timedelta
+    from app.api.v1.endpoints import export
+
+    class Session:
+        closed = False
+
+        async def execute(self, statement):
+            class Result:
+                def scalar_one(self):
+                    return datetime.now(timezone.utc)
+            return Result()
+
+        async def close(self):
+            self.closed = True
+
+    session = Session()
+    monkeypatch.setattr(export, "AsyncSessionLocal", lambda: session)
+    response = await export.export_entity("foods", fmt="ndjson", updated_since=None)
+    assert datetime.fromisoformat(response.headers["X-Export-Started-At"]) < datetime.now(timezone.utc) - timedelta(minutes=4)
+    # What Starlette runs after the response, even if the client disconnected first
+    await response.background()
+    assert session.closed
+
+
+async def test_export_recalls_csv(async_client):
+    response = await async_client.get("/api/v1/export/recalls?format=csv")
+    assert response.status_code == 200
+    header = next(csv.reader(io.StringIO(response.text)))
+    assert header[:2] == ["recall_number", "product_description"]
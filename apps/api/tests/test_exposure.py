@@ -0,0 +1,194 @@
+from array import array
+from itertools import product
+from uuid import uuid4
+
+import pytest
+
+from app.db import models, schemas
+from app.exposure import (
+    ConcentrationTable,
+    ContaminantColumn,
+    evaluate_plans,
+    mercury_budget_ug,
+    optimize_meal_plan,
+    plan_results,
+    species_groups,
+)
+from app.exposure.optimizer import group_options
+from app.rankings.personalized import RankedRow
+
+TUNA, SALMON = uuid4(), uuid4()
+
+
+def table():
+    # Row 0 is the zero row for unknown foods
+    return ConcentrationTable(
+        food_rows={TUNA: 1, SALMON: 2},
+        columns=[
+            ContaminantColumn(1, "Mercury", 0.0001, array("d", [0.0, 0.35, 0.022])),
+            ContaminantColumn(5, "Lead", None, array("d", [0.0, 0.01, 0.0])),
+        ],
+    )
+
+
+FOOD_IDS = {"tuna": TUNA, "salmon": SALMON}
+
+
+def plan(body_weight_kg, *items, id=None):
+    return schemas.MealPlan(
+        id=id,
+        body_weight_kg=body_weight_kg,
+        items=[
+            schemas.MealPlanItem(food=food, servings_per_week=servings, portion_g=portion)
+            for food, servings, portion in items
+        ],
+    )
+
+
+def test_weekly_dose_and_percent_of_reference():
+    plans = [plan(70, ("tuna", 2, 113), ("salmon", 1, 100), id="a")]
+    mercury, lead = evaluate_plans(plans, table(), FOOD_IDS)
+
+    intake = 2 * 0.113 * 0.35 + 0.1 * 0.022
+    assert mercury.intake_mg[0] == pytest.approx(intake)
+    assert mercury.dose_mg_per_kg[0] == pytest.approx(intake / 70)
+    assert mercury.percent_of_reference[0] == pytest.approx(100 * intake / 70 / 0.0007)
+    assert lead.percent_of_reference is None
+
+
+def test_plans_are_evaluated_independently():
+    plans = [
+        plan(70, ("tuna", 1, 100)),
+        plan(20, ("tuna", 1, 100)),
+        plan(70),
+        plan(70, ("salmon", 3, 100), ("unknown-fish", 5, 100)),
+    ]
+    mercury, _ = evaluate_plans(plans, table(), FOOD_IDS)
+    assert mercury.dose_mg_per_kg[1] == pytest.approx(mercury.dose_mg_per_kg[0] * 70 / 20)
+    assert mercury.intake_mg[2] == 0.0
+    assert mercury.intake_mg[3] == pytest.approx(3 * 0.1 * 0.022)
+
+
+def test_batch_matches_one_by_one():
+    plans = [plan(50 + i % 40, ("tuna", i % 3, 113), ("salmon", i % 5, 150)) for i in range(2000)]
+    batch = evaluate_plans(plans, table(), FOOD_IDS)
+    for i in (0, 7, 1999):
+        single = evaluate_plans([plans[i]], table(), FOOD_IDS)
+        assert single[0].dose_mg_per_kg[0] == pytest.approx(batch[0].dose_mg_per_kg[i])
+
+
+def test_plan_results_are_in_micrograms():
+    plans = [plan(70, ("tuna", 1, 100), id="p1")]
+    result = plan_results(plans, evaluate_plans(plans, table(), FOOD_IDS))[0]
+    assert result["id"] == "p1"
+    mercury = result["exposures"][0]
+    assert mercury["contaminant"] == "Mercury"
+    assert mercury["weekly_intake_ug"] == pytest.approx(35.0)
+    assert mercury["reference_weekly_dose_ug_per_kg"] == pytest.approx(0.7)
+    schemas.PlanExposure(**result)
+
+
+def catalog(*foods):
+    """RankedRows from (species_id, mercury_ppm, omega3_score) tuples"""
+    rows = []
+    for rank, (species_id, ppm, omega3) in enumerate(foods, start=1):
+        ranking = models.FoodRanking(food_id=uuid4(), rank=rank, score=50, mercury_ppm=ppm, omega3_score=omega3)
+        rows.append(RankedRow(
+            food_id=ranking.food_id, name=f"Fish {rank}", slug=f"fish-{rank}", category_slug="seafood",
+            national_rank=rank, ranking=ranking, species_id=species_id,
+        ))
+    return rows
+
+
+def test_mercury_budget_scales_with_body_weight():
+    assert mercury_budget_ug(70) == pytest.approx(49.0)
+    assert mercury_budget_ug(20, percent_of_reference=50) == pytest.approx(7.0)
+    # A stored acceptable_daily_intake overrides the published value
+    assert mercury_budget_ug(70, reference_dose=0.0002) == pytest.approx(98.0)
+
+
+async def test_meal_plan_budget_uses_stored_reference_dose():
+    from app import exposure
+    from app.exposure import calculator
+
+    class Session:
+        def __init__(self, adi):
+            self.adi = adi
+
+        async def scalar(self, statement):
+            assert "contaminants.acceptable_daily_intake IS NOT NULL" in str(statement)
+            return self.adi
+
+    assert await exposure.reference_dose(Session(0.0002), "Mercury") == 0.0002
+    assert await exposure.reference_dose(Session(None), "Mercury") == calculator.REFERENCE_DOSES["Mercury"]
+
+
+def test_optimizer_matches_brute_force():
+    rows = catalog(
+        (1, 0.35, 75), (2, 0.022, 100), (3, 0.1, 50), (4, 0.6, 100),
+        (5, 0.05, 25), (6, 0.17, 75), (6, 0.3, 100), (7, None, 100),
+    )
+    budget_ug = mercury_budget_ug(30)
+    groups = species_groups(rows, "omega3")
+    plan = optimize_meal_plan(groups, "omega3", budget_ug, max_servings=4, max_per_species=2, portion_g=113)
+
+    options = [[None] + group_options(g, "omega3", budget_ug, 4, 2, 113, 500) for g in groups]
+    best = 0
+    for combo in product(*options):
+        chosen = [option for option in combo if option]
+        if sum(o.servings for o in chosen) <= 4 and sum(o.cost for o in chosen) <= 500:
+            best = max(best, sum(o.value for o in chosen))
+    assert plan.value == best
+    assert plan.mercury_ug <= budget_ug
+
+
+def test_optimizer_limits_servings_per_species():
+    # Two products of the same, nearly mercury-free species
+    rows = catalog((1, 0.002, 100), (1, 0.002, 100), (2, 0.05, 50))
+    plan = optimize_meal_plan(species_groups(rows, "omega3"), "omega3", 1000, 5, 2, 113)
+    per_species = {}
+    for choice in plan.choices:
+        per_species[choice.row.species_id] = per_species.get(choice.row.species_id, 0) + choice.servings
+    assert per_species == {1: 2, 2: 2}
+
+
+def test_optimizer_stays_empty_when_nothing_fits():
+    rows = catalog((1, 1.0, 100))
+    plan = optimize_meal_plan(species_groups(rows, "omega3"), "omega3", mercury_budget_ug(10), 3, 2, 113)
+    assert plan.choices == [] and plan.servings == 0
+
+
+def test_advisory_excludes_whole_species():
+    rows = catalog((1, 0.01, 100), (1, 0.02, 90), (2, 0.05, 50))
+    groups = species_groups(rows, "omega3", excluded_foods={rows[0].food_id})
+    assert [[row.name for row in group] for group in groups] == [["Fish 3"]]
+
+
+async def test_meal_plan_endpoint(async_client):
+    response = await async_client.post("/api/v1/exposure/meal-plan", json={
+        "body_weight_kg": 60, "servings_per_week": 3, "avoid_states": ["ca"],
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["mercury_ug"] <= data["mercury_budget_ug"]
+    assert data["servings"] <= 3
+
+
+async def test_exposure_endpoint(async_client):
+    response = await async_client.post("/api/v1/exposure", json={
+        "plans": [
+            {"id": "adult", "body_weight_kg": 70, "items": [{"food": "not-a-food", "servings_per_week": 2}]},
+        ],
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["unknown_foods"] == ["not-a-food"]
+    assert data["plans"][0]["id"] == "adult"
+    assert all(e["weekly_intake_ug"] == 0 for e in data["plans"][0]["exposures"])
+
+
+async def test_exposure_rejects_bad_body_weight(async_client):
+    response = await async_client.post("/api/v1/exposure", json={
+        "plans": [{"body_weight_kg": 0, "items": []}],
+    })
+    assert response.status_code == 422
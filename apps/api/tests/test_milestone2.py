@@ -50,3 +50,105 @@ async def test_food_detail_includes_advisories(async_client):
         assert "sustainability_ratings" in data
         assert isinstance(data["advisories"], list)
         assert isinstance(data["sustainability_ratings"], list)
+
+@pytest.fixture
+async def paged_recalls():
+    """Four recalls under a status of their own: two dated, two without a recall_date"""
+    from datetime import datetime, timezone
+    from uuid import uuid4
+
+    from sqlalchemy import delete
+    from app.core.cache import result_cache
+    from app.db import models
+    from app.db.session import AsyncSessionLocal
+
+    status = f"test-{uuid4().hex[:8]}"
+    ids = [uuid4(), uuid4(), *sorted([uuid4(), uuid4()], reverse=True)]
+    dates = [datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 2, 1, tzinfo=timezone.utc), None, None]
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            models.FoodRecall(
+                id=recall_id, recall_number=f"{status}-{n}", product_description="Smoked salmon",
+                status=status, recall_date=recall_date,
+            )
+            for n, (recall_id, recall_date) in enumerate(zip(ids, dates))
+        ])
+        await session.commit()
+        await result_cache.bump_versions(["food_recalls"])
+        try:
+            # Newest first, undated last, ties by id descending
+            yield status, [str(recall_id) for recall_id in ids]
+        finally:
+            await session.execute(delete(models.FoodRecall).where(models.FoodRecall.status == status))
+            await session.commit()
+            await result_cache.bump_versions(["food_recalls"])
+
+
+@pytest.mark.asyncio
+async def test_recalls_cursor_pagination(async_client, paged_recalls):
+    status, expected = paged_recalls
+    seen, cursor = [], None
+    # limit=1 puts page boundaries on a dated recall, between dated and undated, and between two undated ones
+    for page in range(len(expected)):
+        params = {"status": status, "limit": 1, **({"cursor": cursor} if cursor else {})}
+        data = (await async_client.get("/api/v1/recalls", params=params)).json()
+        assert data["total"] == len(expected)
+        seen += [r["id"] for r in data["recalls"]]
+        cursor = data["next_cursor"]
+        if page < len(expected) - 1:
+            assert cursor, f"no next_cursor after page {page + 1}"
+    assert cursor is None
+    assert seen == expected
+
+    # Cursor and offset pages agree
+    first = (await async_client.get("/api/v1/recalls", params={"status": status, "limit": 3})).json()
+    assert first["next_cursor"]
+    second = (await async_client.get(
+        "/api/v1/recalls", params={"status": status, "limit": 3, "cursor": first["next_cursor"]}
+    )).json()
+    offset = (await async_client.get("/api/v1/recalls", params={"status": status, "limit": 3, "skip": 3})).json()
+    assert [r["id"] for r in second["recalls"]] == [r["id"] for r in offset["recalls"]] == expected[3:]
+
+
+def test_recall_facets_are_one_grouped_query():
+    from sqlalchemy.dialects import postgresql
+    from app.api.v1.endpoints.recalls import recall_facets_query, recall_filters
+
+    sql = str(recall_facets_query(recall_filters(state="ca", days=30)).compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS((food_recalls.classification), (food_recalls.state), (food_recalls.status), ())" in sql
+    # Non-facet filters narrow every count; facet filters apply to every count but their own facet's
+    assert "WHERE food_recalls.recall_date >=" in sql
+    assert sql.count("FILTER (WHERE food_recalls.state =") == 3
+
+
+@pytest.mark.asyncio
+async def test_recalls_total_and_facets(async_client):
+    everything = (await async_client.get("/api/v1/recalls?facets=true&limit=1")).json()
+    facets = everything["facets"]
+    assert sum(facets["classification"].values()) == everything["total"]
+    assert sum(facets["status"].values()) == everything["total"]
+
+    # A single filter narrows the total too
+    if facets["classification"]:
+        classification, count = next(iter(facets["classification"].items()))
+        if classification != "Unknown":
+            response = await async_client.get("/api/v1/recalls", params={"classification": classification})
+            assert response.json()["total"] == count
+
+
+@pytest.mark.asyncio
+async def test_facets_ignore_their_own_filter(async_client):
+    everything = (await async_client.get("/api/v1/recalls?facets=true&limit=1")).json()
+    classifications = {k: v for k, v in everything["facets"]["classification"].items() if k != "Unknown"}
+    if not classifications:
+        pytest.skip("No classified recalls seeded")
+    chosen, count = next(iter(classifications.items()))
+
+    filtered = (await async_client.get(
+        "/api/v1/recalls", params={"classification": chosen, "facets": "true", "limit": 1}
+    )).json()
+    assert filtered["total"] == count
+    # The other classifications stay visible for the filter badges
+    assert filtered["facets"]["classification"] == everything["facets"]["classification"]
+    # Other facets are narrowed to the chosen classification
+    assert sum(filtered["facets"]["status"].values()) == count
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import cursor_kind, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = (datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc), uuid4())
+    token = encode_cursor("recalls", values)
+    assert "=" not in token
+    assert decode_cursor("recalls", token, 2) == values
+
+    values = (0.4285714, "Wild salmon", uuid4())
+    assert decode_cursor("search:trigram", encode_cursor("search:trigram", values), 3) == values
+
+    values = (None, uuid4())
+    assert decode_cursor("recalls", encode_cursor("recalls", values), 2) == values
+
+
+def test_cursor_kind():
+    assert cursor_kind(encode_cursor("search:trigram", (0.5, "Tuna", uuid4()))) == "search:trigram"
+    assert cursor_kind("not-a-cursor") is None
+    assert cursor_kind(None) is None
+
+
+def test_missing_cursor_means_first_page():
+    assert decode_cursor("foods", None, 2) is None
+    assert decode_cursor("foods", "", 2) is None
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", encode_cursor("recalls", ("x", "y")), encode_cursor("foods", ("x",))])
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("foods", token, 2)
+    assert exc.value.status_code == 400
+
+
+async def test_foods_endpoint_rejects_bad_cursor(async_client):
+    response = await async_client.get("/api/v1/foods?cursor=garbage")
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from app.api.projection import DETAIL_INCLUDE, SUMMARY_INCLUDE, FoodProjection
+from app.db import models, schemas
+from app.db.session import engine
+
+
+def make_food():
+    return models.Food(
+        id=uuid4(), name="Wild salmon", slug="wild-salmon", common_names=["Sockeye"],
+        category_id=1, created_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+        category=models.FoodCategory(id=1, name="Seafood", slug="seafood"),
+    )
+
+
+def test_default_projection_matches_detail_schema():
+    food = make_food()
+    projection = FoodProjection.parse(None, None)
+    assert projection.include == DETAIL_INCLUDE
+    expected = schemas.FoodDetail.model_validate(food).model_dump(mode="json")
+    assert projection.serialize(food) == expected
+
+
+def test_summary_projection_matches_food_schema():
+    food = make_food()
+    projection = FoodProjection.parse(None, None, default_include=SUMMARY_INCLUDE)
+    assert projection.serialize(food) == schemas.Food.model_validate(food).model_dump(mode="json")
+
+
+def test_sparse_fields_and_include():
+    food = make_food()
+    projection = FoodProjection.parse("id, name", "category")
+    assert projection.serialize(food) == {
+        "name": "Wild salmon",
+        "id": str(food.id),
+        "category": {"name": "Seafood", "slug": "seafood", "description": None, "id": 1, "parent_id": None},
+    }
+    assert FoodProjection.parse("slug", "").serialize(food) == {"slug": "wild-salmon"}
+
+
+@pytest.mark.parametrize("fields,include", [("name,hashed_password", None), (None, "users")])
+def test_unknown_names_are_rejected(fields, include):
+    with pytest.raises(HTTPException) as exc:
+        FoodProjection.parse(fields, include)
+    assert exc.value.status_code == 400
+
+
+def app_selects(statements):
+    """SELECTs issued for the request (ignores asyncpg's connection setup queries)"""
+    return [
+        s for s in statements
+        if s.lstrip().upper().startswith("SELECT") and " FROM " in s.upper() and "pg_catalog" not in s
+    ]
+
+
+@pytest.fixture
+def statement_counter():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("include,expected_statements", [
+    ("", 1),
+    ("category", 1),
+    # food + category, then one query per collection (never a cartesian product)
+    ("category,contaminant_levels,nutrients", 3),
+    ("advisories", 2),
+    ("category,contaminant_levels,nutrients,advisories,sustainability_ratings", 5),
+])
+async def test_statements_per_projection(async_client, statement_counter, include, expected_statements):
+    url = "/api/v1/foods/slug/wild-salmon"
+    if include is not None:
+        url += f"?include={include}"
+    response = await async_client.get(url)
+    assert response.status_code == 200
+    selects = app_selects(statement_counter)
+    assert len(selects) == expected_statements
+
+
+async def test_compare_uses_fixed_number_of_statements(async_client, statement_counter):
+    response = await async_client.get("/api/v1/foods/compare?slugs=wild-salmon,scallop,clam")
+    assert response.status_code == 200
+    # foods + category, contaminant levels, nutrients
+    assert len(app_selects(statement_counter)) == 3
+
+
+async def test_search_does_not_load_contaminants_or_nutrients(async_client, statement_counter):
+    response = await async_client.get("/api/v1/search?q=salmon&mode=substring")
+    assert response.status_code == 200
+    selects = app_selects(statement_counter)
+    assert len(selects) == 2  # count + page (category joined)
+    assert not any("food_contaminant_levels" in s or "food_nutrients" in s for s in selects)
+
+
+def test_collections_are_not_joined_into_one_statement():
+    projection = FoodProjection.parse(None, None)
+    statement = select(models.Food).options(*projection.loader_options())
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "food_contaminant_levels" not in sql
+    assert "food_nutrients" not in sql
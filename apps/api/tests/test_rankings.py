@@ -0,0 +1,150 @@
+from math import isnan
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.db import models
+from app.db.session import AsyncSessionLocal
+from app.rankings import PROFILES, FeatureMatrix, apply_state_penalties, weight_vector
+from app.rankings.engine import REFRESH_RANKINGS_SQL
+from app.rankings.personalized import RankedRow
+
+
+def ranked_rows(*scores):
+    rows = []
+    for rank, score in enumerate(scores, start=1):
+        ranking = models.FoodRanking(food_id=uuid4(), score=score, rank=rank, category_rank=rank)
+        rows.append((ranking, f"Food {rank}", f"food-{rank}"))
+    return rows
+
+
+def test_without_penalties_national_order_is_kept():
+    rows = ranked_rows(90, 80, 70)
+    ranked = apply_state_penalties(rows, {}, limit=2)
+    assert [r.name for r in ranked] == ["Food 1", "Food 2"]
+    assert [r.rank for r in ranked] == [1, 2]
+
+
+def test_state_penalty_demotes_food():
+    rows = ranked_rows(90, 80, 70, 60)
+    penalties = {rows[0][0].food_id: 40.0}
+    # limit + len(penalties) candidates, as top_rankings fetches them
+    ranked = apply_state_penalties(rows[:3], penalties, limit=2)
+    assert [r.name for r in ranked] == ["Food 2", "Food 3"]
+    assert [r.national_rank for r in ranked] == [2, 3]
+    assert ranked[0].state_penalty == 0.0
+
+
+def test_penalized_scores_do_not_go_negative():
+    rows = ranked_rows(10)
+    ranked = apply_state_penalties(rows, {rows[0][0].food_id: 40.0}, limit=1)
+    assert ranked[0].score == 0.0 and ranked[0].state_penalty == 40.0
+
+
+def test_refresh_sql_ranks_overall_and_per_category():
+    sql = str(REFRESH_RANKINGS_SQL.compile(dialect=asyncpg.dialect()))
+    assert "row_number() OVER (ORDER BY score DESC, food_id)" in sql
+    assert "PARTITION BY category_id" in sql
+    assert "$1::FLOAT" in sql
+
+
+def matrix_of(*features, category="seafood"):
+    rows = []
+    for rank, (safety, ppm, sustainability, omega3) in enumerate(features, start=1):
+        ranking = models.FoodRanking(
+            food_id=uuid4(), rank=rank, safety_score=safety, mercury_ppm=ppm,
+            sustainability_score=sustainability, omega3_score=omega3,
+        )
+        rows.append(RankedRow(
+            food_id=ranking.food_id, name=f"Food {rank}", slug=f"food-{rank}",
+            category_slug=category, national_rank=rank, ranking=ranking,
+        ))
+    return FeatureMatrix(rows)
+
+
+def test_weight_vector_is_normalized():
+    assert weight_vector({"safety": 2, "omega3": 2}) == (0.5, 0.0, 0.0, 0.5)
+    assert weight_vector({"safety": 1}) == weight_vector({"safety": 5})
+
+
+@pytest.mark.parametrize("weights", [
+    {"taste": 1}, {"safety": -1, "omega3": 2}, {"safety": 0}, ["safety", "omega3"], "safety",
+])
+def test_weight_vector_rejects_bad_weights(weights):
+    with pytest.raises(ValueError):
+        weight_vector(weights)
+
+
+def test_scores_renormalize_over_present_features():
+    matrix = matrix_of((80, None, None, 40), (None, None, None, None))
+    scores = matrix.scores(weight_vector({"safety": 1, "sustainability": 1, "omega3": 2}))
+    assert scores[0] == pytest.approx((80 + 2 * 40) / 3)
+    assert isnan(scores[1])
+
+
+def test_profiles_reorder_foods():
+    # Food 1: better overall but 0.3 ppm mercury; Food 2: nearly mercury-free
+    matrix = matrix_of((70, 0.3, 90, 100), (95, 0.02, 40, 50))
+    default = matrix.top(weight_vector(PROFILES["default"]), limit=2)
+    pregnant = matrix.top(weight_vector(PROFILES["pregnant"]), limit=2)
+    assert [row.name for row, _ in default] == ["Food 1", "Food 2"]
+    assert [row.name for row, _ in pregnant] == ["Food 2", "Food 1"]
+
+
+def test_orderings_are_cached_per_weight_vector():
+    matrix = matrix_of((70, 0.3, 90, 100), (95, 0.02, 40, 50))
+    matrix.top(weight_vector(PROFILES["child"]), limit=1)
+    matrix.top(weight_vector(PROFILES["child"]), limit=2)
+    matrix.top(weight_vector(PROFILES["default"]), limit=2)
+    info = matrix.ordering.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_top_filters_by_category():
+    matrix = matrix_of((90, None, None, None), (80, None, None, None))
+    matrix.rows[0].category_slug = "produce"
+    top = matrix.top(weight_vector(PROFILES["default"]), limit=5, category="seafood")
+    assert [row.name for row, _ in top] == ["Food 2"]
+
+
+async def test_rankings_endpoint(async_client):
+    response = await async_client.get("/api/v1/rankings?limit=5")
+    assert response.status_code == 200
+    rankings = response.json()["rankings"]
+    assert [r["rank"] for r in rankings] == list(range(1, len(rankings) + 1))
+    scores = [r["score"] for r in rankings]
+    assert scores == sorted(scores, reverse=True)
+
+
+async def test_rankings_by_category_and_state(async_client):
+    response = await async_client.get("/api/v1/rankings?category=seafood&state=ca&limit=10")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["state"] == "CA"
+    scores = [r["score"] for r in data["rankings"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+async def test_personalized_rankings_reject_malformed_saved_weights(async_client):
+    async with AsyncSessionLocal() as session:
+        user = models.User(
+            email=f"{uuid4()}@example.com", hashed_password="x", preferences={"ranking_weights": ["safety"]}
+        )
+        session.add(user)
+        await session.commit()
+        try:
+            response = await async_client.get(f"/api/v1/rankings/personalized?user_id={user.id}")
+            assert response.status_code == 400
+        finally:
+            await session.delete(user)
+            await session.commit()
+
+
+async def test_personalized_rankings(async_client):
+    response = await async_client.get("/api/v1/rankings/personalized?profile=pregnant&limit=5")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["profile"] == "pregnant"
+    scores = [r["score"] for r in data["rankings"]]
+    assert scores == sorted(scores, reverse=True)
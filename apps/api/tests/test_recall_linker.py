@@ -0,0 +1,83 @@
+from uuid import uuid4
+
+from app.recalls import FoodTokenIndex
+from app.search.species import SpeciesEntry, SpeciesIndex
+
+ALBACORE, LIGHT, WILD_SALMON, SMOKED_SALMON, SARDINES = (uuid4() for _ in range(5))
+FOODS = [
+    (ALBACORE, "Tuna (Canned, Albacore)"),
+    (LIGHT, "Tuna (Canned, Light)"),
+    (WILD_SALMON, "Wild salmon"),
+    (SMOKED_SALMON, "Smoked salmon"),
+    (SARDINES, "Sardines"),
+]
+
+
+def index(**kwargs):
+    return FoodTokenIndex(FOODS, **kwargs)
+
+
+def test_most_specific_food_wins():
+    foods = index()
+    assert foods.match("Albacore Tuna Chunk in Water, 5 oz cans") == ALBACORE
+    assert foods.match("Chunk light tuna in water") == LIGHT
+    assert foods.match("Cold Smoked Atlantic Salmon, sliced") == SMOKED_SALMON
+    assert foods.match("Salmon burgers") == WILD_SALMON  # qualifier-free tie goes to the shorter name
+
+
+def test_tokens_are_normalized():
+    assert index().match("SARDINE FILLETS IN OLIVE OIL") == SARDINES
+
+
+def test_unmatched_recalls_stay_unlinked():
+    foods = index()
+    assert foods.match("Chocolate chip cookies") is None
+    assert foods.match(None) is None
+    assert len(foods) == len(FOODS)
+
+
+def test_species_alias_fallback():
+    species = SpeciesIndex([SpeciesEntry(id=1, slug="mackerel", name="Mackerel", aliases=["Scomber"])])
+    mackerel = uuid4()
+    foods = index(species=species, food_by_species={1: mackerel})
+    assert foods.match("Scomber fillets, frozen") == mackerel
+    assert index().match("Scomber fillets, frozen") is None
+
+
+
+def test_product_match_ignores_company_and_reason():
+    from sqlalchemy import func
+    from sqlalchemy.dialects import postgresql
+    from app.search.fulltext import matches_recall_product
+
+    sql = str(matches_recall_product(func.plainto_tsquery("english", "whole milk")).compile(dialect=postgresql.dialect()))
+    assert "ts_filter(food_recalls.search_vector, '{a}') @@ plainto_tsquery" in sql
+
+
+async def test_new_food_links_only_recalls_naming_it():
+    from app.db import models
+    from app.recalls import link_recalls_to_food
+
+    albacore, salad, light = uuid4(), uuid4(), uuid4()
+    # Full-text candidates; only descriptions naming every core word of the food link
+    candidates = [
+        (albacore, "Solid white albacore tuna in water"),
+        (salad, "Tuna salad kit"),
+        (light, "Chunk light tuna, albacore-style label"),
+    ]
+    statements = []
+
+    class Result:
+        def all(self):
+            return candidates
+
+    class Session:
+        async def execute(self, statement):
+            statements.append(statement)
+            return Result()
+
+    food = models.Food(id=uuid4(), name="Albacore tuna")
+    assert await link_recalls_to_food(Session(), food) == 2
+    update = statements[-1].compile()
+    assert set(update.params["id_1"]) == {albacore, light}
+    assert await link_recalls_to_food(Session(), models.Food(id=uuid4(), name="  ")) == 0
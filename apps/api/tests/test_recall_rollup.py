@@ -0,0 +1,27 @@
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.db.session import AsyncSessionLocal
+from app.recalls import check_recall_rollup
+from app.recalls.rollup import recount_query
+
+
+def test_recount_groups_by_its_select_expressions():
+    sql = str(recount_query().compile(dialect=asyncpg.dialect()))
+    # No bound parameters, so GROUP BY matches the selected expressions exactly
+    assert "$" not in sql
+    assert "GROUP BY date(timezone('UTC', food_recalls.recall_date)), coalesce(food_recalls.classification, '')" in sql
+
+
+async def test_rollup_matches_full_recount():
+    async with AsyncSessionLocal() as session:
+        assert await check_recall_rollup(session) == []
+
+
+async def test_summary_shape(async_client):
+    response = await async_client.get("/api/v1/recalls/stats/summary?days=365")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["period_days"] == 365
+    assert set(data["by_classification"]) == {"Class I", "Class II", "Class III"}
+    assert data["critical_recalls"] == data["by_classification"]["Class I"]
+    assert sum(data["by_status"].values()) == data["total_recalls"]
@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.db import models
+from app.recalls import RecallBroadcaster
+from app.recalls.stream import recall_event
+
+
+def recall(number, classification="Class I", state="CA"):
+    return models.FoodRecall(
+        id=uuid4(),
+        recall_number=number,
+        product_description="Smoked salmon",
+        classification=classification,
+        state=state,
+        created_at=datetime(2026, 1, 5, tzinfo=timezone.utc),
+    )
+
+
+def test_event_is_rendered_as_sse():
+    event = recall_event(recall("F-0001-2026"))
+    lines = event.message.decode().split("\n")
+    assert lines[:2] == ["id: F-0001-2026", "event: recall"]
+    assert json.loads(lines[2].removeprefix("data: "))["recall_number"] == "F-0001-2026"
+    assert event.message.endswith(b"\n\n")
+
+
+def test_publish_filters_by_classification_and_state():
+    broadcaster = RecallBroadcaster()
+    everything = broadcaster.subscribe()
+    class_one_ny = broadcaster.subscribe(classification="Class I", state="ny")
+    events = [recall_event(recall("a")), recall_event(recall("b", state="NY")), recall_event(recall("c", "Class II", "NY"))]
+
+    assert broadcaster.publish(events) == 4
+    assert everything.queue.qsize() == 3
+    assert class_one_ny.queue.get_nowait() is events[1]
+    assert class_one_ny.queue.empty()
+
+
+def test_slow_subscriber_is_dropped():
+    broadcaster = RecallBroadcaster(queue_size=2)
+    slow = broadcaster.subscribe()
+    broadcaster.publish([recall_event(recall(str(i))) for i in range(3)])
+    assert slow.dropped and len(broadcaster) == 0
+
+
+async def test_stream_rejects_subscribers_over_capacity(async_client, monkeypatch):
+    from app import recalls
+
+    monkeypatch.setattr(recalls, "_broadcaster", RecallBroadcaster(max_subscribers=0))
+    response = await async_client.get("/api/v1/recalls/stream")
+    assert response.status_code == 503
+
+
+class TransactionLog:
+    """Stand-in session: recalls tagged with the inserting transaction id, and the transactions still running"""
+
+    def __init__(self):
+        self.committed = []
+        self.running = set()
+        self.next_xid = 10
+
+    def begin(self):
+        self.next_xid += 1
+        self.running.add(self.next_xid)
+        return self.next_xid
+
+    def commit(self, xid, *recalls):
+        self.running.discard(xid)
+        for r in recalls:
+            r.ingest_xid = xid
+            self.committed.append(r)
+
+    async def scalar(self, statement):
+        if "pg_snapshot_xmin" in str(statement):
+            return min(self.running, default=self.next_xid + 1)
+        lower = statement.compile().params["ingest_xid_1"]
+        return any(r.ingest_xid >= lower for r in self.committed)
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        rows = [r for r in self.committed if params["ingest_xid_1"] <= r.ingest_xid < params["ingest_xid_2"]]
+        rows.sort(key=lambda r: r.ingest_xid, reverse=True)
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return rows
+
+        return Result()
+
+
+async def test_late_committing_transaction_is_not_skipped():
+    db = TransactionLog()
+    broadcaster = RecallBroadcaster()
+    await broadcaster.load_watermark(db)
+    subscriber = broadcaster.subscribe()
+
+    early, late = db.begin(), db.begin()
+    db.commit(late, recall("late"))
+    # The early transaction is still running, so nothing at or above it is final yet
+    assert await broadcaster.poll(db) == 0 and broadcaster.pending
+
+    db.commit(early, recall("early"))
+    assert await broadcaster.poll(db) == 2 and not broadcaster.pending
+    numbers = [subscriber.queue.get_nowait().message.split(b"\n")[0] for _ in range(2)]
+    assert sorted(numbers) == [b"id: early", b"id: late"]
+    assert await broadcaster.poll(db) == 0
@@ -0,0 +1,48 @@
+from datetime import date
+
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.recalls.timeseries import bucket_start, bucket_starts, timeseries_query
+
+
+def test_bucket_start_matches_date_trunc():
+    day = date(2024, 8, 15)  # a Thursday
+    assert bucket_start(day, "week") == date(2024, 8, 12)
+    assert bucket_start(day, "month") == date(2024, 8, 1)
+    assert bucket_start(day, "quarter") == date(2024, 7, 1)
+    assert bucket_start(day, "year") == date(2024, 1, 1)
+
+
+def test_bucket_starts_cover_both_ends():
+    assert bucket_starts(date(2023, 11, 20), date(2024, 2, 1), "month") == [
+        date(2023, 11, 1), date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1),
+    ]
+    assert bucket_starts(date(2023, 12, 31), date(2024, 1, 8), "week") == [
+        date(2023, 12, 25), date(2024, 1, 1), date(2024, 1, 8),
+    ]
+    assert bucket_starts(date(2022, 5, 1), date(2024, 1, 1), "quarter")[-1] == date(2024, 1, 1)
+
+
+def test_timeseries_groups_by_its_select_expressions():
+    query = timeseries_query("month", "state", date(2024, 1, 1), date(2024, 6, 30))
+    sql = str(query.compile(dialect=asyncpg.dialect()))
+    # Truncated as a plain timestamp and cast back to a date, so the session TimeZone can't shift buckets
+    bucket = "CAST(date_trunc('month', CAST(recall_daily_counts.day AS TIMESTAMP WITHOUT TIME ZONE)) AS DATE)"
+    assert f"GROUP BY {bucket}, recall_daily_counts.state" in sql
+    assert "recall_daily_counts.day <= $2::DATE" in sql
+
+
+async def test_timeseries_endpoint(async_client):
+    response = await async_client.get("/api/v1/recalls/stats/timeseries?bucket=week&by=classification&days=90")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["bucket"] == "week"
+    assert len(data["totals"]) == len(data["buckets"])
+    for counts in data["series"].values():
+        assert len(counts) == len(data["buckets"])
+    assert [sum(column) for column in zip(*data["series"].values())] == data["totals"] or not data["series"]
+
+
+async def test_timeseries_rejects_unknown_bucket(async_client):
+    response = await async_client.get("/api/v1/recalls/stats/timeseries?bucket=day")
+    assert response.status_code == 422
@@ -0,0 +1,258 @@
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.db import models
+from app.search import trigram
+
+
+def compile_pg(statement):
+    return str(statement.compile(dialect=asyncpg.dialect()))
+
+
+def test_normalize_common_names():
+    assert models.normalize_common_names(["Coho ", None, "", "Silver SALMON"]) == "coho silver salmon"
+    assert models.normalize_common_names(None) == ""
+
+
+def test_common_names_text_tracks_common_names():
+    food = models.Food(name="Wild salmon", slug="wild-salmon", common_names=["Sockeye", "Red Salmon"])
+    assert food.common_names_text == "sockeye red salmon"
+
+
+def test_trigram_query_uses_indexable_operators():
+    sql = compile_pg(trigram.ranked_query("  Wild   SALMON "))
+    assert "foods.name %>" in sql
+    assert "foods.common_names_text %>" in sql
+    assert "word_similarity" in sql
+    assert "count(*) OVER ()" in sql
+    assert "ORDER BY" in sql
+
+
+def test_normalize_query():
+    assert trigram.normalize_query("  Wild   SALMON ") == "wild salmon"
+
+
+def make_food(name, common_names=(), description=None):
+    from datetime import datetime, timezone
+    from uuid import uuid4
+    from app.db import schemas
+
+    return schemas.Food(
+        id=uuid4(), name=name, slug=name.lower().replace(" ", "-"), common_names=list(common_names),
+        description=description, created_at=datetime.now(timezone.utc),
+    )
+
+
+def test_bm25_ranks_name_matches_first():
+    from app.search.bm25 import BM25Index
+
+    index = BM25Index()
+    in_description = make_food("Tilapia", description="Often sold next to salmon")
+    in_name = make_food("Wild salmon")
+    index.add(in_description)
+    index.add(make_food("Cod"))
+    index.add(in_name)
+
+    total, hits = index.search("Salmon")
+    assert total == 2
+    assert [f.id for _, f in hits] == [in_name.id, in_description.id]
+
+    total, hits = index.search("salmons", limit=1, offset=1)
+    assert total == 2
+    assert [f.id for _, f in hits] == [in_description.id]
+
+    # Keyset continuation from the first hit
+    first_score, first = index.search("salmon", limit=1)[1][0]
+    total, hits = index.search("salmon", after=(first_score, first.name, first.id))
+    assert [f.id for _, f in hits] == [in_description.id]
+
+
+def test_bm25_incremental_update_and_remove():
+    from app.search.bm25 import BM25Index
+
+    index = BM25Index()
+    food = make_food("Sardines", common_names=["Pilchard"])
+    index.add(food)
+    assert index.search("pilchard")[0] == 1
+
+    index.add(food.model_copy(update={"common_names": ["Sprat"]}))
+    assert index.search("pilchard")[0] == 0
+    assert index.search("sprat")[0] == 1
+    assert len(index) == 1
+
+    index.remove(food.id)
+    assert index.search("sardine") == (0, [])
+    assert index.postings == {}
+    assert index.total_length == 0
+
+
+async def test_bm25_backend_falls_back_until_ready():
+    from app.search.base import SearchBackend, SearchPage
+    from app.search.bm25 import BM25Index, BM25SearchBackend
+
+    class Fallback(SearchBackend):
+        name = "fallback"
+
+        async def search(self, db, q, limit=20, offset=0, min_similarity=None, after=None):
+            return SearchPage(total=0, backend=self.name)
+
+    index = BM25Index()
+    index.add(make_food("Wild salmon"))
+    backend = BM25SearchBackend(index, fallback=Fallback())
+    assert (await backend.search(None, "salmon")).backend == "fallback"
+
+    index.ready = True
+    page = await backend.search(None, "salmon")
+    assert page.backend == "bm25"
+    assert page.total == 1
+    assert page.next_after is None
+
+    index.add(make_food("Salmon (Canned)"))
+    page = await backend.search(None, "salmon", limit=1)
+    assert len(page.foods) == 1
+    rest = await backend.search(None, "salmon", limit=1, after=page.next_after)
+    assert rest.foods[0].id != page.foods[0].id
+    assert rest.next_after is None
+
+
+async def test_foods_changed_elsewhere_are_reindexed_from_the_database():
+    from datetime import datetime, timezone
+    from uuid import uuid4
+    from app.db import models
+    from app.search.bm25 import BM25Index
+    from app.search.indexer import apply_food_changes
+
+    index = BM25Index()
+    deleted = make_food("Smoked herring")
+    index.add(deleted)
+    imported = models.Food(
+        id=uuid4(), name="Wild salmon fillets", slug="wild-salmon-fillets", common_names=[],
+        created_at=datetime.now(timezone.utc), category=None,
+    )
+
+    class Result:
+        def scalars(self):
+            return [imported]
+
+    class Session:
+        async def execute(self, statement):
+            return Result()
+
+    assert await apply_food_changes(Session(), index, {imported.id, deleted.id}) == 1
+    assert set(index.documents) == {imported.id}
+    assert index.search("salmon")[0] == 1
+
+
+async def test_fallback_pages_are_cursored_and_cached_as_the_fallback(async_client, monkeypatch):
+    from app import search
+    from app.api.pagination import cursor_kind
+    from app.search.base import SearchBackend, SearchPage
+    from app.search.bm25 import BM25Index, BM25SearchBackend
+
+    class Trigram(SearchBackend):
+        name = "trigram"
+
+        async def search(self, db, q, limit=20, offset=0, min_similarity=None, after=None):
+            foods = [make_food("Wild salmon")]
+            return SearchPage(total=2, foods=foods, backend=self.name, next_after=(0.5, "Wild salmon", foods[0].id))
+
+    trigram = Trigram()
+    bm25 = BM25SearchBackend(BM25Index(), fallback=trigram)
+    assert bm25.serving() is trigram
+    monkeypatch.setitem(search.BACKENDS, "bm25", bm25)
+
+    response = await async_client.get("/api/v1/search", params={"q": "salmon", "mode": "bm25"})
+    assert response.status_code == 200
+    next_cursor = response.json()["next_cursor"]
+    assert cursor_kind(next_cursor) == "search:trigram"
+
+    # Once the index is ready, a search paged through on the fallback stays there
+    bm25.index.ready = True
+    assert bm25.serving() is bm25
+    assert bm25.serving("trigram") is trigram
+    response = await async_client.get("/api/v1/search", params={"q": "salmon", "mode": "bm25", "cursor": next_cursor})
+    assert response.status_code == 200
+
+
+def test_suggest_ranks_by_popularity_and_matches_inner_words():
+    from app.search.suggest import SuggestIndex, Suggestion
+
+    index = SuggestIndex([
+        Suggestion(text="Wild salmon", kind="food", popularity=5, slug="wild-salmon"),
+        Suggestion(text="Salmon (Canned)", kind="food", popularity=9, slug="salmon-canned"),
+        Suggestion(text="Sardines", kind="food", popularity=1, slug="sardines"),
+        Suggestion(text="Salmon Brothers Seafood Co.", kind="company", popularity=2),
+        Suggestion(text="Wild salmon", kind="food", popularity=5, slug="wild-salmon"),
+    ])
+    assert len(index) == 4
+
+    assert [s.text for s in index.complete("salm")] == [
+        "Salmon (Canned)", "Wild salmon", "Salmon Brothers Seafood Co.",
+    ]
+    assert [s.text for s in index.complete("s", k=2)] == ["Salmon (Canned)", "Wild salmon"]
+    assert [s.text for s in index.complete("SA", kind="company")] == ["Salmon Brothers Seafood Co."]
+    assert index.complete("wild sal")[0].slug == "wild-salmon"
+    assert index.complete("xyz") == []
+    assert index.complete("  ") == []
+
+
+async def test_suggest_endpoint_uses_memory_index(async_client, monkeypatch):
+    from app import search
+    from app.search.suggest import SuggestIndex, Suggestion
+
+    index = SuggestIndex([Suggestion(text="Rainbow trout", kind="food", popularity=3, slug="rainbow-trout")])
+    monkeypatch.setattr(search, "_suggest", index)
+
+    response = await async_client.get("/api/v1/search/suggest?q=tro")
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "tro",
+        "suggestions": [{"text": "Rainbow trout", "kind": "food", "slug": "rainbow-trout", "popularity": 3}],
+    }
+
+
+def test_unified_query_is_one_statement_per_requested_type():
+    from app.search import fulltext
+
+    sql = compile_pg(fulltext.unified_query("salmon mercury", types=("foods", "papers"), limit=3))
+    assert sql.count("UNION ALL") == 1
+    assert "foods.search_vector @@ websearch_to_tsquery" in sql
+    assert "research_papers.search_vector @@ websearch_to_tsquery" in sql
+    assert "food_recalls" not in sql
+    assert "ts_rank" in sql
+
+
+def test_recall_search_is_ranked_full_text():
+    from app.search import fulltext
+
+    sql = compile_pg(fulltext.recall_search_query('"peanut butter" -cookies', limit=20))
+    assert "food_recalls.search_vector @@ websearch_to_tsquery" in sql
+    assert "ILIKE" not in sql
+    assert "ORDER BY ts_rank(food_recalls.search_vector, websearch_to_tsquery" in sql
+    assert "DESC, food_recalls.recall_date DESC NULLS LAST, food_recalls.id DESC" in sql
+    # The generated vector stays deferred
+    assert "food_recalls.search_vector," not in sql.split("FROM")[0]
+
+
+async def test_recall_search_endpoint(async_client):
+    response = await async_client.get("/api/v1/recalls/search?q=salmonella OR listeria&limit=5")
+    assert response.status_code == 200
+    assert len(response.json()) <= 5
+
+
+def test_group_hits_orders_by_rank():
+    from types import SimpleNamespace
+    from app.search import fulltext
+
+    rows = [
+        SimpleNamespace(type="foods", id="1", title="Cod", subtitle=None, ref="cod", rank=0.1, total=2),
+        SimpleNamespace(type="foods", id="2", title="Wild salmon", subtitle=None, ref="wild-salmon", rank=0.6, total=2),
+        SimpleNamespace(type="papers", id="3", title="Mercury", subtitle="J", ref=None, rank=0.2, total=7),
+    ]
+    groups = fulltext.group_hits(rows)
+    assert [h["ref"] for h in groups["foods"]["hits"]] == ["wild-salmon", "cod"]
+    assert groups["papers"]["total"] == 7
+
+
+async def test_search_all_rejects_unknown_types(async_client):
+    response = await async_client.get("/api/v1/search/all?q=salmon&types=foods,users")
+    assert response.status_code == 400
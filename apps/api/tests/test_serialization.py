@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import uuid4
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.api.projection import FoodProjection
+from app.api.serialization import PAPER_SHAPE, RECALL_SHAPE, FastJSONResponse, food_shape
+from app.db import models, schemas
+from app.schemas.recalls import RecallResponse
+
+CREATED = datetime(2024, 3, 4, 5, 6, 7, 891011, tzinfo=timezone.utc)
+
+
+def row_for(obj, shape):
+    """The column tuple the fast path would select for ``obj``"""
+    row = [getattr(obj, name) for name in shape.names]
+    for name, nested in shape.nested.items():
+        related = getattr(obj, name)
+        row.extend(row_for(related, nested) if related is not None else [None] * len(nested.columns))
+    return tuple(row)
+
+
+def response_model_body(schema, objects) -> bytes:
+    """What FastAPI renders for ``response_model=List[schema]``"""
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+def make_foods():
+    seafood = models.FoodCategory(id=1, name="Seafood", slug="seafood", description="Fish & shellfish")
+    return [
+        models.Food(
+            id=uuid4(), name="Crème fraîche salmon", slug="creme-fraiche-salmon", common_names=["Saumon"],
+            description="Smoked", barcode="0123", category_id=1, category=seafood,
+            created_at=CREATED, updated_at=CREATED + timedelta(days=1),
+        ),
+        models.Food(id=uuid4(), name="Kale", slug="kale", common_names=[], created_at=CREATED),
+    ]
+
+
+def test_foods_match_response_model():
+    foods = make_foods()
+    shape = food_shape()
+    fast = FastJSONResponse(shape.build_all(row_for(f, shape) for f in foods)).body
+    assert fast == response_model_body(schemas.Food, foods)
+
+
+def test_sparse_foods_match_projection():
+    foods = make_foods()
+    projection = FoodProjection.parse("id,name,created_at", "")
+    shape = food_shape(projection.fields, projection.include)
+    fast = FastJSONResponse(shape.build_all(row_for(f, shape) for f in foods)).body
+    assert fast == projection.response(foods).body
+
+
+def test_recalls_match_response_model():
+    recalls = [
+        models.FoodRecall(
+            id=uuid4(), recall_number="F-0001-2024", product_description="Peanut butter 16 oz",
+            reason_for_recall="Salmonella", recall_date=CREATED, classification="Class I",
+            state="CA", food_id=uuid4(), created_at=CREATED,
+        ),
+        models.FoodRecall(id=uuid4(), recall_number="F-0002-2024", product_description="Jalapeño dip",
+                          created_at=CREATED),
+    ]
+    fast = FastJSONResponse(RECALL_SHAPE.build_all(row_for(r, RECALL_SHAPE) for r in recalls)).body
+    assert fast == response_model_body(RecallResponse, recalls)
+
+
+def test_papers_match_response_model():
+    papers = [
+        models.ResearchPaper(
+            id=uuid4(), title="Mercury in tuna", authors=["A. Author", "B. Autor"], abstract="…",
+            publication_date=datetime(2019, 1, 1, tzinfo=timezone.utc), keywords=["mercury"],
+            related_contaminants=[], related_foods=["tuna"], created_at=CREATED,
+        ),
+    ]
+    fast = FastJSONResponse(PAPER_SHAPE.build_all(row_for(p, PAPER_SHAPE) for p in papers)).body
+    assert fast == response_model_body(schemas.ResearchPaper, papers)
+
+
+def test_null_arrays_become_empty_lists():
+    paper = models.ResearchPaper(id=uuid4(), title="Untagged", created_at=CREATED)
+    [body] = PAPER_SHAPE.build_all([row_for(paper, PAPER_SHAPE)])
+    assert body["authors"] == [] and body["keywords"] == []
+
+
+@pytest.mark.parametrize("include,expected", [((), None), (("category",), "category")])
+def test_category_is_only_selected_when_included(include, expected):
+    shape = food_shape(include=include)
+    assert ("category" in shape.emit) == (expected is not None)
+    assert all(column.class_ is models.Food for column in shape.columns) == (expected is None)
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.search.species import SpeciesEntry, SpeciesIndex, species_key
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data"
+
+
+@pytest.fixture(scope="module")
+def index():
+    data = json.loads((DATA_DIR / "species.json").read_text())
+    return SpeciesIndex(
+        SpeciesEntry(id=i, slug=s["slug"], name=s["name"], aliases=s["aliases"])
+        for i, s in enumerate(data, start=1)
+    )
+
+
+def test_species_key_is_order_and_form_insensitive():
+    assert species_key("Tuna (Albacore)") == species_key("albacore tunas") == "albacore tuna"
+    assert species_key("Crab [1]") == "crab"
+    assert species_key("Anchovies") == species_key("anchovy")
+    assert species_key("Bass") == "bass"
+
+
+def test_alias_keys_are_unambiguous(index, caplog):
+    data = json.loads((DATA_DIR / "species.json").read_text())
+    SpeciesIndex(SpeciesEntry(id=i, slug=s["slug"], name=s["name"], aliases=s["aliases"]) for i, s in enumerate(data))
+    assert "already belongs" not in caplog.text
+
+
+@pytest.mark.parametrize("name,slug", [
+    ("Tuna (Albacore)", "tuna-albacore"),      # FDA / NOAA
+    ("Tuna (Canned, Albacore)", "tuna-albacore"),
+    ("Salmon (Canned)", "salmon"),
+    ("Wild salmon", "salmon"),                 # EWG
+    ("Atlantic Salmon", "salmon"),             # NOAA
+    ("Salmon (Chinook)", "salmon"),            # EPA
+    ("Scallops", "scallop"),
+    ("Bass (Largemouth)", "freshwater-bass"),
+    ("Crab [1]", "crab"),
+    ("Smoked wild sockeye salmon", "salmon"),  # qualifiers dropped
+    ("Pacific Cod Loins", "cod"),              # single-token fallback
+    ("Tuna (Fresh/Frozen, Species Unknown)", "tuna"),
+])
+def test_resolves_source_names(index, name, slug):
+    assert index.resolve(name).slug == slug
+
+
+def test_every_source_name_resolves(index):
+    fda = [d["name"] for d in json.loads((DATA_DIR / "fda_mercury_1990_2012.json").read_text())]
+    ewg = [d["name"] for d in json.loads((DATA_DIR / "ewg_seafood.json").read_text())]
+    unresolved = [name for name in fda + ewg if index.resolve(name) is None]
+    assert unresolved == []
+
+
+def test_unknown_names(index):
+    assert index.resolve("Strawberries") is None
+    assert index.resolve("") is None
+    assert index.expansion_terms("kale") == []
+
+
+def test_expansion_terms(index):
+    terms = index.expansion_terms("albacore")
+    assert "tuna" in terms and "albacore" in terms
+    assert "canned" not in terms
@@ -34,43 +34,63 @@ class OpenFoodFactsScraper:
         """Close the HTTP client"""
         await self.client.aclose()
 
-    async def get_product_by_barcode(self, barcode: str) -> Optional[Dict]:
+    async def fetch_product_by_barcode(self, barcode: str) -> Optional[Dict]:
         """
-        Get product information by barcode (UPC/EAN)
+        Get product information by barcode, raising on network/API errors
 
         Args:
             barcode: Product barcode (e.g., "012345678901")
 
         Returns:
-            Product dictionary or None if not found
+            Product dictionary, or None if Open Food Facts has no such product
+
+        Raises:
+            httpx.HTTPError: the lookup failed (unlike "not found", not worth caching)
+            ValueError: the response wasn't valid JSON
         """
-        try:
-            # Clean barcode (remove spaces, dashes)
-            barcode = barcode.replace(" ", "").replace("-", "")
+        # Clean barcode (remove spaces, dashes)
+        barcode = barcode.replace(" ", "").replace("-", "")
 
-            url = f"{self.PRODUCT_URL}/{barcode}.json"
-            logger.info(f"Fetching product: {barcode}")
+        url = f"{self.PRODUCT_URL}/{barcode}.json"
+        logger.info(f"Fetching product: {barcode}")
 
-            response = await self.client.get(url)
-            response.raise_for_status()
+        response = await self.client.get(url)
+        # API v2 answers unknown barcodes with 404 and status 0
+        if response.status_code == 404:
+            logger.warning(f"Product not found: {barcode}")
+            return None
+        response.raise_for_status()
 
-            data = response.json()
+        data = response.json()
+
+        # Check if product was found
+        if data.get("status") != 1:
+            logger.warning(f"Product not found: {barcode}")
+            return None
+
+        product = data.get("product", {})
+
+        if not product:
+            return None
 
-            # Check if product was found
-            if data.get("status") != 1:
-                logger.warning(f"Product not found: {barcode}")
-                return None
+        # Transform to our format
+        transformed = self._transform_product(product, barcode)
+        logger.info(f"✅ Found product: {transformed.get('product_name', 'Unknown')}")
 
-            product = data.get("product", {})
+        return transformed
 
-            if not product:
-                return None
+    async def get_product_by_barcode(self, barcode: str) -> Optional[Dict]:
+        """
+        Get product information by barcode (UPC/EAN)
 
-            # Transform to our format
-            transformed = self._transform_product(product, barcode)
-            logger.info(f"✅ Found product: {transformed.get('product_name', 'Unknown')}")
+        Args:
+            barcode: Product barcode (e.g., "012345678901")
 
-            return transformed
+        Returns:
+            Product dictionary or None if not found
+        """
+        try:
+            return await self.fetch_product_by_barcode(barcode)
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching product {barcode}: {e}")
@@ -79,14 +99,14 @@ class OpenFoodFactsScraper:
             logger.error(f"Error fetching product {barcode}: {e}")
             return None
 
-    async def search_products(
+    async def fetch_search_page(
         self,
         query: str,
         page: int = 1,
         page_size: int = 20
     ) -> List[Dict]:
         """
-        Search for products by name
+        Search for products by name, raising on network/API errors
 
         Args:
             query: Search query
@@ -95,33 +115,54 @@ class OpenFoodFactsScraper:
 
         Returns:
             List of product dictionaries
+
+        Raises:
+            httpx.HTTPError: the search failed (an empty list means no matches)
+            ValueError: the response wasn't valid JSON
         """
-        try:
-            url = f"{self.BASE_URL}/search"
-            params = {
-                "search_terms": query,
-                "page": page,
-                "page_size": page_size,
-                "fields": "code,product_name,brands,categories,ingredients_text,nutriscore_grade,nova_group,ecoscore_grade"
-            }
+        url = f"{self.BASE_URL}/search"
+        params = {
+            "search_terms": query,
+            "page": page,
+            "page_size": page_size,
+            "fields": "code,product_name,brands,categories,ingredients_text,nutriscore_grade,nova_group,ecoscore_grade"
+        }
+
+        logger.info(f"Searching products: {query}")
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+
+        data = response.json()
+        products = data.get("products", [])
 
-            logger.info(f"Searching products: {query}")
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
+        logger.info(f"Found {len(products)} products for '{query}'")
 
-            data = response.json()
-            products = data.get("products", [])
+        # Transform products
+        return [
+            self._transform_product(p, p.get("code", ""))
+            for p in products
+            if p.get("code")
+        ]
 
-            logger.info(f"Found {len(products)} products for '{query}'")
+    async def search_products(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = 20
+    ) -> List[Dict]:
+        """
+        Search for products by name
 
-            # Transform products
-            transformed = [
-                self._transform_product(p, p.get("code", ""))
-                for p in products
-                if p.get("code")
-            ]
+        Args:
+            query: Search query
+            page: Page number (1-indexed)
+            page_size: Results per page
 
-            return transformed
+        Returns:
+            List of product dictionaries
+        """
+        try:
+            return await self.fetch_search_page(query, page=page, page_size=page_size)
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error searching: {e}")
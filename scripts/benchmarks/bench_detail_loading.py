@@ -0,0 +1,126 @@
+"""
+Food detail loading benchmark
+
+Loads foods with a growing number of contaminant-level and nutrient rows and
+compares the old single-statement joinedload strategy with the selectinload
+strategy used by the detail routes. For each shape it reports the rows
+Postgres sent back and the latency of loading one food.
+
+With joinedload the two collections multiply (rows = levels x nutrients);
+with selectinload they add up (rows = 1 + levels + nutrients).
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../foodsafety_bench \\
+        python scripts/benchmarks/bench_detail_loading.py --shapes 5x10,20x40,50x100
+"""
+import argparse
+import asyncio
+import uuid
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from common import report, reset_database, time_async
+
+from app.api.projection import FoodProjection
+from app.db.models import Contaminant, Food, FoodContaminantLevel, FoodNutrient, Source
+
+
+def joined_options():
+    """Loader options of the detail routes before selectinload (one statement, cartesian rows)"""
+    return [
+        joinedload(Food.category),
+        joinedload(Food.contaminant_levels).joinedload(FoodContaminantLevel.contaminant),
+        joinedload(Food.contaminant_levels).joinedload(FoodContaminantLevel.source),
+        joinedload(Food.nutrients).joinedload(FoodNutrient.source),
+        selectinload(Food.advisories),
+        selectinload(Food.sustainability_ratings),
+    ]
+
+
+def parse_shapes(value: str):
+    return [tuple(int(n) for n in shape.split("x")) for shape in value.split(",")]
+
+
+async def load_foods(session_factory, shapes):
+    """One food per (levels, nutrients) shape; returns {shape: food_id}"""
+    max_levels = max(levels for levels, _ in shapes)
+    food_ids = {}
+    async with session_factory() as session:
+        source = Source(name="Bench", source_type="government")
+        session.add(source)
+        contaminants = [
+            Contaminant(name=f"Contaminant {i}", unit="ppm") for i in range(max_levels)
+        ]
+        session.add_all(contaminants)
+        await session.flush()
+
+        for levels, nutrients in shapes:
+            food_id = uuid.uuid4()
+            food_ids[(levels, nutrients)] = food_id
+            await session.execute(insert(Food), [{
+                "id": food_id, "name": f"Bench food {levels}x{nutrients}", "slug": f"bench-{levels}x{nutrients}",
+            }])
+            if levels:
+                await session.execute(insert(FoodContaminantLevel), [
+                    {"food_id": food_id, "contaminant_id": contaminants[i].id, "source_id": source.id,
+                     "level_value": i / 10, "level_unit": "ppm"}
+                    for i in range(levels)
+                ])
+            if nutrients:
+                await session.execute(insert(FoodNutrient), [
+                    {"food_id": food_id, "nutrient_name": f"Nutrient {i}", "amount": float(i),
+                     "unit": "g", "source_id": source.id}
+                    for i in range(nutrients)
+                ])
+        await session.commit()
+    return food_ids
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", default="0x0,5x10,20x40,50x100",
+                        help="Comma-separated LEVELSxNUTRIENTS child-row counts")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+    shapes = parse_shapes(args.shapes)
+
+    engine, session_factory = await reset_database()
+    food_ids = await load_foods(session_factory, shapes)
+
+    # Count the rows each statement returns (asyncpg reports them via rowcount)
+    rows = []
+
+    def count_rows(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            rows.append(max(cursor.rowcount, 0))
+
+    event.listen(engine.sync_engine, "after_cursor_execute", count_rows)
+
+    strategies = {
+        "joinedload": joined_options,
+        "selectinload": FoodProjection.parse(None, None).loader_options,
+    }
+
+    print(f"\nFood detail load, per food (iterations={args.iterations}):")
+    for shape in shapes:
+        food_id = food_ids[shape]
+        print(f"\n  {shape[0]} contaminant levels x {shape[1]} nutrients")
+        for label, options in strategies.items():
+            async with session_factory() as session:
+                async def load(i, options=options):
+                    session.expunge_all()
+                    query = select(Food).where(Food.id == food_id).options(*options())
+                    (await session.execute(query)).unique().scalar_one()
+
+                rows.clear()
+                await load(0)
+                print(f"  {label:<14} statements={len(rows):<3} rows={sum(rows)}")
+                report(f"{label} latency", await time_async(load, args.iterations))
+
+    event.remove(engine.sync_engine, "after_cursor_execute", count_rows)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
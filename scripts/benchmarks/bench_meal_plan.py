@@ -0,0 +1,74 @@
+"""
+Meal-plan optimizer microbenchmark
+
+Times ``optimize_meal_plan`` over a synthetic species catalog (FDA-like
+mercury levels, EWG-like omega-3 tiers, a few products per species) for a
+range of plan sizes, body weights and both objectives. No database needed.
+
+Usage:
+    python scripts/benchmarks/bench_meal_plan.py --species 80 --foods-per-species 2
+"""
+import argparse
+import random
+import uuid
+
+from common import report, synthetic_food_name, time_sync
+
+from app.db import models
+from app.exposure import mercury_budget_ug, optimize_meal_plan, species_groups
+from app.rankings.personalized import RankedRow
+
+# Roughly the spread of FDA mean mercury levels (ppm), from scallops to swordfish
+MERCURY_PPM = [0.003, 0.01, 0.02, 0.05, 0.08, 0.1, 0.15, 0.2, 0.35, 0.5, 0.9, 1.0]
+OMEGA3_SCORES = [25, 50, 75, 100]
+
+CASES = [
+    # (servings per week, max per species)
+    (3, 2),
+    (7, 2),
+    (14, 3),
+    (14, 7),
+]
+
+
+def synthetic_catalog(species: int, foods_per_species: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(species * foods_per_species):
+        ranking = models.FoodRanking(
+            food_id=uuid.uuid4(), rank=i + 1, score=rng.uniform(30, 95),
+            omega3_score=rng.choice(OMEGA3_SCORES),
+            mercury_ppm=rng.choice(MERCURY_PPM) * rng.uniform(0.8, 1.2),
+        )
+        rows.append(RankedRow(
+            food_id=ranking.food_id, name=synthetic_food_name(rng, i), slug=f"food-{i}",
+            category_slug="seafood", national_rank=i + 1, ranking=ranking, species_id=i % species,
+        ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--species", type=int, default=80)
+    parser.add_argument("--foods-per-species", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = synthetic_catalog(args.species, args.foods_per_species)
+    print(f"\nOptimizing over {len(rows)} foods in {args.species} species:")
+    for objective in ("omega3", "score"):
+        for body_weight_kg in (20, 70):
+            budget_ug = mercury_budget_ug(body_weight_kg)
+            for servings, per_species in CASES:
+                def optimize(i):
+                    groups = species_groups(rows, objective)
+                    return optimize_meal_plan(groups, objective, budget_ug, servings, per_species, portion_g=113)
+
+                plan = optimize(0)
+                label = f"{objective} {body_weight_kg}kg {servings}/wk <= {per_species}/species"
+                report(label, time_sync(optimize, args.iterations))
+                print(f"    {plan.servings} servings, {plan.mercury_ug:.1f} of {budget_ug:.1f} µg mercury")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Recall search latency benchmark
+
+Loads synthetic recalls (500k by default) and compares the old
+/recalls/search query (three ILIKE '%q%' clauses, newest first) with the
+ranked websearch_to_tsquery search over the GIN-indexed search_vector.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../foodsafety_bench \\
+        python scripts/benchmarks/bench_recall_search.py --recalls 500000
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import desc, insert, or_, select, text
+
+from common import FISH_WORDS, QUALIFIERS, report, reset_database, time_async
+
+from app.db.models import FoodRecall
+from app.search import fulltext
+
+COMPANIES = ["Ocean", "Harbor", "Coastal", "Northern", "Blue Water", "Pacific", "Gulf", "Bay"]
+SUFFIXES = ["Seafoods", "Foods Inc.", "Fisheries", "Packing Co.", "Trading LLC"]
+REASONS = [
+    "Potential Listeria monocytogenes contamination",
+    "May be contaminated with Salmonella",
+    "Undeclared allergen: milk",
+    "Undeclared allergen: wheat",
+    "Elevated histamine levels (scombrotoxin)",
+    "Clostridium botulinum risk due to underprocessing",
+    "Foreign material: metal fragments",
+    "Temperature abuse during distribution",
+]
+PACKAGING = ["fillets", "steaks", "portions", "in oil", "in water", "whole", "chunks"]
+QUERIES = [
+    "salmon", "smoked salmon", "listeria", '"smoked salmon" listeria', "tuna -canned",
+    "histamine", "crab OR lobster", "undeclared milk", "harbor seafoods", "metal fragments",
+]
+
+
+async def load_recalls(session_factory, count: int, seed: int = 3):
+    """Bulk insert ``count`` synthetic recalls"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    batch = []
+    async with session_factory() as session:
+        for i in range(count):
+            product = " ".join(rng.sample(QUALIFIERS, rng.randint(1, 2)) + [rng.choice(FISH_WORDS)])
+            batch.append({
+                "id": uuid.uuid4(),
+                "recall_number": f"S-{i:07d}",
+                "product_description": f"{product.capitalize()} {rng.choice(PACKAGING)}, {rng.randint(4, 32)} oz",
+                "company_name": f"{rng.choice(COMPANIES)} {rng.choice(SUFFIXES)}",
+                "reason_for_recall": rng.choice(REASONS),
+                "recall_date": now - timedelta(minutes=rng.randrange(10 * 365 * 24 * 60)),
+            })
+            if len(batch) == 5000:
+                await session.execute(insert(FoodRecall), batch)
+                batch = []
+        if batch:
+            await session.execute(insert(FoodRecall), batch)
+        await session.commit()
+        await session.execute(text("ANALYZE food_recalls"))
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recalls", type=int, default=500_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    engine, session_factory = await reset_database()
+    print(f"Loading {args.recalls} synthetic recalls...")
+    await load_recalls(session_factory, args.recalls)
+
+    async with session_factory() as session:
+        async def ilike(i, q):
+            term = f"%{q}%"
+            (await session.execute(
+                select(FoodRecall)
+                .where(or_(
+                    FoodRecall.product_description.ilike(term),
+                    FoodRecall.company_name.ilike(term),
+                    FoodRecall.reason_for_recall.ilike(term),
+                ))
+                .order_by(desc(FoodRecall.recall_date))
+                .limit(args.limit)
+            )).scalars().all()
+            session.expunge_all()
+
+        async def ranked(i, q):
+            (await session.execute(fulltext.recall_search_query(q, args.limit))).scalars().all()
+            session.expunge_all()
+
+        print(f"\nRecall search latency over {args.recalls} recalls (limit={args.limit}):")
+        for q in QUERIES:
+            # ILIKE has no operators; give it the plain words
+            plain = q.replace('"', "").split(" -")[0].split(" OR ")[0]
+            report(f"ILIKE    {plain!r}", await time_async(lambda i: ilike(i, plain), args.iterations))
+            report(f"ranked   {q!r}", await time_async(lambda i: ranked(i, q), args.iterations))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Recall statistics benchmark
+
+Loads synthetic recalls spread over ten years (300k by default), builds the
+daily rollup and compares:
+
+- /recalls/stats/summary: loading every recall in the window vs summing the rollup
+- /recalls/stats/timeseries: date_trunc over food_recalls, with an index on
+  (recall_date, classification), vs date_trunc over the rollup
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../foodsafety_bench \\
+        python scripts/benchmarks/bench_recall_stats.py --recalls 300000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, literal_column, select, text
+
+from common import report, reset_database, time_async
+
+from app.db.models import FoodRecall
+from app.recalls import rebuild_recall_rollup, recall_summary, recall_timeseries
+
+CLASSIFICATIONS = ["Class I", "Class II", "Class III", None]
+STATUSES = ["Ongoing", "Completed", "Terminated", None]
+STATES = ["CA", "NY", "TX", "FL", "WA", "IL", "PA", "OH", "GA", "NC", None]
+YEARS = 10
+
+
+async def load_recalls(session_factory, count: int, seed: int = 5):
+    """Bulk insert ``count`` synthetic recalls dated over the last ten years"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    batch = []
+    async with session_factory() as session:
+        for i in range(count):
+            batch.append({
+                "id": uuid.uuid4(),
+                "recall_number": f"B-{i:07d}",
+                "product_description": f"Synthetic product {i}",
+                "recall_date": now - timedelta(minutes=rng.randrange(YEARS * 365 * 24 * 60)),
+                "classification": rng.choice(CLASSIFICATIONS),
+                "status": rng.choice(STATUSES),
+                "state": rng.choice(STATES),
+            })
+            if len(batch) == 5000:
+                await session.execute(insert(FoodRecall), batch)
+                batch = []
+        if batch:
+            await session.execute(insert(FoodRecall), batch)
+        await session.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_bench_recall_date_classification "
+            "ON food_recalls (recall_date, classification)"
+        ))
+        await session.commit()
+
+        start = time.perf_counter()
+        rows = await rebuild_recall_rollup(session)
+        await session.commit()
+        print(f"Rollup rebuilt in {time.perf_counter() - start:.2f} s ({rows} rows)")
+        await session.execute(text("ANALYZE food_recalls"))
+        await session.execute(text("ANALYZE recall_daily_counts"))
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recalls", type=int, default=300_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    engine, session_factory = await reset_database()
+    print(f"Loading {args.recalls} synthetic recalls...")
+    await load_recalls(session_factory, args.recalls)
+
+    async with session_factory() as session:
+        async def summary_from_recalls(i, days=365):
+            # What /stats/summary did before the rollup
+            cutoff = datetime.now() - timedelta(days=days)
+            recalls = (await session.execute(
+                select(FoodRecall).where(FoodRecall.recall_date >= cutoff)
+            )).scalars().all()
+            counts = {}
+            for recall in recalls:
+                counts[recall.classification] = counts.get(recall.classification, 0) + 1
+            session.expunge_all()
+
+        async def summary_from_rollup(i, days=365):
+            await recall_summary(session, days)
+
+        async def timeseries_from_recalls(i, bucket="month"):
+            start = func.date_trunc(literal_column(f"'{bucket}'"), FoodRecall.recall_date)
+            since = datetime.now(timezone.utc) - timedelta(days=YEARS * 365)
+            (await session.execute(
+                select(start, FoodRecall.classification, func.count())
+                .where(FoodRecall.recall_date >= since)
+                .group_by(start, FoodRecall.classification)
+            )).all()
+
+        async def timeseries_from_rollup(i, bucket="month"):
+            await recall_timeseries(session, bucket, "classification", YEARS * 365)
+
+        print(f"\nRecall stats over {args.recalls} recalls:")
+        report("summary, 365 days, load recalls", await time_async(summary_from_recalls, args.iterations))
+        report("summary, 365 days, rollup", await time_async(summary_from_rollup, args.iterations))
+        for bucket in ("week", "month"):
+            report(f"timeseries 10y/{bucket}, food_recalls", await time_async(
+                lambda i: timeseries_from_recalls(i, bucket), args.iterations
+            ))
+            report(f"timeseries 10y/{bucket}, rollup", await time_async(
+                lambda i: timeseries_from_rollup(i, bucket), args.iterations
+            ))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
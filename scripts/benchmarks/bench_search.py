@@ -0,0 +1,103 @@
+"""
+Food search latency benchmark
+
+Loads a synthetic foods table (100k rows by default) and compares the legacy
+ILIKE substring search, the pg_trgm ranked search and the in-process BM25
+index behind /api/v1/search.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql+asyncpg://.../foodsafety_bench \\
+        python scripts/benchmarks/bench_search.py --foods 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import func, insert, or_, select, text
+
+from common import FISH_WORDS, report, reset_database, synthetic_food_name, time_async, time_sync, typo
+
+from app.core.config import settings
+from app.db.models import Food, normalize_common_names
+from app.search import trigram
+from app.search.indexer import build_food_index
+
+
+async def load_foods(session_factory, count: int, seed: int = 7):
+    """Bulk insert ``count`` synthetic foods"""
+    rng = random.Random(seed)
+    batch = []
+    async with session_factory() as session:
+        for i in range(count):
+            name = synthetic_food_name(rng, i)
+            common_names = [f"{rng.choice(FISH_WORDS)} fillet", f"{name.split()[0].lower()} fish"]
+            batch.append({
+                "id": uuid.uuid4(),
+                "name": name,
+                "slug": f"bench-food-{i}",
+                "common_names": common_names,
+                "common_names_text": normalize_common_names(common_names),
+            })
+            if len(batch) == 5000:
+                await session.execute(insert(Food), batch)
+                batch = []
+        if batch:
+            await session.execute(insert(Food), batch)
+        await session.commit()
+        await session.execute(text("ANALYZE foods"))
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    engine, session_factory = await reset_database()
+    print(f"Loading {args.foods} synthetic foods...")
+    await load_foods(session_factory, args.foods)
+
+    rng = random.Random(11)
+    clean_queries = [rng.choice(FISH_WORDS) for _ in range(args.iterations)]
+    typo_queries = [typo(rng, q) for q in clean_queries]
+
+    async with session_factory() as session:
+        async def substring(i, queries=clean_queries):
+            term = f"%{queries[i % len(queries)]}%"
+            where = or_(Food.name.ilike(term), func.array_to_string(Food.common_names, ",").ilike(term))
+            await session.execute(select(func.count()).select_from(Food).where(where))
+            (await session.execute(select(Food).where(where).limit(args.limit))).scalars().all()
+
+        async def ranked(i, queries=clean_queries):
+            await trigram.set_similarity_threshold(session, settings.SEARCH_TRGM_THRESHOLD)
+            (await session.execute(trigram.ranked_query(queries[i % len(queries)]).limit(args.limit))).all()
+
+        print(f"\nSearch latency over {args.foods} foods (limit={args.limit}):")
+        report("substring ILIKE (count + page)", await time_async(substring, args.iterations))
+        report("trigram ranked", await time_async(ranked, args.iterations))
+        report("trigram ranked, typo queries", await time_async(
+            lambda i: ranked(i, typo_queries), args.iterations
+        ))
+
+        start = time.perf_counter()
+        index = await build_food_index(session)
+        print(f"\nBM25 index built in {time.perf_counter() - start:.2f} s ({len(index)} foods)")
+        report("bm25 in-process", time_sync(
+            lambda i: index.search(clean_queries[i % len(clean_queries)], limit=args.limit), args.iterations
+        ))
+
+        hits = 0
+        for q in typo_queries[:50]:
+            await trigram.set_similarity_threshold(session, settings.SEARCH_TRGM_THRESHOLD)
+            hits += bool((await session.execute(trigram.ranked_query(q).limit(1))).first())
+        print(f"\nTypo queries with at least one match: {hits}/50")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
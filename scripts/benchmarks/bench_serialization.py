@@ -0,0 +1,99 @@
+"""
+List response serialization microbenchmark
+
+Compares what FastAPI does for ``response_model=List[...]`` (validate ORM
+objects with Pydantic, dump to JSON-ready data, encode with json) with the
+fast path (shape column tuples into dicts, encode with orjson) for pages of
+foods, recalls and research papers. No database needed.
+
+Usage:
+    python scripts/benchmarks/bench_serialization.py --rows 100
+"""
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from common import report, synthetic_food_name, time_sync
+
+from app.api.serialization import PAPER_SHAPE, RECALL_SHAPE, FastJSONResponse, food_shape
+from app.db import models, schemas
+from app.schemas.recalls import RecallResponse
+
+
+def synthetic_objects(rows: int, seed: int = 3):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    category = models.FoodCategory(id=1, name="Seafood", slug="seafood", description="Fish and shellfish")
+    foods = [
+        models.Food(
+            id=uuid.uuid4(), name=synthetic_food_name(rng, i), slug=f"food-{i}", common_names=["fillet", "fish"],
+            description="Synthetic food " * 5, barcode=str(rng.randrange(10 ** 12)), category_id=1,
+            category=category, created_at=now - timedelta(days=i), updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    recalls = [
+        models.FoodRecall(
+            id=uuid.uuid4(), recall_number=f"F-{i:04d}-2024", product_description="Product " * 10,
+            reason_for_recall="Undeclared allergen", recall_date=now - timedelta(days=i),
+            report_date=now, company_name="Acme Foods", distribution_pattern="Nationwide",
+            status="Ongoing", classification="Class II", state="CA", country="US",
+            created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    papers = [
+        models.ResearchPaper(
+            id=uuid.uuid4(), title=f"Paper {i}", authors=["A. Author", "B. Author"], abstract="Abstract " * 40,
+            journal="Food Chem", publication_date=now - timedelta(days=i), keywords=["mercury", "fish"],
+            related_contaminants=["mercury"], related_foods=["tuna"], created_at=now,
+        )
+        for i in range(rows)
+    ]
+    return foods, recalls, papers
+
+
+def to_row(obj, shape):
+    row = [getattr(obj, name) for name in shape.names]
+    for name, nested in shape.nested.items():
+        row.extend(to_row(getattr(obj, name), nested))
+    return tuple(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    foods, recalls, papers = synthetic_objects(args.rows)
+    cases = [
+        ("foods", schemas.Food, foods, food_shape()),
+        ("recalls", RecallResponse, recalls, RECALL_SHAPE),
+        ("papers", schemas.ResearchPaper, papers, PAPER_SHAPE),
+    ]
+
+    print(f"\nSerializing {args.rows}-row pages:")
+    for label, schema, objects, shape in cases:
+        adapter = TypeAdapter(List[schema])
+        rows = [to_row(obj, shape) for obj in objects]
+
+        def response_model(i):
+            validated = adapter.validate_python(objects, from_attributes=True)
+            JSONResponse(adapter.dump_python(validated, mode="json"))
+
+        def fast(i):
+            FastJSONResponse(shape.build_all(rows))
+
+        slow_stats = report(f"{label}: response_model + json", time_sync(response_model, args.iterations))
+        fast_stats = report(f"{label}: row shape + orjson", time_sync(fast, args.iterations))
+        print(f"  {label}: {slow_stats['p50_ms'] / fast_stats['p50_ms']:.1f}x faster at p50")
+
+
+if __name__ == "__main__":
+    main()
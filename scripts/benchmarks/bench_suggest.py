@@ -0,0 +1,62 @@
+"""
+Typeahead suggest latency benchmark
+
+Builds the in-memory suggest index from synthetic food names, common names
+and company names (no database needed) and times completions for prefixes
+of one to six characters.
+
+Usage:
+    python scripts/benchmarks/bench_suggest.py --foods 100000 --companies 20000
+"""
+import argparse
+import random
+import time
+
+from common import FISH_WORDS, report, synthetic_food_name, time_sync
+
+from app.search.suggest import SuggestIndex, Suggestion
+
+
+def synthetic_suggestions(foods: int, companies: int, seed: int = 3):
+    rng = random.Random(seed)
+    suggestions = []
+    for i in range(foods):
+        name = synthetic_food_name(rng, i)
+        popularity = int(rng.paretovariate(1.5))
+        suggestions.append(Suggestion(text=name, kind="food", popularity=popularity, slug=f"food-{i}"))
+        suggestions.append(Suggestion(
+            text=f"{rng.choice(FISH_WORDS)} fillet", kind="food", popularity=popularity, slug=f"food-{i}"
+        ))
+    for i in range(companies):
+        suggestions.append(Suggestion(
+            text=f"{rng.choice(FISH_WORDS).capitalize()} Seafood Company {i}", kind="company",
+            popularity=int(rng.paretovariate(1.2)),
+        ))
+    return suggestions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    suggestions = synthetic_suggestions(args.foods, args.companies)
+    start = time.perf_counter()
+    index = SuggestIndex(suggestions)
+    print(f"Built suggest index: {len(index)} entries, {len(index.keys)} keys "
+          f"in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(5)
+    print(f"\nCompletion latency (k={args.k}):")
+    for length in range(1, 7):
+        prefixes = [rng.choice(FISH_WORDS)[:length] for _ in range(args.iterations)]
+        report(f"prefix length {length}", time_sync(
+            lambda i: index.complete(prefixes[i], k=args.k), args.iterations
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Shared helpers for the API benchmarks
+
+Benchmarks run against BENCH_DATABASE_URL (default: the configured database
+with a ``_bench`` suffix), never against the live database, because they
+drop and recreate all tables before loading synthetic data.
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directories to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "apps" / "api"))
+sys.path.insert(0, str(PROJECT_ROOT / "packages"))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.models import Base
+
+FISH_WORDS = [
+    "salmon", "tuna", "cod", "halibut", "sardine", "mackerel", "trout", "tilapia",
+    "catfish", "pollock", "haddock", "snapper", "grouper", "swordfish", "shark",
+    "anchovy", "herring", "flounder", "sole", "bass", "perch", "shrimp", "crab",
+    "lobster", "scallop", "clam", "oyster", "mussel", "squid", "octopus",
+]
+QUALIFIERS = [
+    "wild", "farmed", "atlantic", "pacific", "canned", "smoked", "fresh", "frozen",
+    "albacore", "skipjack", "sockeye", "coho", "king", "rainbow", "striped", "light",
+]
+
+
+def bench_database_url() -> str:
+    """Database URL used by benchmarks"""
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    base, _, name = settings.DATABASE_URL.rpartition("/")
+    return f"{base}/{name}_bench"
+
+
+async def reset_database():
+    """Create a fresh schema on the benchmark database and return (engine, session factory)"""
+    engine = create_async_engine(bench_database_url(), echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return engine, session_factory
+
+
+def synthetic_food_name(rng: random.Random, i: int) -> str:
+    """Plausible seafood product name, unique per ``i``"""
+    words = rng.sample(QUALIFIERS, rng.randint(0, 2)) + [rng.choice(FISH_WORDS)]
+    suffix = "".join(rng.choices(string.ascii_lowercase, k=3))
+    return f"{' '.join(words).capitalize()} {suffix}{i}"
+
+
+def typo(rng: random.Random, word: str) -> str:
+    """Drop, swap or duplicate one character"""
+    if len(word) < 4:
+        return word
+    pos = rng.randrange(1, len(word) - 1)
+    op = rng.choice(("drop", "swap", "dup"))
+    if op == "drop":
+        return word[:pos] + word[pos + 1:]
+    if op == "swap":
+        return word[:pos - 1] + word[pos] + word[pos - 1] + word[pos + 1:]
+    return word[:pos] + word[pos] + word[pos:]
+
+
+async def time_async(fn, iterations: int, warmup: int = 5) -> list:
+    """Run ``await fn(i)`` repeatedly and return per-call latencies in milliseconds"""
+    for i in range(warmup):
+        await fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def time_sync(fn, iterations: int, warmup: int = 5) -> list:
+    """Run ``fn(i)`` repeatedly and return per-call latencies in milliseconds"""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label: str, samples: list) -> dict:
+    """Print and return p50/p99/mean latency for a set of samples"""
+    stats = {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": statistics.fmean(samples),
+        "n": len(samples),
+    }
+    print(
+        f"  {label:<40} p50={stats['p50_ms']:8.3f} ms  "
+        f"p99={stats['p99_ms']:8.3f} ms  mean={stats['mean_ms']:8.3f} ms  (n={stats['n']})"
+    )
+    return stats
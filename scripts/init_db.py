@@ -19,6 +19,12 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.db.session import engine, AsyncSessionLocal
+from app.db.notifications import notify_ingest_finished
+from app.core.cache import result_cache
+from app.api.documents import rebuild_food_documents
+from app.rankings import refresh_rankings
+from app.exposure import REFERENCE_DOSES
+from app.search.species import load_species_file, seed_species, load_species_index, link_foods_to_species
 from app.db.models import Base, Food, FoodCategory, Contaminant, Source, FoodContaminantLevel, FoodNutrient, ResearchPaper
 from app.core.config import settings
 
@@ -42,12 +48,8 @@ async def create_tables():
     print("🗄️  Creating database tables...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        # pg_trgm (needed by the fuzzy search indexes) is enabled by a before_create hook on the metadata
         await conn.run_sync(Base.metadata.create_all)
-        # Enable pg_trgm extension for fuzzy search
-        try:
-            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
-        except Exception as e:
-            print(f"  ⚠️  Could not enable pg_trgm extension: {e}")
     print("✅ Tables created successfully")
 
 async def seed_categories():
@@ -71,9 +73,11 @@ async def seed_contaminants():
     print("☣️  Seeding contaminants...")
     async with AsyncSessionLocal() as session:
         contaminants = [
-            Contaminant(name="Mercury", chemical_name="Methylmercury", unit="ppm", description="Toxic heavy metal"),
+            Contaminant(name="Mercury", chemical_name="Methylmercury", unit="ppm", description="Toxic heavy metal",
+                        acceptable_daily_intake=REFERENCE_DOSES["Mercury"]),
             Contaminant(name="Pesticides", chemical_name="Various", unit="ppm", description="Agricultural chemicals"),
-            Contaminant(name="PCBs", chemical_name="Polychlorinated Biphenyls", unit="ppb", description="Industrial chemicals"),
+            Contaminant(name="PCBs", chemical_name="Polychlorinated Biphenyls", unit="ppb", description="Industrial chemicals",
+                        acceptable_daily_intake=REFERENCE_DOSES["PCBs"]),
             Contaminant(name="Microplastics", unit="particles/g", description="Tiny plastic particles"),
             Contaminant(name="Lead", unit="ppm", description="Toxic heavy metal"),
         ]
@@ -95,6 +99,24 @@ async def seed_sources():
         await session.commit()
     print(f"✅ Created {len(sources)} data sources")
 
+async def seed_species_aliases():
+    """Load canonical species and their FDA/EWG/NOAA/EPA aliases"""
+    print("🐠 Seeding species aliases...")
+    species_file = Path(__file__).parent.parent / "data" / "species.json"
+    async with AsyncSessionLocal() as session:
+        species_count, alias_count = await seed_species(session, load_species_file(species_file))
+        await session.commit()
+    print(f"✅ Created {species_count} species with {alias_count} aliases")
+
+async def link_species():
+    """Resolve every food name to its canonical species"""
+    print("🔗 Linking foods to species...")
+    async with AsyncSessionLocal() as session:
+        index = await load_species_index(session)
+        linked = await link_foods_to_species(session, index)
+        await session.commit()
+    print(f"✅ Linked {linked} foods to species")
+
 async def seed_fish_data():
     """Seed fish data from local JSON (preferred for stability)"""
     print("🐟 Seeding fish data (from JSON)...")
@@ -237,14 +259,28 @@ async def main():
     await seed_categories()
     await seed_contaminants()
     await seed_sources()
+    await seed_species_aliases()
 
     # Core Data (Reliable)
     await seed_fish_data()
+    await link_species()
 
     # Feature Data (Best Effort)
     await seed_produce_data_dynamic()
     await seed_research_papers_dynamic()
 
+    # Let running API workers rebuild their in-memory indexes
+    async with AsyncSessionLocal() as session:
+        documents = await rebuild_food_documents(session)
+        print(f"📄 Rebuilt {documents} food detail documents")
+        ranked = await refresh_rankings(session)
+        print(f"🏆 Ranked {ranked} foods")
+        await notify_ingest_finished(session, ["food_categories", "foods", "species", "research_papers", "food_rankings"])
+        await session.commit()
+        # Drop cached search results built from the old rows
+        await result_cache.bump_versions(["food_categories", "foods", "species", "research_papers"])
+        await result_cache.close()
+
     print("\n✅ DONE.")
 
 if __name__ == "__main__":
@@ -25,6 +25,18 @@ from sqlalchemy import select
 
 from app.db.models import Base, FoodRecall, StateAdvisory, SustainabilityRating, Source, Food
 from app.core.config import settings
+from app.db.notifications import notify_ingest_finished
+from app.core.cache import result_cache
+from app.api.documents import rebuild_food_documents
+from app.rankings import refresh_rankings
+from app.recalls import (
+    add_recalls_to_rollup,
+    check_recall_rollup,
+    link_recalls,
+    load_food_token_index,
+    rebuild_recall_rollup,
+)
+from app.search.species import load_species_index, primary_foods_by_species
 from scrapers.fda_recalls_scraper import FDARecallsScraper
 from scrapers.epa_advisories_scraper import EPAAdvisoriesScraper
 from scrapers.noaa_fishwatch_scraper import NOAAFishWatchScraper
@@ -109,6 +121,7 @@ async def seed_fda_recalls(session: AsyncSession):
         # Insert into database
         inserted = 0
         skipped = 0
+        pending = []
 
         for recall_data in unique_recalls.values():
             # Check if already exists
@@ -157,14 +170,18 @@ async def seed_fda_recalls(session: AsyncSession):
             )
 
             session.add(recall)
+            pending.append(recall)
             inserted += 1
 
-            # Commit in batches
+            # Commit in batches, counting each batch into the daily rollup with it
             if inserted % 50 == 0:
+                await add_recalls_to_rollup(session, pending)
+                pending.clear()
                 await session.commit()
                 print(f"  ├─ Inserted {inserted} recalls...")
 
         # Final commit
+        await add_recalls_to_rollup(session, pending)
         await session.commit()
 
         print(f"\n✅ Seeded {inserted} recalls (skipped {skipped} existing)")
@@ -232,9 +249,15 @@ async def seed_epa_advisories(session: AsyncSession):
     advisories_data = await scraper.get_all_advisories(states_limit=10, advisories_per_state=5)
     print(f"📥 Retrieved {len(advisories_data)} advisories")
 
+    # Resolve free-text species to foods in memory instead of one query per row
+    species_index = await load_species_index(session)
+    food_by_species = await primary_foods_by_species(session)
+
     inserted = 0
     for adv_data in advisories_data:
+        species = species_index.resolve(adv_data['fish_species'])
         advisory = StateAdvisory(
+            food_id=food_by_species.get(species.id) if species else None,
             state_code=adv_data['state_code'],
             state_name=adv_data['state_name'],
             waterbody_name=adv_data['waterbody_name'],
@@ -266,16 +289,19 @@ async def seed_noaa_sustainability(session: AsyncSession):
     ratings_data = await scraper.get_sustainability_ratings(limit=30)
     print(f"📥 Retrieved {len(ratings_data)} sustainability ratings")
 
+    # Match NOAA names ("Atlantic Salmon", "Tuna (Albacore)") through the species alias index
+    species_index = await load_species_index(session)
+    food_by_species = await primary_foods_by_species(session)
+
     inserted = 0
+    matched = 0
     for rating_data in ratings_data:
-        # Try to match with existing food
-        result = await session.execute(
-            select(Food).where(Food.name.ilike(f"%{rating_data['species']}%")).limit(1)
-        )
-        food = result.scalar_one_or_none()
+        species = species_index.resolve(rating_data['species'])
+        food_id = food_by_species.get(species.id) if species else None
+        matched += food_id is not None
 
         rating = SustainabilityRating(
-            food_id=food.id if food else None,
+            food_id=food_id,
             rating=rating_data['rating'],
             rating_score=rating_data['rating_score'],
             source=rating_data['source'],
@@ -291,7 +317,7 @@ async def seed_noaa_sustainability(session: AsyncSession):
         session.add(rating)
         inserted += 1
     await session.commit()
-    print(f"✅ Seeded {inserted} NOAA sustainability ratings")
+    print(f"✅ Seeded {inserted} NOAA sustainability ratings ({matched} matched to foods)")
     return inserted
 
 
@@ -329,6 +355,29 @@ async def main():
         advisories_count = await seed_epa_advisories(session)
         sustainability_count = await seed_noaa_sustainability(session)
 
+    async with async_session() as session:
+        documents = await rebuild_food_documents(session)
+        print(f"📄 Rebuilt {documents} food detail documents")
+        ranked = await refresh_rankings(session)
+        print(f"🏆 Ranked {ranked} foods")
+        mismatches = await check_recall_rollup(session)
+        if mismatches:
+            # e.g. recalls loaded before the rollup existed
+            rows = await rebuild_recall_rollup(session)
+            print(f"⚠️  Recall rollup was off in {len(mismatches)} rows; rebuilt {rows} rows from a full recount")
+        # Link recalls (new ones, and older ones whose food arrived since) to foods
+        food_index = await load_food_token_index(
+            session, await load_species_index(session), await primary_foods_by_species(session)
+        )
+        linked = await link_recalls(session, food_index)
+        print(f"🔗 Linked {linked} recalls to foods")
+        # Let running API workers rebuild their in-memory indexes
+        await notify_ingest_finished(session, ["food_recalls", "state_advisories", "sustainability_ratings", "food_rankings"])
+        await session.commit()
+        # Drop cached search results built from the old rows
+        await result_cache.bump_versions(["food_recalls", "state_advisories", "sustainability_ratings"])
+        await result_cache.close()
+
     print("\n" + "="*60)
     print("✅ MILESTONE 2 SEEDING COMPLETE (ALL 4 PHASES)!")
     print("="*60)